@@ -0,0 +1,59 @@
+from flask import request
+from flask_socketio import emit, join_room, leave_room
+
+from extensions import socketio
+from services.live_push import LIVE_NAMESPACE, ROOMS, live_publisher
+from utils.logging_service import LoggingService
+
+logging = LoggingService()
+
+
+def _requested_rooms(data) -> list:
+    """
+    Returns the known rooms of ``{"rooms": [...]}``, all rooms without a ``rooms`` entry.
+
+    Raises:
+        ValueError: If ``rooms`` is not a list.
+    """
+    rooms = data.get("rooms", ROOMS) if isinstance(data, dict) else ROOMS
+    if not isinstance(rooms, (list, tuple)):
+        raise ValueError("rooms must be a list")
+    return [room for room in ROOMS if room in rooms]
+
+
+@socketio.on("subscribe", namespace=LIVE_NAMESPACE)
+def subscribe(data=None):
+    """
+    Joins the requested rooms (default: all) and sends their last snapshot, e.g. ``{"rooms": ["energy", "tanks"]}``.
+    """
+    try:
+        rooms: list = _requested_rooms(data)
+    except ValueError as err:
+        return {"error": str(err)}
+
+    live_publisher.subscribe(request.sid, rooms)
+    for room in rooms:
+        join_room(room)
+        emit("snapshot", live_publisher.snapshot(room))
+    return {"rooms": rooms}
+
+
+@socketio.on("unsubscribe", namespace=LIVE_NAMESPACE)
+def unsubscribe(data=None):
+    """
+    Leaves the requested rooms (default: all).
+    """
+    try:
+        rooms: list = _requested_rooms(data)
+    except ValueError as err:
+        return {"error": str(err)}
+
+    for room in rooms:
+        leave_room(room)
+    live_publisher.unsubscribe(request.sid, rooms)
+    return {"rooms": rooms}
+
+
+@socketio.on("disconnect", namespace=LIVE_NAMESPACE)
+def disconnect(*args):
+    live_publisher.unsubscribe(request.sid)
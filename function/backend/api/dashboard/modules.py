@@ -1,36 +1,141 @@
+import time
+
 from flask import Blueprint, jsonify, request
 
-from services.energy.tibber import pull_price_info_from_tibber_api
-from services.energy.inverter import pull_live_data_from_inverter
-from services.heating.helper import save_memory, load_memory, toggle_relay
-from services.temperature.modbus_temp_module import read_temp_sensors_from_r4dcb08
+from config import Config
+from database.fetch_data import fetch_weather_sources
+from services.energy.energy_history import get_energy_of_day, query_energy
+from services.energy.price_cache import get_price_info
+from services.energy.inverter import EMPTY_LIVE_DATA, read_live_data_from_inverter
+from services.energy.pv_forecast import MAX_STEP, MIN_STEP, forecast_cloud_cover, forecast_production
+from services.heating.helper import (get_all_tank_sensor_data, get_tank_sensor_data, load_memory,
+                                     read_sensors_by_tank_with_heat_pipe, toggle_relay, update_memory)
+from services.heating.planner import heating_planner
+from services.heating.stage_controller import SWITCH_WINDOW
+from services.telemetry_cache import telemetry_cache
+from services.timeseries_service import query_series
+from services.temperature.modbus_temp_module import get_r4dcb08_temperatures
+from services.weather_service import get_weather
 from utils.logging_service import LoggingService
 
-VALID_MODES = ["Automatik", "Manuell", "Schnell heizen", "Urlaub"]
+VALID_MODES = ["Automatik", "Manuell", "Schnell heizen", "Urlaub", "Preisoptimiert"]
 
 modules_bp = Blueprint("modules", __name__, url_prefix="/api/dashboard")
 logging = LoggingService()
 
 
-# TODO: Refactor
-@modules_bp.route("/energy_data", methods=["GET"])  # TODO: Refactor to live data
+@modules_bp.route("/energy_data", methods=["GET"])
 def get_energy_data():
-    dummy_data = {
-        f"'startsAt': '2025-07-03T{hour:02d}:00:00.000+02:00'": {
-            "heating": 0.00,                            # TODO: Fill with heating manufacturer data
-            "consumer": 0.00,                           # TODO: Fill with consumer manufacturer data
-            "regular": 0.00,                            # TODO: Fill with regular manufacturer data (regular = consume - comsumer - heating)
-            "production": round(2.0 + hour * 0.15, 2)   # TODO: Fill with Forecast or Sum-Production
-        }
-        for hour in range(24)
-    }
-    return jsonify(dummy_data)
+    """
+    Get today's hourly energy flows in kWh
+    ---
+    responses:
+      200:
+        description: Heating, consumer, regular consumption and production per hour of the current local day
+        examples:
+          application/json:
+            {
+              "'startsAt': '2025-07-03T00:00:00.000+02:00'": {
+                "heating": 0.0, "consumer": 0.0, "regular": 0.31, "production": 0.0
+              }
+            }
+    """
+    return jsonify(get_energy_of_day()), 200
+
+
+@modules_bp.route("/energy_history", methods=["GET"])
+def get_energy_history():
+    """
+    Get the energy flows of an arbitrary range
+    ---
+    parameters:
+      - {name: start, in: query, type: integer, description: "Range start (UNIX seconds), default end - 7 days"}
+      - {name: end, in: query, type: integer, description: "Range end (UNIX seconds), default now"}
+      - {name: resolution, in: query, type: string, description: "hour or day, default hour"}
+    responses:
+      200:
+        description: Energy flows in kWh per bucket, ordered by time
+      400:
+        description: Invalid parameters
+    """
+    try:
+        end: int = request.args.get("end", int(time.time()), type=int)
+        start: int = request.args.get("start", end - 7 * 86400, type=int)
+        energy: list = query_energy(start, end, request.args.get("resolution", "hour"))
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
+    return jsonify(energy), 200
+
+
+@modules_bp.route("/pv_forecast", methods=["GET"])
+def get_pv_forecast():
+    """
+    Get the expected PV production of all configured arrays, computed locally from their geometry
+    ---
+    parameters:
+      - {name: start, in: query, type: integer, description: "Range start (UNIX seconds), default start of the step"}
+      - {name: end, in: query, type: integer, description: "Range end (UNIX seconds), default start + 24 h"}
+      - {name: step, in: query, type: integer, description: "Resolution in seconds (300–900), default PV_FORECAST_STEP"}
+      - {name: cloud_cover, in: query, type: number, description: "Cloud cover fraction (0–1), default stored forecast"}
+    responses:
+      200:
+        description: Mean power in W per interval, ordered by time
+      204:
+        description: No PV array configured
+      400:
+        description: Invalid parameters
+    """
+    step: int | None = request.args.get("step", type=int)
+    if step is not None and not (MIN_STEP <= step <= MAX_STEP and 86400 % step == 0):
+        return jsonify({"error": f"step must divide a day and lie between {MIN_STEP} and {MAX_STEP} seconds"}), 400
+    step = step or Config.PV_FORECAST_STEP
+
+    start: int = request.args.get("start", int(time.time()), type=int) // step * step
+    end: int = request.args.get("end", start + 86400, type=int)
+    if end <= start or end - start > 7 * 86400:
+        return jsonify({"error": "end must lie after start, at most 7 days"}), 400
+
+    cloud_cover = request.args.get("cloud_cover", type=float)
+    if cloud_cover is None:
+        cloud_cover = forecast_cloud_cover(start, end, step)
+    production: list | None = forecast_production(start, end, step, cloud_cover)
+    if production is None:
+        return jsonify([]), 204
+    return jsonify([
+        {"start": moment, "power": power} for moment, power in zip(range(start, end, step), production)
+    ]), 200
+
+
+@modules_bp.route("/weather", methods=["GET"])
+def get_weather_data():
+    """
+    Get the stored weather (current conditions and forecast) of a weather setting, never calls the provider
+    ---
+    parameters:
+      - {name: id, in: query, type: integer, description: "Weather setting id, default the first one"}
+    responses:
+      200:
+        description: Current reading, forecast steps and fetch/expiry time
+      204:
+        description: No weather setting or no data fetched yet
+    """
+    sources: list = fetch_weather_sources() or []
+    setting_id: int | None = request.args.get("id", type=int)
+    source: dict | None = next((s for s in sources if setting_id is None or s["id"] == setting_id), None)
+    if source is None:
+        return jsonify({}), 204
+
+    weather: dict | None = get_weather(source["latitude"], source["longitude"])
+    if weather is None:
+        return jsonify({}), 204
+    return jsonify(weather), 200
 
 
 @modules_bp.route("/energy_price", methods=["GET"])
 def get_energy_price():
     """
-    Get the energy price from Tibber GraphQL
+    Get today's and tomorrow's energy prices from the price cache (never blocks on Tibber)
     ---
     responses:
       200:
@@ -52,7 +157,7 @@ def get_energy_price():
               "tomorrow": []
             }
     """
-    price_information: list = pull_price_info_from_tibber_api()
+    price_information: list = get_price_info()
 
     if price_information:  # Prüft ob die Liste nicht leer ist
         return jsonify(price_information), 200
@@ -80,6 +185,28 @@ def get_heat_pipe_states():
         return jsonify({}), 500
 
 
+@modules_bp.route("/heat_pipe_switches", methods=["GET"])
+def get_heat_pipe_switches():
+    """
+    Get the switching counters of the heat pipes
+    ---
+    responses:
+      200:
+        description: Per heat pipe the total number of switches, the time of the last switch and the switches within
+          the last hour
+    """
+    switching: dict = load_memory().get("switching", {})
+    now: float = time.time()
+    return jsonify({
+        pipe: {
+            "count": history["count"],
+            "last": history["last"],
+            "last_hour": sum(1 for timestamp in history["recent"] if now - timestamp < SWITCH_WINDOW),
+        }
+        for pipe, history in switching.items()
+    }), 200
+
+
 @modules_bp.route("/heat_pipe/<int:pipe_id>", methods=["GET"])
 def get_heat_pipe_state(pipe_id):
     """Get the current state from one of the three heat pipes"""
@@ -138,39 +265,95 @@ def set_heating_mode():
     if mode not in VALID_MODES:
         return jsonify({"error": f"Ungültiger Modus. Erlaubt: {', '.join(VALID_MODES)}"}), 400
 
-    memory: dict = load_memory()
-    memory["mode"] = mode
-    save_memory(memory)
+    update_memory(lambda memory: memory.update(mode=mode))
 
     return jsonify({"message": "Modus aktualisiert", "mode": mode}), 200
 
 
+@modules_bp.route("/heating_plan", methods=["GET"])
+def get_heating_plan():
+    """
+    Get the cost-optimal heat-pipe schedule for the next 24–36 h (used by mode "Preisoptimiert")
+    ---
+    responses:
+      200:
+        description: Stage, power, price and expected tank temperature per 15-minute slot
+      204:
+        description: No plan possible (no prices, heat-pipe settings or tank sensors)
+    """
+    sensors: dict = read_sensors_by_tank_with_heat_pipe()
+    if not sensors["tank"]:
+        return jsonify({}), 204
+    temperature: float = list(sensors["tank"].values())[-1]
+    active_stage: int = sum(1 for state in load_memory().get("heat_pipes", {}).values() if state)
+
+    plan = heating_planner.plan(temperature, sensors["dest_temp"], active_stage)
+    if plan is None:
+        return jsonify({}), 204
+    return jsonify(plan.to_dict()), 200
+
+
 @modules_bp.route("/inverter_data", methods=["GET"])
 def get_inverter_data():
-    return jsonify(pull_live_data_from_inverter()), 200
+    """
+    Get the latest inverter snapshot published by the scheduler leader. The inverter is only read directly if the
+    snapshot is missing or older than TELEMETRY_MAX_AGE (e.g. scheduler disabled). All values are 0 while the inverter
+    cannot be read.
+    """
+    live_data: dict | None = telemetry_cache.get_or_read("inverter", read_live_data_from_inverter)
+    return jsonify(live_data if live_data is not None else EMPTY_LIVE_DATA), 200
 
 
 @modules_bp.route("/heating_tank_temp", methods=["GET"])
 def get_heating_tank_temp():
-    heating_tank_sensor_data: dict = read_temp_sensors_from_r4dcb08({0: 0.0, 1: 0.0, 2: 0.0})
-    sensor_data = {
-        'dest_temp': 60.0,
-        'sensor_1': heating_tank_sensor_data[0],
-        'sensor_2': heating_tank_sensor_data[1],
-        'sensor_3': heating_tank_sensor_data[2],
-        'heat_pipe': True
-    }
-    return jsonify(sensor_data), 200
+    return jsonify(get_tank_sensor_data("heating_tank", get_r4dcb08_temperatures())), 200
 
 
 @modules_bp.route("/buffer_tank_temp", methods=["GET"])
 def get_buffer_tank_temp():
-    buffer_tank_sensor_data: dict = read_temp_sensors_from_r4dcb08({3: 0.0, 4: 0.0, 5: 0.0})
-    sensor_data = {
-        'dest_temp': 35.0,
-        'sensor_1': buffer_tank_sensor_data[3],
-        'sensor_2': buffer_tank_sensor_data[4],
-        'sensor_3': buffer_tank_sensor_data[5],
-        'heat_pipe': False
-    }
-    return jsonify(sensor_data), 200
+    return jsonify(get_tank_sensor_data("buffer_tank", get_r4dcb08_temperatures())), 200
+
+
+@modules_bp.route("/tank_temps", methods=["GET"])
+def get_tank_temps():
+    """
+    Get the temperatures of all tanks from one scan of the temperature module
+    ---
+    responses:
+      200:
+        description: Per tank id, description, dest_temp, sensor_1 … (bottom to top) and heat_pipe
+    """
+    return jsonify(get_all_tank_sensor_data(get_r4dcb08_temperatures())), 200
+
+
+@modules_bp.route("/measurements", methods=["GET"])
+def get_measurements():
+    """
+    Get the history of one measured series
+    ---
+    parameters:
+      - {name: source, in: query, type: string, required: true, description: "Device, e.g. inverter or r4dcb08"}
+      - {name: metric, in: query, type: string, required: true, description: "Metric, e.g. production or channel_0"}
+      - {name: start, in: query, type: integer, description: "Range start (UNIX seconds), default end - 24 h"}
+      - {name: end, in: query, type: integer, description: "Range end (UNIX seconds), default now"}
+      - {name: resolution, in: query, type: integer, description: "0 (raw), 60, 900 or 3600 seconds, default 900"}
+    responses:
+      200:
+        description: Samples ordered by time
+      400:
+        description: Invalid parameters
+    """
+    source: str | None = request.args.get("source")
+    metric: str | None = request.args.get("metric")
+    if not source or not metric:
+        return jsonify({"error": "Parameter 'source' und 'metric' sind erforderlich"}), 400
+
+    try:
+        end: int = request.args.get("end", int(time.time()), type=int)
+        start: int = request.args.get("start", end - 86400, type=int)
+        resolution: int = request.args.get("resolution", 900, type=int)
+        samples: list = query_series(source, metric, start, end, resolution)
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
+    return jsonify(samples), 200
@@ -0,0 +1,7 @@
+from flask import Blueprint
+
+metrics_bp = Blueprint("metrics", __name__, url_prefix="/api/metrics")
+
+# import metrics modules
+if True:
+    from . import routes
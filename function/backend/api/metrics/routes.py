@@ -0,0 +1,44 @@
+import time
+
+from flask import Flask, Response, g, request
+
+from utils.metrics import metrics
+
+from . import metrics_bp
+
+REQUEST_SECONDS = metrics.histogram("viki_http_request_seconds", "Duration of API requests by route",
+                                    ("method", "route", "status"))
+
+
+@metrics_bp.route("", methods=["GET"])
+def get_metrics():
+    """
+    Get the metrics of all worker processes in the Prometheus text format
+    ---
+    produces:
+      - text/plain
+    responses:
+      200:
+        description: Counters, gauges and histograms (inverter, Modbus, control tick, relays, database, scheduler,
+          acquisition, HTTP client and API routes)
+    """
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
+def init_request_metrics(app: Flask) -> None:
+    """
+    Records the duration of every API request per route template (e.g. ``/api/settings/tank/<int:id>``), method and
+    status code.
+    """
+
+    @app.before_request
+    def start_timer() -> None:
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def observe_request(response: Response) -> Response:
+        started: float | None = g.pop("request_started", None)
+        if started is not None:
+            route: str = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            REQUEST_SECONDS.observe(time.perf_counter() - started, request.method, route, str(response.status_code))
+        return response
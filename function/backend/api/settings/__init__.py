@@ -1,7 +1,36 @@
-from flask import Blueprint
+from flask import Blueprint, Response, request
+
+from database.settings_cache import settings_cache
 
 settings_bp = Blueprint("settings", __name__, url_prefix="/api/settings")
 
+# Settings resource (first path segment) -> database tables it writes
+SETTINGS_TABLES: dict = {
+    "category": ("manufacturer_category",),
+    "energy": ("energy_settings",),
+    "heating": ("heating_settings",),
+    "location": ("location",),
+    "manufacturer": ("manufacturer",),
+    "photovoltaic": ("photovoltaic_settings",),
+    "sensor": ("sensors",),
+    "tank": ("tank_settings",),
+    "weather": ("weather_settings",),
+}
+
+
+@settings_bp.after_request
+def invalidate_settings_cache(response: Response) -> Response:
+    """
+    Invalidates the cached settings of a resource after every successful write to it.
+    """
+    if request.method in ("POST", "PUT", "DELETE") and response.status_code < 400 and request.url_rule:
+        resource: str = request.url_rule.rule.removeprefix(settings_bp.url_prefix).strip("/").split("/")[0]
+        tables: tuple = SETTINGS_TABLES.get(resource, ())
+        if tables:
+            settings_cache.invalidate(*tables)
+    return response
+
+
 # import setting modules
 if True:
     from . import heating
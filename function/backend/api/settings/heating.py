@@ -27,6 +27,8 @@ def create_heating_module():
       - ip (string)
       - api_key (string)
       - buffer (integer)
+      - gpio_pin (integer, optional)
+      - hysteresis, min_on_time, min_off_time, max_switches_per_hour (integer, optional)
     :return: Created module
     """
     data = request.get_json() or {}
@@ -40,7 +42,12 @@ def create_heating_module():
         manufacturer=data["manufacturer"],
         ip=data["ip"],
         api_key=data["api_key"],
-        buffer=data["buffer"]
+        buffer=data["buffer"],
+        gpio_pin=data.get("gpio_pin"),
+        hysteresis=data.get("hysteresis"),
+        min_on_time=data.get("min_on_time"),
+        min_off_time=data.get("min_off_time"),
+        max_switches_per_hour=data.get("max_switches_per_hour")
     )
     db.session.add(module)
     db.session.commit()
@@ -59,13 +66,16 @@ def update_heating_module(module_id: int):
       - ip (string)
       - api_key (string)
       - buffer (integer)
+      - gpio_pin (integer)
+      - hysteresis, min_on_time, min_off_time, max_switches_per_hour (integer)
     :param: Identifier of the module
     :return: Updated module
     """
     module = HeatingSetting.query.get_or_404(module_id)
     data = request.get_json() or {}
 
-    for key in ("description", "manufacturer", "ip", "api_key", "buffer"):
+    for key in ("description", "manufacturer", "ip", "api_key", "buffer", "gpio_pin", "hysteresis", "min_on_time",
+                "min_off_time", "max_switches_per_hour"):
         if key in data:
             setattr(module, key, data[key])
 
@@ -2,6 +2,7 @@ from flask import request, jsonify
 from flask_jwt_extended import jwt_required
 from extensions import db
 from database.settings import ManufacturerSetting
+from utils.data_formatter import validate_api_field
 from . import settings_bp
 
 
@@ -37,7 +38,7 @@ def create_manufacturer_module():
       - manufacturer (string)
       - model_type (string)
       - url (string)
-      - api (string)
+      - api (string): API path (list literal, validated here), connection parameters (dict literal) or empty
       - power_factor (number)
       - power_size (number)
     :return: Created module
@@ -48,6 +49,10 @@ def create_manufacturer_module():
     if missing:
         return jsonify(msg=f"Missing fields: {', '.join(missing)}"), 422
 
+    api_error = validate_api_field(data["api"])
+    if api_error:
+        return jsonify(msg=f"Invalid api: {api_error}"), 422
+
     module = ManufacturerSetting(
         description=data["description"],
         manufacturer=data["manufacturer"],
@@ -73,7 +78,7 @@ def update_manufacturer_module(module_id: int):
       - manufacturer (string)
       - model_type (string)
       - url (string)
-      - api (string)
+      - api (string): API path (list literal, validated here), connection parameters (dict literal) or empty
       - power_factor (number)
       - power_size (number)
     :param: Identifier of the module
@@ -82,6 +87,10 @@ def update_manufacturer_module(module_id: int):
     module = ManufacturerSetting.query.get_or_404(module_id)
     data = request.get_json() or {}
 
+    api_error = validate_api_field(data.get("api"))
+    if api_error:
+        return jsonify(msg=f"Invalid api: {api_error}"), 422
+
     for key in ("description", "manufacturer", "model_type", "url", "api", "power_factor", "power_size"):
         if key in data:
             setattr(module, key, data[key])
@@ -26,7 +26,9 @@ def create_sensor_module():
       - ip (string)
       - api_key (string)
       - measuring_device (TankSettings)
-      - measuring_position (number)
+      - measuring_position (number): Position in the tank, 1 = bottom
+    Optional:
+      - channel (number): Input channel on the temperature module, default the next free one
     """
     data = request.get_json() or {}
     required = ["description", "manufacturer", "ip", "api_key", "measuring_device", "measuring_position"]
@@ -40,7 +42,8 @@ def create_sensor_module():
         ip=data["ip"],
         api_key=data["api_key"],
         measuring_device=data["measuring_device"],
-        measuring_position=data["measuring_position"]
+        measuring_position=data["measuring_position"],
+        channel=data.get("channel")
     )
     db.session.add(module)
     db.session.commit()
@@ -59,11 +62,12 @@ def update_sensor_module(module_id: int):
       - api_key (string)
       - measuring_device (TankSettings)
       - measuring_position (number)
+      - channel (number)
     """
     module = SensorSetting.query.get_or_404(module_id)
     data = request.get_json() or {}
 
-    for key in ("description", "manufacturer", "ip", "api_key", "measuring_device", "measuring_position"):
+    for key in ("description", "manufacturer", "ip", "api_key", "measuring_device", "measuring_position", "channel"):
         if key in data:
             setattr(module, key, data[key])
 
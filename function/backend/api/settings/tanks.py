@@ -23,6 +23,9 @@ def create_tank_module():
     Create a new tank element. Json required:
       - description (string)
       - volume (number)
+    Optional:
+      - dest_temp (number): Destination temperature in °C
+      - heat_pipe (bool): Tank heated by the heat pipes
     """
     data = request.get_json() or {}
     required = ["description", "volume"]
@@ -32,7 +35,9 @@ def create_tank_module():
 
     module = TankSetting(
         description=data["description"],
-        volume=data["volume"]
+        volume=data["volume"],
+        dest_temp=data.get("dest_temp"),
+        heat_pipe=data.get("heat_pipe")
     )
     db.session.add(module)
     db.session.commit()
@@ -47,11 +52,13 @@ def update_tank_module(module_id: int):
     Update a new tank element. Json required:
       - description (string)
       - volume (number)
+      - dest_temp (number)
+      - heat_pipe (bool)
     """
     module = TankSetting.query.get_or_404(module_id)
     data = request.get_json() or {}
 
-    for key in ("description", "volume"):
+    for key in ("description", "volume", "dest_temp", "heat_pipe"):
         if key in data:
             setattr(module, key, data[key])
 
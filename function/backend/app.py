@@ -1,3 +1,5 @@
+import atexit
+
 from flask import Flask
 from flask_cors import CORS
 from flasgger import Swagger
@@ -6,25 +8,29 @@ from api.auth.routes import auth_bp
 from api.dashboard.routes import dashboard_bp
 from api.settings import settings_bp
 from api.dashboard.modules import modules_bp
-from database.init_db import seed_users, seed_roles, seed_manufacturers, seed_category, seed_location
+from api.metrics import metrics_bp
+from api.metrics.routes import init_request_metrics
+import api.dashboard.live  # registers the /live socket events
+from database.init_db import seed_users, seed_roles, seed_manufacturers, seed_category, seed_location, upgrade_schema
 
 from extensions import db, jwt, socketio
 from config import Config
-from services.energy.inverter import pull_live_data_from_inverter
-from services.heating.helper import init_gpio
+from services.energy.energy_history import aggregate_energy
+from services.energy.inverter import power_follower, pull_live_data_from_inverter
+from services.energy.price_cache import refresh_price_cache
+from services.heating.helper import init_gpio, sync_relays
+from services.heating.planner import refresh_heating_plan
+from services.heating.tank_model import refit_tank_models
+from services.live_push import live_publisher
+from services.acquisition import acquisition_engine, configure_default_devices
+from services.scheduler_service import scheduler
+from services.temperature.modbus_temp_module import pull_temperatures_from_r4dcb08
+from services.timeseries_service import apply_retention, flush_and_rollup
+from services.weather_service import refresh_weather
 from utils.logging_service import LoggingService
-from apscheduler.schedulers.background import BackgroundScheduler
+from utils.metrics import metrics
 
 logging = LoggingService()
-sched = BackgroundScheduler(daemon=True)
-
-
-def safe_job():
-    with app.app_context():
-        try:
-            pull_live_data_from_inverter()
-        except Exception as e:
-            logging.error(f"[SCHEDULER] pull_live_data_from_inverter failed: {e}")
 
 
 def create_app():
@@ -48,36 +54,57 @@ def create_app():
     app.register_blueprint(dashboard_bp, url_prefix="/api/dashboard")
     app.register_blueprint(settings_bp, url_prefix="/api/settings")
     app.register_blueprint(modules_bp, url_prefix="/api/modules")
+    app.register_blueprint(metrics_bp, url_prefix="/api/metrics")
+    init_request_metrics(app)
 
     with app.app_context():
         db.create_all()
+        upgrade_schema()
         seed_roles()
         seed_users()
         seed_category()
         seed_manufacturers()
         seed_location()
 
-    init_gpio()
-
     @app.route("/")
     def index():
         return {"message": "VIKI Backend API läuft"}
 
-    if not sched.running:
-        sched.add_job(
-            safe_job, 
-            trigger='interval', 
-            seconds=30,
-            max_instances=1,
-            id='inverter_data_pull'
-        )
-        sched.start()
+    interval: int = app.config["SCHEDULER_INTERVAL"]
+    if interval > 0 and not scheduler.running:
+        scheduler.init_app(app)
+        # GPIO lines belong to one process: the leader claims the relays and applies the states recorded by the others
+        scheduler.on_leader(init_gpio)
+        scheduler.add_job(sync_relays, 'relay_sync', seconds=app.config["RELAY_SYNC_INTERVAL"])
+        if app.config["ACQUISITION_ENGINE"]:
+            # Device polling runs concurrently in the acquisition engine of the leader instead of scheduler jobs
+            acquisition_engine.init_app(app)
+            configure_default_devices(acquisition_engine)
+            scheduler.on_leader(acquisition_engine.start)
+            atexit.register(acquisition_engine.stop)
+        else:
+            scheduler.add_job(pull_temperatures_from_r4dcb08, 'tank_temperature_pull', seconds=interval)
+            if app.config["FAST_CONTROL_INTERVAL"] > 0:
+                scheduler.add_job(power_follower.tick, 'inverter_fast_control',
+                                  seconds=app.config["FAST_CONTROL_INTERVAL"])
+            else:
+                scheduler.add_job(pull_live_data_from_inverter, 'inverter_data_pull', seconds=interval)
+            scheduler.add_job(refresh_price_cache, 'energy_price_refresh', seconds=600)
+            scheduler.add_job(refresh_weather, 'weather_refresh', seconds=300)
+        scheduler.add_job(flush_and_rollup, 'timeseries_rollup', seconds=60)
+        scheduler.add_job(apply_retention, 'timeseries_retention', seconds=3600)
+        scheduler.add_job(aggregate_energy, 'energy_aggregation', seconds=300)
+        scheduler.add_job(refit_tank_models, 'tank_model_fit', seconds=86400)
+        scheduler.add_job(refresh_heating_plan, 'heating_plan_refresh', seconds=app.config["PLANNER_REFRESH_INTERVAL"])
+        scheduler.on_leader(refresh_heating_plan)
+        scheduler.start()
+        atexit.register(scheduler.shutdown)
         logging.info("[SCHEDULER] Background scheduler started")
+    elif interval <= 0:
+        init_gpio()
 
-    @app.teardown_appcontext
-    def shutdown_scheduler(exception=None):
-        if sched.running:
-            sched.shutdown(wait=False)
+    live_publisher.start()
+    metrics.start()
 
     return app
 
@@ -14,3 +14,94 @@ class Config:
     JWT_COOKIE_SECURE = False
     JWT_ACCESS_COOKIE_PATH = "/"
     JWT_COOKIE_CSRF_PROTECT = False
+
+    # Periodic jobs run only in the process holding the scheduler lock, 0 disables the scheduler
+    SCHEDULER_INTERVAL = int(os.getenv("SCHEDULER_INTERVAL", "30"))
+    SCHEDULER_LOCK_FILE = os.getenv("SCHEDULER_LOCK_FILE", "/tmp/viki-scheduler.lock")
+    SCHEDULER_STANDBY_INTERVAL = int(os.getenv("SCHEDULER_STANDBY_INTERVAL", "15"))
+    SHARED_STATE_DIR = os.getenv("SHARED_STATE_DIR", "/tmp/viki-shared")
+    TELEMETRY_MAX_AGE = int(os.getenv("TELEMETRY_MAX_AGE", "60"))
+    # Seconds between change checks of the WebSocket live push (namespace /live), 0 disables the push
+    LIVE_PUSH_INTERVAL = float(os.getenv("LIVE_PUSH_INTERVAL", "1"))
+    # Fast surplus following: inverter poll and heat-pipe control every FAST_CONTROL_INTERVAL seconds (1–5, 0 keeps the
+    # control in the SCHEDULER_INTERVAL inverter job), FAST_CONTROL_TIMEOUT is the request budget (default 80 %)
+    FAST_CONTROL_INTERVAL = int(os.getenv("FAST_CONTROL_INTERVAL", "0"))
+    FAST_CONTROL_TIMEOUT = float(os.getenv("FAST_CONTROL_TIMEOUT", "0"))
+    # Concurrent device polling (services/acquisition.py) instead of the separate inverter, R4DCB08, price and weather
+    # jobs; ACQUISITION_TIMEOUT_SHARE is the default time budget of a read as share of the device's interval
+    ACQUISITION_ENGINE = os.getenv("ACQUISITION_ENGINE", "0").lower() in ("1", "true", "yes")
+    ACQUISITION_TIMEOUT_SHARE = float(os.getenv("ACQUISITION_TIMEOUT_SHARE", "0.8"))
+
+    # Shared HTTP client (services/http_client.py): default timeout (s), retries of idempotent requests, base delay (s)
+    # of the jittered backoff, kept-alive connections per host, and consecutive failures that open the circuit of a
+    # host for HTTP_CIRCUIT_RESET seconds (0 disables the breaker)
+    HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+    HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+    HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", "0.5"))
+    HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "4"))
+    HTTP_CIRCUIT_FAILURES = int(os.getenv("HTTP_CIRCUIT_FAILURES", "5"))
+    HTTP_CIRCUIT_RESET = float(os.getenv("HTTP_CIRCUIT_RESET", "30"))
+
+    # Connection pool of the shared engine used by the raw-SQL helpers in database/fetch_data.py
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "10"))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    SETTINGS_CACHE_MISS_TTL = int(os.getenv("SETTINGS_CACHE_MISS_TTL", "60"))
+    STATE_STORE_PATH = os.getenv("STATE_STORE_PATH", "memory.db")
+
+    # GPIO backend of the heat-pipe relays: auto (RPi.GPIO on a Raspberry Pi, simulator elsewhere), rpi, gpiod or
+    # simulator; RELAY_GPIO_CHIP is the character device used by gpiod
+    RELAY_BACKEND = os.getenv("RELAY_BACKEND", "auto")
+    RELAY_GPIO_CHIP = os.getenv("RELAY_GPIO_CHIP", "/dev/gpiochip0")
+    # Seconds until the scheduler leader applies relay states recorded by other worker processes (manual switching)
+    RELAY_SYNC_INTERVAL = int(os.getenv("RELAY_SYNC_INTERVAL", "2"))
+    # Anti-chatter defaults of heat pipes without own values in the heating settings: feed-in deficit (W) before a
+    # running pipe switches off, minimum on/off times (s) and switches per hour (0 = unlimited); heating restarts
+    # only once the tank has cooled HEAT_PIPE_TEMP_HYSTERESIS (K) below its destination temperature
+    HEAT_PIPE_HYSTERESIS = int(os.getenv("HEAT_PIPE_HYSTERESIS", "200"))
+    HEAT_PIPE_MIN_ON_TIME = int(os.getenv("HEAT_PIPE_MIN_ON_TIME", "300"))
+    HEAT_PIPE_MIN_OFF_TIME = int(os.getenv("HEAT_PIPE_MIN_OFF_TIME", "300"))
+    HEAT_PIPE_MAX_SWITCHES = int(os.getenv("HEAT_PIPE_MAX_SWITCHES", "6"))
+    HEAT_PIPE_TEMP_HYSTERESIS = float(os.getenv("HEAT_PIPE_TEMP_HYSTERESIS", "3"))
+
+    # Metrics (utils/metrics.py, /api/metrics): seconds between the snapshots every worker process writes to
+    # SHARED_STATE_DIR for the merged export, 0 exports only the metrics of the answering process
+    METRICS_DUMP_INTERVAL = float(os.getenv("METRICS_DUMP_INTERVAL", "10"))
+
+    # File logging (utils/logging_service.py)
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+    LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+    LOG_ROTATE_INTERVAL = int(os.getenv("LOG_ROTATE_INTERVAL", "86400"))
+
+    # Telemetry history: retention in days per resolution (raw samples, 1 min, 15 min, 1 h), 0 keeps forever
+    TIMESERIES_RETENTION_RAW = int(os.getenv("TIMESERIES_RETENTION_RAW", "7"))
+    TIMESERIES_RETENTION_1M = int(os.getenv("TIMESERIES_RETENTION_1M", "30"))
+    TIMESERIES_RETENTION_15M = int(os.getenv("TIMESERIES_RETENTION_15M", "365"))
+    TIMESERIES_RETENTION_1H = int(os.getenv("TIMESERIES_RETENTION_1H", "0"))
+    # Days of Tibber prices kept in energy_prices (the planner needs the last day as fallback), 0 keeps forever
+    TIMESERIES_RETENTION_PRICES = int(os.getenv("TIMESERIES_RETENTION_PRICES", "365"))
+
+    # Local PV forecast (services/energy/pv_forecast.py): orientation of the arrays (azimuth in degrees, 180 = south),
+    # tilt of arrays without angle, share of the module power reaching the AC side, and the default resolution (s)
+    PV_AZIMUTH = float(os.getenv("PV_AZIMUTH", "180"))
+    PV_DEFAULT_TILT = float(os.getenv("PV_DEFAULT_TILT", "30"))
+    PV_SYSTEM_EFFICIENCY = float(os.getenv("PV_SYSTEM_EFFICIENCY", "0.85"))
+    PV_FORECAST_STEP = int(os.getenv("PV_FORECAST_STEP", "900"))
+
+    # Weather ingestion (services/weather_service.py): provider ("openweathermap" or "offline" for a deterministic
+    # stand-in without network), its base URL if the manufacturer has none, and how long (s) stored current
+    # conditions and forecasts stay valid before the refresh job fetches them again
+    WEATHER_PROVIDER = os.getenv("WEATHER_PROVIDER", "openweathermap")
+    WEATHER_API_URL = os.getenv("WEATHER_API_URL", "https://api.openweathermap.org/data/2.5")
+    WEATHER_CURRENT_TTL = int(os.getenv("WEATHER_CURRENT_TTL", "900"))
+    WEATHER_FORECAST_TTL = int(os.getenv("WEATHER_FORECAST_TTL", "3600"))
+
+    # Price-optimised heating (mode "Preisoptimiert"): local hour by which the tank must reach its destination
+    # temperature, upper tank limit and the feed-in tariff (€/kWh) PV surplus would otherwise earn
+    PLANNER_TARGET_HOUR = int(os.getenv("PLANNER_TARGET_HOUR", "18"))
+    PLANNER_MAX_TEMP = float(os.getenv("PLANNER_MAX_TEMP", "85"))
+    PLANNER_FEED_IN_PRICE = float(os.getenv("PLANNER_FEED_IN_PRICE", "0.08"))
+    # Seconds between two rebuilds of the heating plan from prices, forecast and settings in the scheduler leader
+    PLANNER_REFRESH_INTERVAL = int(os.getenv("PLANNER_REFRESH_INTERVAL", "300"))
@@ -0,0 +1,166 @@
+from extensions import db
+
+
+class Measurement(db.Model):
+    """
+    Represents one raw telemetry sample (append-only).
+
+    Attributes:
+        id (int): Unique identifier of the sample.
+        timestamp (int): Sample time as UNIX epoch seconds (UTC).
+        source (str): Device the value was read from (e.g. "inverter", "r4dcb08").
+        metric (str): Name of the measured quantity (e.g. "production", "channel_0").
+        value (float): Measured value (W for power, °C for temperatures).
+    """
+    __tablename__ = "measurements"
+    __table_args__ = (
+        db.Index("ix_measurements_series_time", "source", "metric", "timestamp"),
+        db.Index("ix_measurements_time", "timestamp"),
+    )
+
+    id: db.Mapped[int] = db.Column(db.BigInteger().with_variant(db.INTEGER, "sqlite"), primary_key=True)
+    timestamp: db.Mapped[int] = db.Column(db.BIGINT, nullable=False)
+    source: db.Mapped[str] = db.Column(db.VARCHAR(64), nullable=False)
+    metric: db.Mapped[str] = db.Column(db.VARCHAR(64), nullable=False)
+    value: db.Mapped[float] = db.Column(db.FLOAT, nullable=False)
+
+    def to_dict(self):
+        return {
+            "timestamp": self.timestamp,
+            "source": self.source,
+            "metric": self.metric,
+            "value": self.value,
+        }
+
+
+class MeasurementRollup(db.Model):
+    """
+    Represents the aggregate of all samples of one series within one time bucket.
+
+    Attributes:
+        resolution (int): Bucket length in seconds (60, 900 or 3600).
+        bucket (int): Bucket start as UNIX epoch seconds (UTC).
+        source (str): Device the values were read from.
+        metric (str): Name of the measured quantity.
+        count (int): Number of raw samples in the bucket.
+        total (float): Sum of all raw sample values (average = total / count).
+        minimum (float): Smallest raw sample value.
+        maximum (float): Largest raw sample value.
+    """
+    __tablename__ = "measurement_rollups"
+
+    resolution: db.Mapped[int] = db.Column(db.INTEGER, primary_key=True)
+    source: db.Mapped[str] = db.Column(db.VARCHAR(64), primary_key=True)
+    metric: db.Mapped[str] = db.Column(db.VARCHAR(64), primary_key=True)
+    bucket: db.Mapped[int] = db.Column(db.BIGINT, primary_key=True)
+    count: db.Mapped[int] = db.Column(db.INTEGER, nullable=False)
+    total: db.Mapped[float] = db.Column(db.FLOAT, nullable=False)
+    minimum: db.Mapped[float] = db.Column(db.FLOAT, nullable=False)
+    maximum: db.Mapped[float] = db.Column(db.FLOAT, nullable=False)
+
+    def to_dict(self):
+        return {
+            "timestamp": self.bucket,
+            "source": self.source,
+            "metric": self.metric,
+            "value": self.total / self.count if self.count else None,
+            "min": self.minimum,
+            "max": self.maximum,
+            "count": self.count,
+        }
+
+
+class EnergyBucket(db.Model):
+    """
+    Represents the energy flows of one hour or one local calendar day, integrated from the power samples.
+
+    Attributes:
+        resolution (int): Bucket length in seconds (3600 for hours, 86400 for days).
+        bucket (int): Bucket start as UNIX epoch seconds (local midnight for days).
+        production (float): PV production in kWh.
+        consumption (float): Total house consumption in kWh.
+        heating (float): Consumption of the heat pipes in kWh.
+        samples (int): Number of raw samples the bucket was integrated from.
+    """
+    __tablename__ = "energy_buckets"
+
+    resolution: db.Mapped[int] = db.Column(db.INTEGER, primary_key=True)
+    bucket: db.Mapped[int] = db.Column(db.BIGINT, primary_key=True)
+    production: db.Mapped[float] = db.Column(db.FLOAT, nullable=False, default=0.0)
+    consumption: db.Mapped[float] = db.Column(db.FLOAT, nullable=False, default=0.0)
+    heating: db.Mapped[float] = db.Column(db.FLOAT, nullable=False, default=0.0)
+    samples: db.Mapped[int] = db.Column(db.INTEGER, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            "timestamp": self.bucket,
+            "production": self.production,
+            "consumption": self.consumption,
+            "heating": self.heating,
+            "samples": self.samples,
+        }
+
+
+class EnergyPrice(db.Model):
+    """
+    Represents the spot price of one price interval as published by Tibber.
+
+    Attributes:
+        starts_at (int): Interval start as UNIX epoch seconds.
+        starts_at_iso (str): Interval start as returned by Tibber (local ISO time with offset).
+        total (float): Total price including taxes and fees (€/kWh).
+        fetched_at (int): UNIX epoch seconds when the price was fetched.
+    """
+    __tablename__ = "energy_prices"
+
+    starts_at: db.Mapped[int] = db.Column(db.BIGINT, primary_key=True, autoincrement=False)
+    starts_at_iso: db.Mapped[str] = db.Column(db.VARCHAR(40), nullable=False)
+    total: db.Mapped[float] = db.Column(db.FLOAT, nullable=False)
+    fetched_at: db.Mapped[int] = db.Column(db.BIGINT, nullable=False)
+
+    def to_dict(self):
+        return {
+            "total": self.total,
+            "startsAt": self.starts_at_iso,
+        }
+
+
+class WeatherData(db.Model):
+    """
+    Represents one weather reading (current conditions or a forecast step) of a location, as stored by the weather
+    refresh job.
+
+    Attributes:
+        location_key (str): Rounded coordinates ``"lat,lon"`` shared by all weather settings at the same place.
+        kind (str): ``"current"`` or ``"forecast"``.
+        valid_at (int): Time the values apply to as UNIX epoch seconds.
+        temperature (float): Air temperature in °C.
+        cloud_cover (float): Cloud cover fraction (0–1).
+        humidity (float): Relative humidity in %.
+        wind_speed (float): Wind speed in m/s.
+        description (str): Short text of the provider (e.g. "Leichter Regen").
+        fetched_at (int): UNIX epoch seconds when the reading was fetched.
+        expires_at (int): UNIX epoch seconds after which the job fetches it again.
+    """
+    __tablename__ = "weather_data"
+
+    location_key: db.Mapped[str] = db.Column(db.VARCHAR(32), primary_key=True)
+    kind: db.Mapped[str] = db.Column(db.VARCHAR(16), primary_key=True)
+    valid_at: db.Mapped[int] = db.Column(db.BIGINT, primary_key=True, autoincrement=False)
+    temperature: db.Mapped[float] = db.Column(db.FLOAT, nullable=True)
+    cloud_cover: db.Mapped[float] = db.Column(db.FLOAT, nullable=True)
+    humidity: db.Mapped[float] = db.Column(db.FLOAT, nullable=True)
+    wind_speed: db.Mapped[float] = db.Column(db.FLOAT, nullable=True)
+    description: db.Mapped[str] = db.Column(db.VARCHAR(128), nullable=True)
+    fetched_at: db.Mapped[int] = db.Column(db.BIGINT, nullable=False)
+    expires_at: db.Mapped[int] = db.Column(db.BIGINT, nullable=False)
+
+    def to_dict(self):
+        return {
+            "timestamp": self.valid_at,
+            "temperature": self.temperature,
+            "cloud_cover": self.cloud_cover,
+            "humidity": self.humidity,
+            "wind_speed": self.wind_speed,
+            "description": self.description,
+        }
@@ -0,0 +1,135 @@
+import threading
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+
+from config import Config
+from utils.logging_service import LoggingService
+from utils.metrics import metrics
+
+logging = LoggingService()
+
+DB_QUERIES = metrics.counter("viki_db_queries_total", "Executed SQL statements by operation", ("operation",))
+DB_QUERY_SECONDS = metrics.histogram("viki_db_query_seconds", "Duration of SQL statements by operation",
+                                     ("operation",))
+DB_ERRORS = metrics.counter("viki_db_errors_total", "Failed SQL statements")
+DB_POOL_EVENTS = metrics.counter("viki_db_pool_events_total", "Connection pool events of the shared engine",
+                                 ("event",))
+DB_POOL_CHECKED_OUT = metrics.gauge("viki_db_pool_checked_out", "Connections currently checked out of the shared pool")
+DB_POOL_SIZE = metrics.gauge("viki_db_pool_size", "Configured size of the shared pool")
+
+_engine: Engine | None = None
+_engine_lock = threading.Lock()
+
+_pool_stats_lock = threading.Lock()
+_pool_stats: dict = {
+    "connects": 0,
+    "checkouts": 0,
+    "checkins": 0,
+    "invalidations": 0,
+}
+
+
+def get_engine() -> Engine:
+    """
+    Returns the process-wide SQLAlchemy engine for the raw-SQL helpers.
+
+    The engine (and with it the connection pool) is created on first use and reused afterward, so a query only pays
+    for a pool checkout instead of a new TCP + auth handshake. Pool sizing is configured via ``DB_POOL_*``; connections
+    are pre-pinged on checkout so a database restart does not surface as query errors.
+
+    Returns:
+        Engine: The shared engine.
+    """
+    global _engine
+
+    if _engine is not None:
+        return _engine
+
+    with _engine_lock:
+        if _engine is None:
+            _engine = _create_engine(Config.SQLALCHEMY_DATABASE_URI)
+    return _engine
+
+
+def get_pool_stats() -> dict:
+    """
+    Returns pool usage counters of the shared engine.
+
+    Returns:
+        dict: ``connects``, ``checkouts``, ``checkins`` and ``invalidations`` since process start, plus the current
+        ``checked_out`` connections and the configured ``pool_size`` (``None`` for pools without a fixed size).
+    """
+    with _pool_stats_lock:
+        stats: dict = dict(_pool_stats)
+
+    pool = _engine.pool if _engine is not None else None
+    stats["checked_out"] = pool.checkedout() if hasattr(pool, "checkedout") else 0
+    stats["pool_size"] = pool.size() if hasattr(pool, "size") else None
+    return stats
+
+
+def _create_engine(uri: str) -> Engine:
+    options: dict = {"pool_pre_ping": True}
+
+    if not make_url(uri).get_backend_name().startswith("sqlite"):
+        options.update(
+            pool_size=Config.DB_POOL_SIZE,
+            max_overflow=Config.DB_MAX_OVERFLOW,
+            pool_timeout=Config.DB_POOL_TIMEOUT,
+            pool_recycle=Config.DB_POOL_RECYCLE,
+        )
+
+    engine: Engine = create_engine(uri, **options)
+
+    event.listen(engine, "connect", lambda *args: _count("connects"))
+    event.listen(engine, "checkout", lambda *args: _count("checkouts"))
+    event.listen(engine, "checkin", lambda *args: _count("checkins"))
+    event.listen(engine, "invalidate", lambda *args: _count("invalidations"))
+
+    logging.info(f"[DATABASE] Shared engine created with options {sorted(options)}")
+    return engine
+
+
+def _count(name: str) -> None:
+    with _pool_stats_lock:
+        _pool_stats[name] += 1
+    DB_POOL_EVENTS.inc(1, name)
+
+
+def _collect_pool_metrics() -> None:
+    stats: dict = get_pool_stats()
+    DB_POOL_CHECKED_OUT.set(stats["checked_out"])
+    if stats["pool_size"] is not None:
+        DB_POOL_SIZE.set(stats["pool_size"])
+
+
+# Statement counts and durations of every engine, the shared one and the one of Flask-SQLAlchemy
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started: float = conn.info["query_started"].pop()
+    operation: str = _operation(statement)
+    DB_QUERIES.inc(1, operation)
+    DB_QUERY_SECONDS.observe(time.perf_counter() - started, operation)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context) -> None:
+    DB_ERRORS.inc()
+    started: list | None = context.connection.info.get("query_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+def _operation(statement: str) -> str:
+    keyword: str = statement.lstrip()[:6].upper()
+    return keyword if keyword in ("SELECT", "INSERT", "UPDATE", "DELETE") else "OTHER"
+
+
+metrics.add_collector(_collect_pool_metrics)
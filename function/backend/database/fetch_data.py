@@ -1,19 +1,18 @@
-import os
 import ast
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from sqlalchemy.exc import OperationalError, ProgrammingError, ArgumentError, StatementError, DBAPIError, InterfaceError
-from dotenv import load_dotenv
+from config import Config
+from database.engine import get_engine
+from database.settings_cache import settings_cache
 from utils.logging_service import LoggingService
 
-DATABASE_URI = os.getenv("DATABASE_URL")
 logging = LoggingService()
 
-load_dotenv(os.path.join(os.path.dirname(__file__), "../../.env"))
-
 
 def fetch_values(table_name: str, description: str, value_column: str):
     """
-    Retrieves a specific value from a database table based on a description filter.
+    Retrieves a specific value from a database table based on a description filter. Results are served from the
+    settings cache until ``table_name`` is written.
 
     Args:
         table_name (str): The name of the table to query.
@@ -27,6 +26,14 @@ def fetch_values(table_name: str, description: str, value_column: str):
         sqlalchemy.exc.SQLAlchemyError: If a database error occurs (connection, syntax, etc.).
         TypeError, IndexError: If the result set is not in the expected format.
     """
+    return settings_cache.get(
+        ("fetch_values", table_name, description, value_column),
+        (table_name,),
+        lambda: _query_value(table_name, description, value_column)
+    )
+
+
+def _query_value(table_name: str, description: str, value_column: str):
     ALLOWED_TABLES = {
         'manufacturer', 'energy_settings', 'heating_settings', 
         'sensors', 'tank_settings', 'location'
@@ -45,8 +52,7 @@ def fetch_values(table_name: str, description: str, value_column: str):
         return None
     
     try:
-        engine = create_engine(DATABASE_URI)
-        with engine.connect() as connection:
+        with get_engine().connect() as connection:
             query = text(f"SELECT {value_column} FROM {table_name} WHERE description = :description")
             result = connection.execute(query, {"description": description}).fetchone()
 
@@ -59,9 +65,11 @@ def fetch_values(table_name: str, description: str, value_column: str):
         return None
 
 
+@settings_cache.cached('sensors', 'manufacturer', 'tank_settings')
 def fetch_r4dcb08_sensor_setting() -> dict | None:
     """
-    Fetches sensor settings for the R4DCB08 measuring device and parses connection parameters.
+    Fetches sensor settings for the R4DCB08 measuring device and parses connection parameters. Cached until the
+    sensor, manufacturer or tank settings change.
 
     Returns:
         dict | None: A dictionary containing parsed connection settings if available,
@@ -73,8 +81,7 @@ def fetch_r4dcb08_sensor_setting() -> dict | None:
         IndexError: If expected result structure is not met.
     """
     try:
-        engine = create_engine(DATABASE_URI)
-        with engine.connect() as connection:
+        with get_engine().connect() as connection:
             query = text("""
                 SELECT
                     s.api_key,
@@ -124,24 +131,25 @@ def fetch_r4dcb08_sensor_setting() -> dict | None:
         return None
 
 
+@settings_cache.cached('heating_settings', 'manufacturer')
 def fetch_heat_pipe_setting() -> dict | None:
     """
     Retrieves heating element and buffer settings for heat pipes from the database.
 
     Filters only entries containing "Heizstab" in the manufacturer description
-    and returns data for the first three entries.
+    and returns data for the first three entries. Cached until the heating or manufacturer settings change.
 
     Returns:
-        dict | None: A dictionary with keys 'pipe_1'–'pipe_3' and 'buffer_1'–'buffer_3' if
-                     enough valid entries are found, otherwise None.
+        dict | None: A dictionary with keys 'pipe_1'–'pipe_3' and 'buffer_1'–'buffer_3' plus the anti-chatter
+                     settings 'hysteresis_N', 'min_on_N', 'min_off_N' and 'max_switches_N' if enough valid
+                     entries are found, otherwise None.
 
     Raises:
         sqlalchemy.exc.SQLAlchemyError: If any SQL or connection error occurs.
         IndexError, TypeError, AttributeError: If result structure is unexpected or incomplete.
     """
     try:
-        engine = create_engine(DATABASE_URI)
-        with engine.connect() as connection:
+        with get_engine().connect() as connection:
             query = text("""
                 SELECT
                     m.description,
@@ -149,7 +157,11 @@ def fetch_heat_pipe_setting() -> dict | None:
                     h.api_key,
                     m.power_factor,
                     m.power_size,
-                    h.buffer
+                    h.buffer,
+                    h.hysteresis,
+                    h.min_on_time,
+                    h.min_off_time,
+                    h.max_switches_per_hour
                 FROM
                     heating_settings h
                 JOIN
@@ -173,8 +185,17 @@ def fetch_heat_pipe_setting() -> dict | None:
                 power_size = row[4] if row[4] is not None else 2000
                 buffer = row[5] if row[5] is not None else 0
                 
+                hysteresis = row[6] if row[6] is not None else Config.HEAT_PIPE_HYSTERESIS
+                min_on = row[7] if row[7] is not None else Config.HEAT_PIPE_MIN_ON_TIME
+                min_off = row[8] if row[8] is not None else Config.HEAT_PIPE_MIN_OFF_TIME
+                max_switches = row[9] if row[9] is not None else Config.HEAT_PIPE_MAX_SWITCHES
+
                 heat_pipe_config[f'pipe_{idx}'] = int(power_factor * power_size)
                 heat_pipe_config[f'buffer_{idx}'] = int(buffer)
+                heat_pipe_config[f'hysteresis_{idx}'] = int(hysteresis)
+                heat_pipe_config[f'min_on_{idx}'] = int(min_on)
+                heat_pipe_config[f'min_off_{idx}'] = int(min_off)
+                heat_pipe_config[f'max_switches_{idx}'] = int(max_switches)
                 
             except (TypeError, ValueError, IndexError) as e:
                 logging.error(f"Fehler beim Verarbeiten von Heizstab {idx}: {e}")
@@ -189,3 +210,214 @@ def fetch_heat_pipe_setting() -> dict | None:
     except (OperationalError, ProgrammingError, InterfaceError, StatementError, DBAPIError, ArgumentError) as e:
         logging.error(f"DATENBANKFEHLER: {e}")
         return None
+
+
+@settings_cache.cached('heating_settings', 'manufacturer')
+def fetch_relay_pins() -> dict | None:
+    """
+    Retrieves the configured GPIO pin of the heat-pipe relays. Relay N belongs to the N-th heat pipe (same selection
+    and order as ``fetch_heat_pipe_setting``). Cached until the heating or manufacturer settings change.
+
+    Returns:
+        dict: ``{relay: pin}`` for all heat pipes with a configured pin.
+        None: On database errors (only cached for ``SETTINGS_CACHE_MISS_TTL``).
+    """
+    try:
+        with get_engine().connect() as connection:
+            query = text("""
+                SELECT
+                    h.gpio_pin
+                FROM
+                    heating_settings h
+                JOIN
+                    manufacturer m ON h.manufacturer = m.id
+                WHERE
+                    m.description LIKE '%Heizstab%'
+                ORDER BY h.id
+                LIMIT 3;
+            """)
+            result = connection.execute(query).fetchall()
+        return {idx: row[0] for idx, row in enumerate(result, start=1) if row[0] is not None}
+
+    except (OperationalError, ProgrammingError, InterfaceError, StatementError, DBAPIError, ArgumentError) as e:
+        logging.error(f"DATENBANKFEHLER: {e}")
+        return None
+
+
+@settings_cache.cached('photovoltaic_settings', 'manufacturer', 'location')
+def fetch_pv_arrays() -> list[dict] | None:
+    """
+    Retrieves the geometry of all configured PV arrays together with the coordinates of their location. Cached until
+    the photovoltaic, manufacturer or location settings change.
+
+    Returns:
+        list[dict]: One entry per array with 'id', 'location', 'latitude', 'longitude', 'tilt' (degrees, None if not
+                    set) and 'peak_power' (W, module_count × power_size × power_factor). Arrays without module count
+                    or module power are skipped.
+        None: On database errors (only cached for ``SETTINGS_CACHE_MISS_TTL``).
+    """
+    try:
+        with get_engine().connect() as connection:
+            query = text("""
+                SELECT
+                    p.id,
+                    p.location,
+                    l.latitude,
+                    l.longitude,
+                    p.angle,
+                    p.module_count,
+                    m.power_size,
+                    m.power_factor
+                FROM
+                    photovoltaic_settings p
+                JOIN
+                    manufacturer m ON p.manufacturer = m.id
+                JOIN
+                    location l ON p.location = l.id
+                ORDER BY p.id;
+            """)
+            result = connection.execute(query).fetchall()
+
+        return [
+            {
+                "id": row[0],
+                "location": row[1],
+                "latitude": float(row[2]),
+                "longitude": float(row[3]),
+                "tilt": float(row[4]) if row[4] is not None else None,
+                "peak_power": float(row[5] * row[6] * (row[7] if row[7] is not None else 1.0)),
+            }
+            for row in result if row[5] and row[6]
+        ]
+
+    except (OperationalError, ProgrammingError, InterfaceError, StatementError, DBAPIError, ArgumentError) as e:
+        logging.error(f"DATENBANKFEHLER: {e}")
+        return None
+
+
+@settings_cache.cached('weather_settings', 'manufacturer', 'location')
+def fetch_weather_sources() -> list[dict] | None:
+    """
+    Retrieves all weather settings together with the coordinates of their location and the provider URL of their
+    manufacturer. Cached until the weather, manufacturer or location settings change.
+
+    Returns:
+        list[dict]: One entry per weather setting with 'id', 'location', 'latitude', 'longitude', 'api_key' and 'url'
+                    (None if the manufacturer has none).
+        None: On database errors (only cached for ``SETTINGS_CACHE_MISS_TTL``).
+    """
+    try:
+        with get_engine().connect() as connection:
+            query = text("""
+                SELECT
+                    w.id,
+                    w.location,
+                    l.latitude,
+                    l.longitude,
+                    w.api_key,
+                    m.url
+                FROM
+                    weather_settings w
+                JOIN
+                    location l ON w.location = l.id
+                LEFT JOIN
+                    manufacturer m ON w.manufacturer = m.id
+                ORDER BY w.id;
+            """)
+            result = connection.execute(query).fetchall()
+
+        return [
+            {
+                "id": row[0],
+                "location": row[1],
+                "latitude": float(row[2]),
+                "longitude": float(row[3]),
+                "api_key": row[4] or None,
+                "url": row[5] or None,
+            }
+            for row in result
+        ]
+
+    except (OperationalError, ProgrammingError, InterfaceError, StatementError, DBAPIError, ArgumentError) as e:
+        logging.error(f"DATENBANKFEHLER: {e}")
+        return None
+
+
+@settings_cache.cached('tank_settings', 'sensors', 'manufacturer')
+def fetch_tank_sensors() -> list[dict] | None:
+    """
+    Retrieves all tanks with their temperature sensors on the *R4DCB08* module. Cached until the tank, sensor or
+    manufacturer settings change.
+
+    Returns:
+        list[dict]: One entry per tank (ordered by id) with 'id', 'description', 'dest_temp', 'heat_pipe' and
+                    'sensors', a list of ``{'id', 'position', 'channel'}`` ordered by position (bottom first).
+                    'channel' is None if not configured.
+        None: On database errors (only cached for ``SETTINGS_CACHE_MISS_TTL``).
+    """
+    try:
+        with get_engine().connect() as connection:
+            query = text("""
+                SELECT
+                    t.id,
+                    t.description,
+                    t.dest_temp,
+                    t.heat_pipe,
+                    s.id,
+                    s.measuring_position,
+                    s.channel
+                FROM
+                    tank_settings t
+                LEFT JOIN
+                    (sensors s JOIN manufacturer m ON s.manufacturer = m.id AND m.model_type = 'DS18B20')
+                    ON s.measuring_device = t.id
+                ORDER BY t.id, s.id;
+            """)
+            result = connection.execute(query).fetchall()
+
+        tanks: dict = {}
+        for row in result:
+            tank: dict = tanks.setdefault(row[0], {
+                "id": row[0],
+                "description": row[1],
+                "dest_temp": float(row[2]) if row[2] is not None else None,
+                "heat_pipe": bool(row[3]) if row[3] is not None else None,
+                "sensors": [],
+            })
+            if row[4] is not None:
+                tank["sensors"].append({"id": row[4], "position": _position(row[5]), "channel": row[6]})
+
+        for tank in tanks.values():
+            tank["sensors"].sort(key=lambda sensor: (sensor["position"] is None, sensor["position"] or 0, sensor["id"]))
+        return list(tanks.values())
+
+    except (OperationalError, ProgrammingError, InterfaceError, StatementError, DBAPIError, ArgumentError) as e:
+        logging.error(f"DATENBANKFEHLER: {e}")
+        return None
+
+
+def _position(value) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@settings_cache.cached('tank_settings')
+def fetch_tank_volumes() -> list[int | None] | None:
+    """
+    Retrieves the volumes (liters) of all configured tanks in the order of their ids. Cached until the tank settings
+    change.
+
+    Returns:
+        list[int | None]: One volume per tank, ``None`` for tanks without volume.
+        None: On database errors (only cached for ``SETTINGS_CACHE_MISS_TTL``).
+    """
+    try:
+        with get_engine().connect() as connection:
+            result = connection.execute(text("SELECT volume FROM tank_settings ORDER BY id")).fetchall()
+        return [row[0] for row in result]
+
+    except (OperationalError, ProgrammingError, InterfaceError, StatementError, DBAPIError, ArgumentError) as e:
+        logging.error(f"DATENBANKFEHLER: {e}")
+        return None
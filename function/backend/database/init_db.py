@@ -1,6 +1,7 @@
 from .users import User, Role
 from .settings import ManufacturerSetting, ManufacturerCategorySetting, LocationSetting
 from extensions import db
+from sqlalchemy import inspect, text
 import pandas as pd
 
 
@@ -9,6 +10,33 @@ CATEGORY_PATH = r'database/resources/category.csv'
 LOCATION_PATH = r'database/resources/location.csv'
 
 
+def upgrade_schema() -> None:
+    """
+    Adds columns that were added to the models after their table was created (``db.create_all`` only creates missing
+    tables). Only nullable columns are added, existing rows get NULL.
+    :return: None
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            if not column.nullable:
+                print(f"❌ Spalte {table.name}.{column.name} kann nicht automatisch ergänzt werden (NOT NULL).")
+                continue
+
+            column_type = column.type.compile(dialect=db.engine.dialect)
+            with db.engine.begin() as connection:
+                connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+            print(f"✅ Spalte {table.name}.{column.name} ergänzt.")
+
+
 def seed_roles() -> None:
     """
     Create initial roles in database
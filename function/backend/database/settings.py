@@ -116,18 +116,24 @@ class TankSetting(db.Model):
         id (int): Unique identifier for the tank.
         description (str): Description of the tank or its use.
         volume (int): Optional volume in liters or relevant unit.
+        dest_temp (float): Optional destination temperature in °C.
+        heat_pipe (bool): Optional flag, True for the tank heated by the heat pipes.
     """
     __tablename__ = "tank_settings"
 
     id: db.Mapped[int] = db.Column(db.INTEGER, primary_key=True)
     description: db.Mapped[str] = db.Column(db.VARCHAR(256), nullable=False)
     volume: db.Mapped[int] = db.Column(db.INTEGER, nullable=True)
+    dest_temp: db.Mapped[float] = db.Column(db.FLOAT, nullable=True)
+    heat_pipe: db.Mapped[bool] = db.Column(db.BOOLEAN, nullable=True)
 
     def to_dict(self):
         return {
             "id": self.id,
             "description": self.description,
-            "volume": self.volume
+            "volume": self.volume,
+            "dest_temp": self.dest_temp,
+            "heat_pipe": self.heat_pipe
         }
 
 
@@ -142,7 +148,8 @@ class SensorSetting(db.Model):
         ip (str): IP address of the sensor device.
         api_key (str): Optional API key for accessing the sensor.
         measuring_device (TankSetting): Optional foreign key to a connected tank.
-        measuring_position (str): Description of the sensor's position in the tank.
+        measuring_position (str): Position of the sensor in the tank (1 = bottom).
+        channel (int): Optional input channel on the temperature module (0-based).
     """
     __tablename__ = "sensors"
 
@@ -154,6 +161,7 @@ class SensorSetting(db.Model):
     api_key: db.Mapped[str] = db.Column(db.VARCHAR(512), nullable=True)
     measuring_device: db.Mapped["TankSetting"] = db.mapped_column(ForeignKey(TankSetting.id), nullable=True)
     measuring_position: db.Mapped[str] = db.Column(db.VARCHAR(128), nullable=True)
+    channel: db.Mapped[int] = db.Column(db.INTEGER, nullable=True)
 
     def to_dict(self):
         return {
@@ -163,7 +171,8 @@ class SensorSetting(db.Model):
             "ip": self.ip,
             "api_key": self.api_key,
             "measuring_device": self.measuring_device,
-            "measuring_position": self.measuring_position
+            "measuring_position": self.measuring_position,
+            "channel": self.channel
         }
 
 
@@ -246,6 +255,11 @@ class HeatingSetting(db.Model):
         ip (str): IP address of the heating device.
         api_key (str): Optional API key for remote access.
         buffer (int): Optional buffer capacity or identifier.
+        gpio_pin (int): Optional BCM pin of the relay switching this heat pipe.
+        hysteresis (int): Optional grid draw in W tolerated before a running heat pipe switches off.
+        min_on_time (int): Optional minimum on time in seconds.
+        min_off_time (int): Optional minimum off time in seconds.
+        max_switches_per_hour (int): Optional switching limit per hour, 0 for unlimited.
     """
     __tablename__ = "heating_settings"
 
@@ -256,6 +270,11 @@ class HeatingSetting(db.Model):
     ip: db.Mapped[str] = db.Column(db.VARCHAR(16), nullable=False)
     api_key: db.Mapped[str] = db.Column(db.VARCHAR(512), nullable=True)
     buffer: db.Mapped[int] = db.Column(db.INTEGER, nullable=True)
+    gpio_pin: db.Mapped[int] = db.Column(db.INTEGER, nullable=True)
+    hysteresis: db.Mapped[int] = db.Column(db.INTEGER, nullable=True)
+    min_on_time: db.Mapped[int] = db.Column(db.INTEGER, nullable=True)
+    min_off_time: db.Mapped[int] = db.Column(db.INTEGER, nullable=True)
+    max_switches_per_hour: db.Mapped[int] = db.Column(db.INTEGER, nullable=True)
 
     def to_dict(self):
         return {
@@ -264,7 +283,12 @@ class HeatingSetting(db.Model):
             "manufacturer": self.manufacturer,
             "ip": self.ip,
             "api_key": self.api_key,
-            "buffer": self.buffer
+            "buffer": self.buffer,
+            "gpio_pin": self.gpio_pin,
+            "hysteresis": self.hysteresis,
+            "min_on_time": self.min_on_time,
+            "min_off_time": self.min_off_time,
+            "max_switches_per_hour": self.max_switches_per_hour
         }
 
 
@@ -0,0 +1,78 @@
+import functools
+import threading
+import time
+from typing import Callable
+
+from config import Config
+from utils.logging_service import LoggingService
+from utils.shared_store import SharedStore, shared_store
+
+logging = LoggingService()
+
+
+class SettingsCache:
+    """
+    Versioned in-memory cache for rarely changing settings rows.
+
+    Every cached value remembers the versions of the tables it was loaded from. A table version is the ``(inode,
+    mtime)`` of a marker file in the shared store, which ``invalidate`` replaces on every settings write. Checking an
+    entry therefore costs one ``stat`` per table and no database query, and an invalidation issued by any worker
+    process is seen by all others on their next lookup.
+
+    Empty results (``None``) are only cached for ``SETTINGS_CACHE_MISS_TTL`` seconds, so a missing configuration or a
+    temporary database error is retried without waiting for a settings write.
+    """
+
+    def __init__(self, store: SharedStore = shared_store, miss_ttl: int = None):
+        self.store = store
+        self.miss_ttl = miss_ttl if miss_ttl is not None else Config.SETTINGS_CACHE_MISS_TTL
+        self._entries: dict = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(table: str) -> str:
+        return f"settings_{table}"
+
+    def get(self, key: tuple, tables: tuple[str, ...], loader: Callable):
+        """
+        Returns the cached value for ``key`` or calls ``loader`` if it is missing or one of ``tables`` changed since.
+
+        Cached values are shared between callers and must not be mutated.
+        """
+        versions: tuple = tuple(self.store.version(self._key(table)) for table in tables)
+
+        entry: tuple | None = self._entries.get(key)
+        if entry is not None and entry[0] == versions and (entry[2] is None or time.monotonic() < entry[2]):
+            return entry[1]
+
+        value = loader()
+        expires_at: float | None = time.monotonic() + self.miss_ttl if value is None else None
+        with self._lock:
+            self._entries[key] = (versions, value, expires_at)
+        return value
+
+    def invalidate(self, *tables: str) -> None:
+        """
+        Marks ``tables`` as changed in every worker process.
+        """
+        for table in tables:
+            self.store.write(self._key(table), time.time())
+        logging.debug(f"[SETTINGSCACHE] Invalidated {', '.join(tables)}")
+
+    def cached(self, *tables: str) -> Callable:
+        """
+        Decorator caching the result of a settings loader per argument tuple until one of ``tables`` changes.
+        """
+        def decorator(func: Callable) -> Callable:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                key: tuple = (func.__qualname__, args, tuple(sorted(kwargs.items())))
+                return self.get(key, tables, lambda: func(*args, **kwargs))
+
+            wrapper.uncached = func
+            return wrapper
+
+        return decorator
+
+
+settings_cache = SettingsCache()
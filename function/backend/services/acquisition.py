@@ -0,0 +1,335 @@
+"""
+Acquisition engine: polls all devices (inverter, temperature module, Tibber, weather, …) concurrently on an asyncio
+loop in a background thread and hands the results to an in-process bus, so a slow or offline device cannot delay the
+others or the control decision.
+"""
+
+import asyncio
+import contextlib
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+from config import Config
+from utils.logging_service import LoggingService
+from utils.metrics import metrics
+
+logging = LoggingService()
+
+POLL_SECONDS = metrics.histogram("viki_acquisition_poll_seconds", "Duration of device polls", ("device",))
+POLL_FAILURES = metrics.counter("viki_acquisition_failures_total", "Device polls without result",
+                                ("device", "reason"))
+BUS_DROPPED = metrics.counter("viki_bus_dropped_total", "Bus messages replaced before delivery", ("topic",))
+
+
+class Subscription:
+    """
+    Delivers the messages of one topic to a handler on its own worker thread. Only the latest undelivered message is
+    kept: while the handler is busy, newer messages replace older ones (counted in ``dropped``), so a slow consumer
+    always works on fresh data and never builds a queue.
+    """
+
+    def __init__(self, topic: str, handler: Callable, context: Callable = contextlib.nullcontext):
+        self.topic = topic
+        self.handler = handler
+        self.context = context
+        self.delivered: int = 0
+        self.dropped: int = 0
+        self.errors: int = 0
+        self._lock = threading.Lock()
+        self._pending: tuple | None = None
+        self._running: bool = False
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"bus-{topic}")
+
+    def deliver(self, value, timestamp: float) -> None:
+        with self._lock:
+            if self._pending is not None:
+                self.dropped += 1
+                BUS_DROPPED.inc(1, self.topic)
+            self._pending = (value, timestamp)
+            if self._running:
+                return
+            self._running = True
+        self._executor.submit(self._drain)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    def _drain(self) -> None:
+        while True:
+            with self._lock:
+                message: tuple | None = self._pending
+                self._pending = None
+                if message is None:
+                    self._running = False
+                    return
+            try:
+                with self.context():
+                    self.handler(message[0])
+                self.delivered += 1
+            except Exception as err:
+                self.errors += 1
+                logging.error(f"[BUS] Handler of '{self.topic}' failed: {err}")
+
+
+class AcquisitionBus:
+    """
+    In-process publish/subscribe bus of the acquisition engine. Keeps the latest value of every topic and fans it out
+    to the subscriptions of the topic. Thread-safe; ``publish`` never blocks on a subscriber.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latest: dict[str, tuple] = {}
+        self._subscriptions: dict[str, list[Subscription]] = {}
+
+    def subscribe(self, topic: str, handler: Callable, context: Callable = contextlib.nullcontext) -> Subscription:
+        """
+        Calls ``handler(value)`` for new messages of ``topic``, see ``Subscription``. ``context`` is entered around
+        every call (e.g. ``app.app_context``).
+        """
+        subscription = Subscription(topic, handler, context)
+        with self._lock:
+            self._subscriptions.setdefault(topic, []).append(subscription)
+        return subscription
+
+    def publish(self, topic: str, value, timestamp: float = None) -> None:
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            self._latest[topic] = (value, timestamp)
+            subscriptions: list = list(self._subscriptions.get(topic, ()))
+        for subscription in subscriptions:
+            subscription.deliver(value, timestamp)
+
+    def latest(self, topic: str) -> tuple:
+        """
+        Returns ``(value, timestamp)`` of the last message of ``topic``, ``(None, None)`` if there was none.
+        """
+        with self._lock:
+            return self._latest.get(topic, (None, None))
+
+    def close(self) -> None:
+        with self._lock:
+            subscriptions: list = [sub for subs in self._subscriptions.values() for sub in subs]
+        for subscription in subscriptions:
+            subscription.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                topic: [{"delivered": sub.delivered, "dropped": sub.dropped, "errors": sub.errors} for sub in subs]
+                for topic, subs in self._subscriptions.items()
+            }
+
+
+class Device:
+    """
+    One polled device of the acquisition engine.
+
+    ``read`` is a blocking callable (HTTP, Modbus, database); it runs on a worker thread of its own, so devices never
+    wait for each other. A read that exceeds ``timeout`` is abandoned: its result is discarded and the device skips its
+    polls until the stuck read returned (backpressure), instead of piling up further blocked calls.
+
+    Args:
+        name (str): Device name, also the default bus topic.
+        read (Callable): Returns the value to publish; None means no data and counts as a failed poll.
+        interval (float): Seconds between two polls.
+        timeout (float): Time budget of one read in seconds, default ``ACQUISITION_TIMEOUT_SHARE`` of the interval.
+        topic (str): Bus topic of the results, default ``name``.
+    """
+
+    def __init__(self, name: str, read: Callable, interval: float, timeout: float = None, topic: str = None):
+        self.name = name
+        self.read = read
+        self.interval = float(interval)
+        self.timeout = float(timeout) if timeout else Config.ACQUISITION_TIMEOUT_SHARE * self.interval
+        self.topic = topic or name
+        self.polls: int = 0
+        self.errors: int = 0
+        self.timeouts: int = 0
+        self.skipped: int = 0
+        self.last_ms: float | None = None
+        self.max_ms: float = 0.0
+        self.last_success: float | None = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"acq-{name}")
+        self._in_flight: Future | None = None
+
+    @property
+    def busy(self) -> bool:
+        return self._in_flight is not None and not self._in_flight.done()
+
+    def to_dict(self) -> dict:
+        return {
+            "interval": self.interval,
+            "timeout": self.timeout,
+            "polls": self.polls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "skipped": self.skipped,
+            "last_ms": round(self.last_ms, 1) if self.last_ms is not None else None,
+            "max_ms": round(self.max_ms, 1),
+            "last_success": self.last_success,
+        }
+
+
+class AcquisitionEngine:
+    """
+    Runs an asyncio event loop in a daemon thread with one polling task per ``Device``.
+
+    Polls follow a fixed rate per device; a device that falls behind skips the missed polls instead of catching up.
+    Results are published to ``bus``, consumers (control loop, telemetry cache, time-series store) subscribe there.
+    Reads and subscribers run inside the application context of the Flask app given to ``init_app``. Only the scheduler
+    leader should start the engine, see ``LeaderScheduler.on_leader``.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.bus = AcquisitionBus()
+        self.devices: dict[str, Device] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._stopping: asyncio.Event | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def init_app(self, app) -> None:
+        self.app = app
+
+    def context(self):
+        return self.app.app_context() if self.app is not None else contextlib.nullcontext()
+
+    def add_device(self, device: Device) -> Device:
+        if self.running:
+            raise RuntimeError("Devices must be added before the engine starts")
+        self.devices[device.name] = device
+        return device
+
+    def subscribe(self, topic: str, handler: Callable) -> Subscription:
+        return self.bus.subscribe(topic, handler, self.context)
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name="acquisition", daemon=True)
+        self._thread.start()
+        logging.info(f"[ACQUISITION] Polling {', '.join(self.devices) or 'no devices'}")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if not self.running:
+            return
+        self._loop.call_soon_threadsafe(self._stopping.set)
+        self._thread.join(timeout)
+        for device in self.devices.values():
+            device._executor.shutdown(wait=False)
+        self.bus.close()
+
+    def stats(self) -> dict:
+        """
+        Returns the poll statistics per device and the delivery statistics per bus topic of this process.
+        """
+        return {
+            "devices": {name: device.to_dict() for name, device in self.devices.items()},
+            "bus": self.bus.stats(),
+        }
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._main())
+        finally:
+            self._loop.close()
+
+    async def _main(self) -> None:
+        self._stopping = asyncio.Event()
+        tasks: list = [asyncio.create_task(self._poll_forever(device)) for device in self.devices.values()]
+        await self._stopping.wait()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _poll_forever(self, device: Device) -> None:
+        next_run: float = time.monotonic()
+        while True:
+            await self._poll(device)
+            next_run += device.interval
+            now: float = time.monotonic()
+            if next_run < now:
+                missed: int = int((now - next_run) // device.interval) + 1
+                device.skipped += missed
+                POLL_FAILURES.inc(missed, device.name, "late")
+                next_run += missed * device.interval
+            await asyncio.sleep(next_run - now)
+
+    async def _poll(self, device: Device) -> None:
+        if device.busy:
+            device.skipped += 1
+            POLL_FAILURES.inc(1, device.name, "busy")
+            return
+
+        started: float = time.perf_counter()
+        device.polls += 1
+        device._in_flight = self._loop.run_in_executor(device._executor, self._read, device)
+        try:
+            value = await asyncio.wait_for(asyncio.shield(device._in_flight), device.timeout)
+        except asyncio.TimeoutError:
+            device.timeouts += 1
+            POLL_FAILURES.inc(1, device.name, "timeout")
+            logging.warning(f"[ACQUISITION] {device.name} exceeded its {device.timeout:.1f}s budget")
+            return
+        except Exception as err:
+            device.errors += 1
+            POLL_FAILURES.inc(1, device.name, "error")
+            logging.error(f"[ACQUISITION] Reading {device.name} failed: {err}")
+            return
+        finally:
+            device.last_ms = (time.perf_counter() - started) * 1000
+            device.max_ms = max(device.max_ms, device.last_ms)
+            POLL_SECONDS.observe(device.last_ms / 1000, device.name)
+
+        if value is None:
+            device.errors += 1
+            POLL_FAILURES.inc(1, device.name, "empty")
+            return
+
+        device.last_success = time.time()
+        self.bus.publish(device.topic, value, device.last_success)
+
+    def _read(self, device: Device):
+        with self.context():
+            return device.read()
+
+
+acquisition_engine = AcquisitionEngine()
+
+
+def configure_default_devices(engine: AcquisitionEngine = acquisition_engine) -> None:
+    """
+    Registers the devices that otherwise run as separate scheduler jobs: the inverter (``FAST_CONTROL_INTERVAL`` or
+    ``SCHEDULER_INTERVAL``, followed by the heat-pipe control), the *R4DCB08* module, Tibber prices and weather.
+    """
+    from services.energy.inverter import PowerFollower, read_live_data_from_inverter
+    from services.energy.price_cache import refresh_price_cache
+    from services.temperature.modbus_temp_module import publish_temperatures, read_all_channels_from_r4dcb08
+    from services.weather_service import refresh_weather
+
+    interval: float = Config.FAST_CONTROL_INTERVAL or Config.SCHEDULER_INTERVAL
+    follower = PowerFollower(interval=interval)
+    # Connect and read share the budget, a late inverter answer is worth less than the next poll
+    inverter: Device = engine.add_device(Device(
+        "inverter",
+        lambda: read_live_data_from_inverter(timeout=(inverter.timeout / 2, inverter.timeout / 2), retries=0),
+        interval,
+        Config.FAST_CONTROL_TIMEOUT or None,
+    ))
+    engine.subscribe("inverter", follower.process)
+
+    engine.add_device(Device("r4dcb08", read_all_channels_from_r4dcb08, Config.SCHEDULER_INTERVAL))
+    engine.subscribe("r4dcb08", publish_temperatures)
+
+    # Both refresh jobs check their own TTLs and store the results themselves; the bus only carries whether they did
+    engine.add_device(Device("tibber", refresh_price_cache, 600, Config.HTTP_TIMEOUT * (Config.HTTP_RETRIES + 1)))
+    engine.add_device(Device("weather", refresh_weather, 300, Config.HTTP_TIMEOUT * (Config.HTTP_RETRIES + 1) * 2))
@@ -0,0 +1,233 @@
+"""
+Hourly and daily energy aggregates (kWh) integrated from the recorded power samples.
+"""
+
+import datetime
+import functools
+import time
+from collections import defaultdict
+
+from sqlalchemy import and_, func, insert, or_, select
+
+from database.analyse import EnergyBucket, Measurement
+from extensions import db
+from services.timeseries_service import ROLLUP_DELAY
+from utils.local_time import local_midnight, next_local_midnight
+from utils.logging_service import LoggingService
+
+logging = LoggingService()
+
+HOUR: int = 3600
+DAY: int = 86400
+# Power series (source, metric) in W and the energy field they are integrated into
+SERIES: dict = {
+    ("inverter", "production"): "production",
+    ("inverter", "consume"): "consumption",
+    ("heat_pipes", "heating"): "heating",
+}
+FIELDS: tuple = ("production", "consumption", "heating")
+# Consecutive samples further apart than this are treated as a gap and not interpolated
+MAX_GAP: int = 300
+
+
+def aggregate_energy(now: float = None) -> int:
+    """
+    Scheduler job: integrates all completed hours that are not aggregated yet and sums completed local days.
+
+    Returns:
+        int: Number of written buckets.
+    """
+    now = time.time() if now is None else now
+    end: int = _completed_hours_end(now)
+    written: int = 0
+
+    start: int | None = _next_hour()
+    if start is not None and start < end:
+        hours: dict = _integrate_hours(start, end)
+        if hours:
+            db.session.execute(insert(EnergyBucket), [
+                {"resolution": HOUR, "bucket": bucket, **values} for bucket, values in sorted(hours.items())
+            ])
+            written += len(hours)
+
+    written += _aggregate_days(end)
+    db.session.commit()
+    return written
+
+
+def query_energy(start: int, end: int, resolution: str = "hour", now: float = None) -> list[dict]:
+    """
+    Returns the energy flows of all buckets in ``[start, end)``.
+
+    Hours that are not aggregated yet (e.g. the current hour) are integrated on the fly from the raw samples.
+
+    Args:
+        start (int): Range start as UNIX epoch seconds.
+        end (int): Range end as UNIX epoch seconds (exclusive).
+        resolution (str): ``"hour"`` or ``"day"``.
+        now (float): Current time, only used for tests.
+
+    Returns:
+        list[dict]: One entry per bucket with ``startsAt`` (local ISO time) and ``production``, ``consumption``,
+        ``heating``, ``consumer`` and ``regular`` in kWh.
+
+    Raises:
+        ValueError: If ``resolution`` is not supported.
+    """
+    if resolution not in ("hour", "day"):
+        raise ValueError(f"Unsupported resolution {resolution}, use 'hour' or 'day'")
+
+    size: int = HOUR if resolution == "hour" else DAY
+    rows = db.session.execute(
+        select(EnergyBucket.bucket, *(getattr(EnergyBucket, field) for field in FIELDS))
+        .where(EnergyBucket.resolution == size, EnergyBucket.bucket >= start, EnergyBucket.bucket < end)
+        .order_by(EnergyBucket.bucket)
+    ).all()
+    buckets: dict = {row[0]: dict(zip(FIELDS, row[1:])) for row in rows}
+
+    if resolution == "hour":
+        now = time.time() if now is None else now
+        open_start: int = max(_completed_hours_end(now), start // HOUR * HOUR)
+        open_end: int = min(end, int(now))
+        if open_start < open_end:
+            for bucket, values in _integrate_hours(open_start, open_end).items():
+                buckets.setdefault(bucket, values)
+
+    return [_to_response(bucket, values) for bucket, values in sorted(buckets.items())]
+
+
+def get_energy_of_day(day: datetime.date = None) -> dict:
+    """
+    Returns the hourly energy flows of one local calendar day in the format of the dashboard energy chart.
+
+    Returns:
+        dict: ``{"'startsAt': '<ISO time>'": {"heating", "consumer", "regular", "production"}}`` for every hour of the
+        day, hours without data are ``0.0``.
+    """
+    day = day or datetime.date.today()
+    start: int = int(datetime.datetime.combine(day, datetime.time()).timestamp())
+    end: int = next_local_midnight(start)
+    hours: dict = {entry["timestamp"]: entry for entry in query_energy(start, end, "hour")}
+
+    energy_data: dict = {}
+    for bucket in range(start, end, HOUR):
+        entry: dict = hours.get(bucket) or _to_response(bucket, {field: 0.0 for field in FIELDS})
+        energy_data[f"'startsAt': '{entry['startsAt']}'"] = {
+            "heating": round(entry["heating"], 2),
+            "consumer": round(entry["consumer"], 2),
+            "regular": round(entry["regular"], 2),
+            "production": round(entry["production"], 2),
+        }
+    return energy_data
+
+
+@functools.lru_cache(maxsize=16384)
+def _starts_at(bucket: int) -> str:
+    # Formatting local ISO timestamps dominates large range queries, bucket starts never change
+    return datetime.datetime.fromtimestamp(bucket).astimezone().isoformat(timespec="milliseconds")
+
+
+def _to_response(bucket: int, values: dict) -> dict:
+    return {
+        "timestamp": bucket,
+        "startsAt": _starts_at(bucket),
+        "production": values["production"],
+        "consumption": values["consumption"],
+        "heating": values["heating"],
+        # No separately metered consumers yet, everything except the heat pipes counts as regular consumption
+        "consumer": 0.0,
+        "regular": max(values["consumption"] - values["heating"], 0.0),
+    }
+
+
+def _completed_hours_end(now: float) -> int:
+    # An hour is final once samples up to MAX_GAP after its end have been flushed
+    return int((now - ROLLUP_DELAY - MAX_GAP) // HOUR * HOUR)
+
+
+def _next_hour() -> int | None:
+    last: int | None = db.session.execute(
+        select(func.max(EnergyBucket.bucket)).where(EnergyBucket.resolution == HOUR)
+    ).scalar()
+    if last is not None:
+        return last + HOUR
+
+    first: int | None = db.session.execute(
+        select(func.min(Measurement.timestamp)).where(_series_filter())
+    ).scalar()
+    return None if first is None else first // HOUR * HOUR
+
+
+def _series_filter():
+    return or_(*(and_(Measurement.source == source, Measurement.metric == metric) for source, metric in SERIES))
+
+
+def _integrate_hours(start: int, end: int) -> dict:
+    """
+    Integrates the power series over ``[start, end)`` with the trapezoidal rule. Segments crossing an hour boundary are
+    split at the boundary using the linearly interpolated power.
+
+    Returns:
+        dict: ``{hour_start: {"production", "consumption", "heating", "samples"}}`` for all hours with samples.
+    """
+    rows = db.session.execute(
+        select(Measurement.source, Measurement.metric, Measurement.timestamp, Measurement.value)
+        .where(_series_filter(), Measurement.timestamp >= start - MAX_GAP, Measurement.timestamp < end + MAX_GAP)
+        .order_by(Measurement.source, Measurement.metric, Measurement.timestamp)
+    ).all()
+
+    points: dict = defaultdict(list)
+    for source, metric, timestamp, value in rows:
+        points[SERIES[(source, metric)]].append((timestamp, value))
+
+    hours: dict = defaultdict(lambda: {"production": 0.0, "consumption": 0.0, "heating": 0.0, "samples": 0})
+    for field, series in points.items():
+        for timestamp, _ in series:
+            if start <= timestamp < end:
+                hours[timestamp // HOUR * HOUR]["samples"] += 1
+
+        for (t0, p0), (t1, p1) in zip(series, series[1:]):
+            if t1 <= t0 or t1 - t0 > MAX_GAP:
+                continue
+            slope: float = (p1 - p0) / (t1 - t0)
+            a, pa = t0, p0
+            while a < t1:
+                b: int = min(a // HOUR * HOUR + HOUR, t1)
+                pb: float = p0 + slope * (b - t0)
+                if start <= a < end:
+                    hours[a // HOUR * HOUR][field] += (pa + pb) / 2 * (b - a) / 3_600_000
+                a, pa = b, pb
+
+    return {bucket: values for bucket, values in hours.items() if values["samples"]}
+
+
+def _aggregate_days(hours_end: int) -> int:
+    last: int | None = db.session.execute(
+        select(func.max(EnergyBucket.bucket)).where(EnergyBucket.resolution == DAY)
+    ).scalar()
+    if last is not None:
+        day: int = next_local_midnight(last)
+    else:
+        first: int | None = db.session.execute(
+            select(func.min(EnergyBucket.bucket)).where(EnergyBucket.resolution == HOUR)
+        ).scalar()
+        if first is None:
+            return 0
+        day = local_midnight(first)
+
+    written: int = 0
+    next_day: int = next_local_midnight(day)
+    while next_day <= hours_end:
+        totals = db.session.execute(
+            select(*(func.sum(getattr(EnergyBucket, field)) for field in FIELDS), func.sum(EnergyBucket.samples))
+            .where(EnergyBucket.resolution == HOUR, EnergyBucket.bucket >= day, EnergyBucket.bucket < next_day)
+        ).one()
+        if totals[-1]:
+            db.session.execute(insert(EnergyBucket).values(
+                resolution=DAY, bucket=day, samples=totals[-1],
+                **{field: totals[index] or 0.0 for index, field in enumerate(FIELDS)}
+            ))
+            written += 1
+        day, next_day = next_day, next_local_midnight(next_day)
+
+    return written
@@ -1,19 +1,36 @@
+import time
+
 from sqlalchemy import select, join
-import requests
 from flask import Response
 from requests.exceptions import RequestException, Timeout, ConnectionError
 from sqlalchemy.sql.selectable import GenerativeSelect
 
+from config import Config
 from extensions import db
 from database.settings import ManufacturerSetting, EnergySetting
-from services.heating.heat_pipe import automatic_control
+from database.settings_cache import settings_cache
+from services.heating.heat_pipe import automatic_control, get_heating_power
+from services.http_client import http_client
+from services.telemetry_cache import telemetry_cache
+from services.timeseries_service import record_measurements
 from utils.data_formatter import extract_datapoints_from_json_with_api
 from utils.logging_service import LoggingService
+from utils.metrics import metrics
 
 logging = LoggingService()
 
+# Datapoints of the live snapshot, extracted together from the node the manufacturer's API path points to
+LIVE_DATA_FIELDS: tuple = ("P_Load", "P_PV", "P_Grid", "P_Akku")
+# Snapshot served by the API while neither a cached nor a fresh reading is available
+EMPTY_LIVE_DATA: dict = {"consume": 0, "production": 0, "cover": 0, "accu_capacity": 0.0}
+
+INVERTER_FETCH_SECONDS = metrics.histogram("viki_inverter_fetch_seconds", "Duration of inverter HTTP requests",
+                                           ("data_type",))
+INVERTER_ERRORS = metrics.counter("viki_inverter_errors_total", "Failed inverter reads by stage", ("reason",))
 
-def pull_and_fromatted_inverter_data(data_type: str) -> dict:
+
+def pull_and_fromatted_inverter_data(data_type: str, timeout: float | tuple = 5, retries: int = None,
+                                     fields: tuple = None) -> dict:
     inverter_data: dict | None = get_manufacturer_with_energy_settings(data_type)
     if inverter_data is None:
         logging.warning("[Inverter] No configuration found – returning empty dict")
@@ -21,33 +38,42 @@ def pull_and_fromatted_inverter_data(data_type: str) -> dict:
 
     url: str = f"http://{inverter_data['ip']}{inverter_data['url']}"
 
+    started: float = time.perf_counter()
     try:
-        response: Response = requests.get(url, timeout=5)
+        response: Response = http_client.get(url, timeout=timeout, retries=retries)
         response.raise_for_status()
     except (Timeout, ConnectionError, RequestException) as http_err:
+        INVERTER_ERRORS.inc(1, "http")
         logging.error(f"[Inverter] HTTP error for {url}: {http_err}")
         return {}
+    finally:
+        INVERTER_FETCH_SECONDS.observe(time.perf_counter() - started, data_type)
 
     try:
         raw_json: dict = response.json()
     except ValueError as json_err:
+        INVERTER_ERRORS.inc(1, "json")
         logging.error(f"[Inverter] Invalid JSON from {url}: {json_err}")
         return {}
 
     try:
-        data: dict = extract_datapoints_from_json_with_api(
-            inverter_data["api"], raw_json
-        )
+        if fields is None:
+            data: dict = extract_datapoints_from_json_with_api(inverter_data["api"], raw_json)
+        else:
+            data: dict = extract_datapoints_from_json_with_api(inverter_data["api"], raw_json, fields, default=None)
     except ValueError as parse_err:
+        INVERTER_ERRORS.inc(1, "parse")
         logging.error(f"[Inverter] API path parsing failed: {parse_err}")
         return {}
 
     return data
 
 
+@settings_cache.cached('manufacturer', 'energy_settings')
 def get_manufacturer_with_energy_settings(data_type: str) -> dict:
     """
-    Retrieves the first manufacturer together with its (optional) energy-specific settings.
+    Retrieves the first manufacturer together with its (optional) energy-specific settings. Cached until the
+    manufacturer or energy settings change.
 
     Returns:
         dict: A mapping with the keys
@@ -86,13 +112,16 @@ def get_manufacturer_with_energy_settings(data_type: str) -> dict:
         return None
 
 
-def pull_live_data_from_inverter():
+def read_live_data_from_inverter(timeout: float | tuple = 5, retries: int = None) -> dict | None:
     """
-    Pulls one snapshot of live production / consumption data from the configured inverter and triggers automatic
-    heat-pipe control.
+    Pulls one snapshot of live production / consumption data from the configured inverter.
+
+    Args:
+        timeout (float | tuple): Request timeout in seconds, see ``requests``.
+        retries (int): Retries of a failed request, default ``HTTP_RETRIES``.
 
     Returns:
-        dict: On success, a JSON-serialisable mapping
+        dict: A JSON-serialisable mapping
 
             {
                 "consume": int,
@@ -101,33 +130,20 @@ def pull_live_data_from_inverter():
                 "accu_capacity": float
             }
 
-        {}: An empty dict if no inverter configuration could be found.
-
-    Raises:
-        RequestException: If the HTTP request to the inverter fails.
-        ValueError:       If the response body is not valid JSON.
+        None: If the inverter could not be reached or no configuration was found. Callers keep the last snapshot
+        instead of publishing zeros, it expires after ``TELEMETRY_MAX_AGE``.
     """
-    def pull_live_data_from_inverter():
-        data = pull_and_fromatted_inverter_data('Livedaten')
-        
-        if not data:
-            logging.warning("[Inverter] No data available")
-            return {
-                "consume": 0,
-                "production": 0,
-                "cover": 0,
-                "accu_capacity": 0.0,
-            }
+    data = pull_and_fromatted_inverter_data('Livedaten', timeout, retries, LIVE_DATA_FIELDS)
 
-        consume: int = round(-data.get("P_Load", 0.0) or 0.0, 0)
-        production: int = round(data.get("P_PV", 0.0) or 0.0, 0)
-        cover: int = round(-data.get("P_Grid", 0.0) or 0.0, 0)
-        accu_capacity: float = round(data.get("P_Akku", 0.0) or 0.0, 1)
+    if not data:
+        logging.warning("[Inverter] No data available")
+        return None
 
-    try:
-        automatic_control(cover)
-    except Exception as ctrl_err:
-        logging.warning(f"[HeatPipe] automatic_control failed: {ctrl_err}")
+    # The inverter reports ``null`` for datapoints it does not measure (e.g. P_Akku without battery)
+    consume: int = round(-(data["P_Load"] or 0.0), 0)
+    production: int = round(data["P_PV"] or 0.0, 0)
+    cover: int = round(-(data["P_Grid"] or 0.0), 0)
+    accu_capacity: float = round(data["P_Akku"] or 0.0, 1)
 
     return {
         "consume": int(consume),
@@ -135,3 +151,90 @@ def pull_live_data_from_inverter():
         "cover": int(cover),
         "accu_capacity": float(accu_capacity),
     }
+
+
+def pull_live_data_from_inverter() -> dict | None:
+    """
+    Pulls one snapshot of live data from the inverter, triggers automatic heat-pipe control and publishes the snapshot
+    to the telemetry cache, so that every worker process can serve it without polling the inverter itself. Snapshots
+    with data are also recorded in the time-series store. A failed read neither runs the control nor publishes
+    anything.
+
+    Only the scheduler leader should call this function, otherwise several processes switch the relays concurrently.
+
+    Returns:
+        dict | None: The snapshot as returned by ``read_live_data_from_inverter``.
+    """
+    live_data: dict | None = read_live_data_from_inverter()
+    if live_data is None:
+        return None
+
+    try:
+        automatic_control(live_data["cover"])
+    except Exception as ctrl_err:
+        logging.warning(f"[HeatPipe] automatic_control failed: {ctrl_err}")
+
+    telemetry_cache.put("inverter", live_data)
+    if any(live_data.values()):
+        record_measurements("inverter", live_data)
+    record_measurements("heat_pipes", {"heating": get_heating_power()})
+    return live_data
+
+
+class PowerFollower:
+    """
+    High-frequency variant of ``pull_live_data_from_inverter`` for fast surplus following (``FAST_CONTROL_INTERVAL``).
+
+    Every tick reads the inverter over the keep-alive pool of ``http_client`` within a strict timeout budget and
+    without retries, and runs ``automatic_control`` right away. The tick itself touches no database: settings come
+    from the settings cache, temperatures from the telemetry cache and relay states from the controller state store.
+    The snapshot is published to the telemetry cache only when it changed (at least every ``SCHEDULER_INTERVAL``).
+    It is recorded in the time-series store at the normal ``SCHEDULER_INTERVAL`` cadence, so the history does not
+    grow with the poll rate.
+
+    Args:
+        interval (float): Seconds between two ticks.
+        timeout (float): Time budget of the inverter request, default 80 % of the interval.
+    """
+
+    def __init__(self, interval: float = None, timeout: float = None):
+        self.interval = interval if interval is not None else Config.FAST_CONTROL_INTERVAL
+        self.timeout = timeout if timeout is not None else Config.FAST_CONTROL_TIMEOUT or 0.8 * self.interval
+        self._published: dict | None = None
+        self._published_at: float = 0.0
+        self._recorded_at: float = 0.0
+
+    def tick(self) -> dict | None:
+        started: float = time.monotonic()
+        # Connect and read share the budget, so a tick never blocks longer than ``timeout`` on the network
+        live_data: dict | None = read_live_data_from_inverter(timeout=(self.timeout / 2, self.timeout / 2), retries=0)
+        if live_data is not None:
+            self.process(live_data)
+
+        elapsed: float = time.monotonic() - started
+        if elapsed > self.interval:
+            logging.warning(f"[Inverter] Fast control tick took {elapsed:.2f}s (interval {self.interval}s)")
+        return live_data
+
+    def process(self, live_data: dict) -> None:
+        """
+        Runs the heat-pipe control for a snapshot and publishes/records it, also used by the acquisition engine.
+        """
+        try:
+            automatic_control(live_data["cover"])
+        except Exception as ctrl_err:
+            logging.warning(f"[HeatPipe] automatic_control failed: {ctrl_err}")
+
+        now: float = time.time()
+        if live_data != self._published or now - self._published_at >= Config.SCHEDULER_INTERVAL:
+            telemetry_cache.put("inverter", live_data)
+            self._published, self._published_at = live_data, now
+
+        if now - self._recorded_at >= Config.SCHEDULER_INTERVAL:
+            if any(live_data.values()):
+                record_measurements("inverter", live_data)
+            record_measurements("heat_pipes", {"heating": get_heating_power()})
+            self._recorded_at = now
+
+
+power_follower = PowerFollower()
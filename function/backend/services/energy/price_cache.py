@@ -0,0 +1,163 @@
+"""
+Day-ahead price cache: Tibber is only asked when new prices are due, dashboards are served from memory.
+"""
+
+import datetime
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import delete, insert, select
+
+from config import Config
+from database.analyse import EnergyPrice
+from extensions import db
+from services.energy.tibber import pull_price_info_from_tibber_api
+from services.telemetry_cache import telemetry_cache
+from utils.local_time import local_midnight
+from utils.logging_service import LoggingService
+
+logging = LoggingService()
+
+CACHE_KEY: str = "tibber_prices"
+# Tibber publishes the prices of the next day around this local hour
+TOMORROW_PUBLISHED_HOUR: int = 13
+# Minimum seconds between two background refreshes triggered by requests (scheduler disabled)
+BACKGROUND_RETRY_INTERVAL: int = 300
+
+_refresh_lock = threading.Lock()
+_last_background_refresh: float = 0.0
+
+
+def get_price_info(now: float = None) -> list:
+    """
+    Returns the prices of today and tomorrow (``[{"total", "startsAt"}, ...]``) without ever calling Tibber.
+
+    Prices come from the shared cache, on a cold start from the database. If the scheduler is disabled and new prices
+    are due, a refresh is started in the background and the current data is returned immediately.
+    """
+    now = time.time() if now is None else now
+    prices: list | None = telemetry_cache.get_with_timestamp(CACHE_KEY)[0]
+    if prices is None:
+        prices = _load_prices(local_midnight(now))
+        telemetry_cache.put(CACHE_KEY, prices)
+
+    if Config.SCHEDULER_INTERVAL <= 0 and is_refresh_due(prices, now):
+        _refresh_in_background(current_app._get_current_object())
+
+    return _today_and_tomorrow(prices, now)
+
+
+def get_price_curve(start: float, end: float) -> list[tuple]:
+    """
+    Returns ``(starts_at, total)`` of all stored price intervals in ``[start, end)``, ordered by time.
+    """
+    rows = db.session.execute(
+        select(EnergyPrice.starts_at, EnergyPrice.total)
+        .where(EnergyPrice.starts_at >= start, EnergyPrice.starts_at < end)
+        .order_by(EnergyPrice.starts_at)
+    ).all()
+    return [(row[0], row[1]) for row in rows]
+
+
+def refresh_price_cache(now: float = None) -> bool:
+    """
+    Scheduler job: fetches the prices from Tibber if today's prices are missing or tomorrow's are due (after 13:00)
+    but missing, stores them and publishes them to all worker processes.
+
+    Returns:
+        bool: True if new prices were fetched.
+    """
+    now = time.time() if now is None else now
+    if not _refresh_lock.acquire(blocking=False):
+        return False
+
+    try:
+        prices: list = _load_prices(local_midnight(now))
+        if not is_refresh_due(prices, now):
+            if telemetry_cache.get_with_timestamp(CACHE_KEY)[0] is None:
+                telemetry_cache.put(CACHE_KEY, prices)
+            return False
+
+        fetched: list = pull_price_info_from_tibber_api()
+        if not fetched:
+            logging.warning("[PRICECACHE] Tibber returned no prices, retrying with the next run")
+            return False
+
+        _store_prices(fetched, now)
+        telemetry_cache.put(CACHE_KEY, _load_prices(local_midnight(now)))
+        logging.info(f"[PRICECACHE] Stored {len(fetched)} prices from Tibber")
+        return True
+    finally:
+        _refresh_lock.release()
+
+
+def is_refresh_due(prices: list, now: float) -> bool:
+    """
+    Returns True if today's prices are missing, or tomorrow's prices are missing after they should have been published.
+    """
+    today: datetime.date = datetime.datetime.fromtimestamp(now).date()
+    dates: set = {_local_date(price["startsAt"]) for price in prices}
+
+    if today not in dates:
+        return True
+    local_hour: int = datetime.datetime.fromtimestamp(now).hour
+    return local_hour >= TOMORROW_PUBLISHED_HOUR and today + datetime.timedelta(days=1) not in dates
+
+
+def _refresh_in_background(app) -> None:
+    global _last_background_refresh
+
+    def run():
+        with app.app_context():
+            try:
+                refresh_price_cache()
+            except Exception as err:
+                logging.error(f"[PRICECACHE] Background refresh failed: {err}")
+
+    if _refresh_lock.locked() or time.time() - _last_background_refresh < BACKGROUND_RETRY_INTERVAL:
+        return
+    _last_background_refresh = time.time()
+    threading.Thread(target=run, name="price-refresh", daemon=True).start()
+
+
+def _load_prices(since: int) -> list:
+    rows = db.session.execute(
+        select(EnergyPrice).where(EnergyPrice.starts_at >= since).order_by(EnergyPrice.starts_at)
+    ).scalars()
+    return [row.to_dict() for row in rows]
+
+
+def _store_prices(prices: list, now: float) -> None:
+    rows: list = []
+    for price in prices:
+        try:
+            rows.append({
+                "starts_at": int(_parse(price["startsAt"]).timestamp()),
+                "starts_at_iso": price["startsAt"],
+                "total": float(price["total"]),
+                "fetched_at": int(now),
+            })
+        except (KeyError, TypeError, ValueError) as err:
+            logging.warning(f"[PRICECACHE] Skipping invalid price {price}: {err}")
+
+    if not rows:
+        return
+
+    db.session.execute(delete(EnergyPrice).where(EnergyPrice.starts_at.in_([row["starts_at"] for row in rows])))
+    db.session.execute(insert(EnergyPrice), rows)
+    db.session.commit()
+
+
+def _today_and_tomorrow(prices: list, now: float) -> list:
+    today: datetime.date = datetime.datetime.fromtimestamp(now).date()
+    days: tuple = (today, today + datetime.timedelta(days=1))
+    return [price for price in prices if _local_date(price["startsAt"]) in days]
+
+
+def _parse(starts_at: str) -> datetime.datetime:
+    return datetime.datetime.fromisoformat(starts_at)
+
+
+def _local_date(starts_at: str) -> datetime.date:
+    return _parse(starts_at).astimezone().date()
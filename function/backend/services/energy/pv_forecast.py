@@ -0,0 +1,183 @@
+"""
+Local PV production forecast from the array geometry: sun position and clear-sky irradiance are computed vectorised
+over a whole day, optionally reduced by cloud cover, and cached per location and day.
+"""
+
+import datetime
+import functools
+
+import numpy as np
+
+from config import Config
+from database.fetch_data import fetch_pv_arrays
+from services.weather_service import get_cloud_cover
+from utils.local_time import local_midnight, next_local_midnight
+from utils.logging_service import LoggingService
+
+logging = LoggingService()
+
+# W/m², extraterrestrial irradiance
+SOLAR_CONSTANT: float = 1361.0
+# Diffuse share of the clear-sky beam irradiance
+DIFFUSE_FRACTION: float = 0.1
+# Ground reflectance seen by tilted modules
+ALBEDO: float = 0.2
+# Allowed forecast resolutions in seconds
+MIN_STEP: int = 300
+MAX_STEP: int = 900
+
+
+def solar_position(timestamps: np.ndarray, latitude: float, longitude: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Computes the solar zenith and azimuth (radians, azimuth clockwise from north) for UNIX timestamps, using the
+    NOAA low-accuracy formulas (about 0.5° error), vectorised over all timestamps.
+    """
+    moments: np.ndarray = np.asarray(timestamps, dtype="int64").astype("datetime64[s]")
+    day_of_year: np.ndarray = (moments.astype("datetime64[D]") - moments.astype("datetime64[Y]")).astype(float) + 1
+    utc_minutes: np.ndarray = (np.asarray(timestamps, dtype=float) % 86400) / 60
+
+    gamma: np.ndarray = 2 * np.pi / 365 * (day_of_year - 1 + (utc_minutes / 60 - 12) / 24)
+    equation_of_time: np.ndarray = 229.18 * (
+        0.000075 + 0.001868 * np.cos(gamma) - 0.032077 * np.sin(gamma)
+        - 0.014615 * np.cos(2 * gamma) - 0.040849 * np.sin(2 * gamma)
+    )
+    declination: np.ndarray = (
+        0.006918 - 0.399912 * np.cos(gamma) + 0.070257 * np.sin(gamma) - 0.006758 * np.cos(2 * gamma)
+        + 0.000907 * np.sin(2 * gamma) - 0.002697 * np.cos(3 * gamma) + 0.00148 * np.sin(3 * gamma)
+    )
+
+    true_solar_minutes: np.ndarray = utc_minutes + equation_of_time + 4 * longitude
+    hour_angle: np.ndarray = np.radians(true_solar_minutes / 4 - 180)
+    lat: float = np.radians(latitude)
+
+    cos_zenith: np.ndarray = (np.sin(lat) * np.sin(declination)
+                              + np.cos(lat) * np.cos(declination) * np.cos(hour_angle))
+    zenith: np.ndarray = np.arccos(np.clip(cos_zenith, -1.0, 1.0))
+    azimuth: np.ndarray = np.arctan2(
+        np.sin(hour_angle), np.cos(hour_angle) * np.sin(lat) - np.tan(declination) * np.cos(lat)
+    ) + np.pi
+    return zenith, azimuth
+
+
+def clear_sky_irradiance(zenith: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns ``(dni, dhi, ghi)`` in W/m² for a cloudless sky: Kasten–Young air mass, Meinel beam attenuation and a
+    fixed diffuse share. All values are 0 while the sun is below the horizon.
+    """
+    cos_zenith: np.ndarray = np.cos(zenith)
+    daylight: np.ndarray = cos_zenith > 0
+    zenith_deg: np.ndarray = np.minimum(np.degrees(zenith), 90.0)
+    air_mass: np.ndarray = 1 / (np.maximum(cos_zenith, 0) + 0.50572 * (96.07995 - zenith_deg) ** -1.6364)
+
+    dni: np.ndarray = np.where(daylight, SOLAR_CONSTANT * 0.7 ** (air_mass ** 0.678), 0.0)
+    dhi: np.ndarray = DIFFUSE_FRACTION * dni
+    ghi: np.ndarray = dni * np.maximum(cos_zenith, 0) + dhi
+    return dni, dhi, ghi
+
+
+def plane_of_array(zenith: np.ndarray, azimuth: np.ndarray, tilt: float, orientation: float) -> np.ndarray:
+    """
+    Returns the clear-sky irradiance (W/m²) on a module plane with ``tilt`` and ``orientation`` (degrees, azimuth of
+    the module normal): beam on the plane, isotropic sky diffuse and ground reflection.
+    """
+    dni, dhi, ghi = clear_sky_irradiance(zenith)
+    tilt_rad: float = np.radians(tilt)
+    cos_incidence: np.ndarray = (np.cos(zenith) * np.cos(tilt_rad)
+                                 + np.sin(zenith) * np.sin(tilt_rad) * np.cos(azimuth - np.radians(orientation)))
+    return (dni * np.maximum(cos_incidence, 0)
+            + dhi * (1 + np.cos(tilt_rad)) / 2
+            + ghi * ALBEDO * (1 - np.cos(tilt_rad)) / 2)
+
+
+def cloud_factor(cloud_cover) -> np.ndarray | float:
+    """
+    Returns the share of the clear-sky irradiance reaching the ground for a cloud cover fraction (0–1, Kasten–Czeplak).
+    """
+    return 1 - 0.75 * np.clip(np.asarray(cloud_cover, dtype=float), 0.0, 1.0) ** 3.4
+
+
+@functools.lru_cache(maxsize=128)
+def _clear_sky_day(latitude: float, longitude: float, tilt: float, orientation: float, day_start: int,
+                   step: int) -> np.ndarray:
+    # Clear-sky AC power per W peak for every interval of one local day, evaluated at the interval centres
+    day_end: int = next_local_midnight(day_start)
+    centres: np.ndarray = np.arange(day_start, day_end, step) + step / 2
+    zenith, azimuth = solar_position(centres, latitude, longitude)
+    profile: np.ndarray = plane_of_array(zenith, azimuth, tilt, orientation) / 1000 * Config.PV_SYSTEM_EFFICIENCY
+    profile.setflags(write=False)
+    return profile
+
+
+def forecast_day(day_start: int, step: int = None, cloud_cover=None) -> list[tuple[int, float]] | None:
+    """
+    Returns the expected PV production of all configured arrays for one local day.
+
+    The clear-sky curve of every array is computed once per location, geometry and day and then served from memory;
+    cloud cover is applied on top of it.
+
+    Args:
+        day_start (int): Local midnight of the day (UNIX epoch seconds).
+        step (int): Resolution in seconds (300–900), default ``PV_FORECAST_STEP``.
+        cloud_cover (float | list): Optional cloud cover fraction (0–1), for the whole day or one value per interval.
+
+    Returns:
+        list[tuple[int, float]] | None: ``(interval start, mean power in W)``, None if no PV array is configured.
+    """
+    step = step or Config.PV_FORECAST_STEP
+    arrays: list | None = fetch_pv_arrays()
+    if not arrays:
+        return None
+
+    power: np.ndarray | None = None
+    for array in arrays:
+        tilt: float = array["tilt"] if array["tilt"] is not None else Config.PV_DEFAULT_TILT
+        profile: np.ndarray = _clear_sky_day(array["latitude"], array["longitude"], tilt, Config.PV_AZIMUTH,
+                                             day_start, step)
+        power = profile * array["peak_power"] if power is None else power + profile * array["peak_power"]
+
+    if cloud_cover is not None:
+        power = power * cloud_factor(cloud_cover)
+
+    starts: range = range(day_start, day_start + len(power) * step, step)
+    return [(start, round(float(value), 1)) for start, value in zip(starts, power)]
+
+
+def forecast_production(start: int, end: int, step: int = None, cloud_cover=None) -> list[float] | None:
+    """
+    Returns the expected mean PV power (W) of every ``step`` interval in ``[start, end)``, stitched from the cached
+    day curves. ``start`` must be aligned to ``step``.
+
+    Args:
+        cloud_cover (float | dict): Optional cloud cover fraction, for the whole range or ``{interval start: cover}``.
+
+    Returns:
+        list[float] | None: One value per interval, None if no PV array is configured.
+    """
+    step = step or Config.PV_FORECAST_STEP
+    values: dict = {}
+    day_start: int = local_midnight(start)
+    while day_start < end:
+        day: list | None = forecast_day(day_start, step)
+        if day is None:
+            return None
+        values.update(day)
+        day_start = next_local_midnight(day_start)
+
+    production: list = [values.get(moment, 0.0) for moment in range(start, end, step)]
+    if cloud_cover is None:
+        return production
+    if isinstance(cloud_cover, dict):
+        return [round(value * float(cloud_factor(cloud_cover.get(moment, 0.0))), 1)
+                for moment, value in zip(range(start, end, step), production)]
+    return [round(value * float(cloud_factor(cloud_cover)), 1) for value in production]
+
+
+def forecast_cloud_cover(start: int, end: int, step: int = None) -> dict | None:
+    """
+    Returns the stored weather forecast's cloud cover at the location of the first PV array for every ``step``
+    interval in ``[start, end)``, as accepted by ``forecast_production``. None without arrays or stored forecast.
+    """
+    arrays: list | None = fetch_pv_arrays()
+    if not arrays:
+        return None
+    return get_cloud_cover(arrays[0]["latitude"], arrays[0]["longitude"], start, end, step or Config.PV_FORECAST_STEP)
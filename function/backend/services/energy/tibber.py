@@ -1,59 +1,76 @@
+import functools
+
 import requests
 from flask import Response
 from pathlib import Path
 
+from config import Config
 from database.fetch_data import fetch_values
+from services.http_client import http_client
 from utils.data_formatter import extract_datapoints_from_json_with_api
 from utils.logging_service import LoggingService
 
 logging = LoggingService()
 
 
+@functools.lru_cache(maxsize=None)
+def load_graphql_query(name: str) -> str:
+    """
+    Reads a GraphQL query from ``services/energy/graphql`` once per process.
+
+    Raises:
+        OSError: If the file cannot be read.
+    """
+    graphql_path = Path(__file__).parent / "graphql" / name
+    with open(graphql_path, "r", encoding="utf-8") as file:
+        return file.read()
+
+
 def pull_price_info_from_tibber_api() -> list:
     """
     Retrieves spot-price data from the Tibber GraphQL API.
 
+    Dashboard requests must not call this directly, they are served from ``services.energy.price_cache``, which calls
+    this function only when new prices are due.
+
     Returns:
         list[dict]: Concatenated list ``today + tomorrow`` – i.e.
-        • every hourly price for **today**
-        • all prices **up to 13:00** for **tomorrow**
+        • every price for **today**
+        • every price for **tomorrow** once published (around 13:00), otherwise nothing
 
-        Each element is whatever structure the parser returns (typically ``{"time": "...", "price": 0.123}``).
+        Each element is ``{"total": 0.3374, "startsAt": "2025-05-21T00:00:00.000+02:00"}``.
 
         ``[]`` (empty list) is returned if the GraphQL file is missing *or* the HTTP request fails.
-
-    Notes:
-        - Uses the shared ``ACCESS_TOKEN`` and ``HEADERS`` constants.
-        - Any ``requests.RequestException`` is swallowed and mapped to ``[]``.
     """
     url: str = fetch_values("manufacturer", "Tibber Strompreis Info", "url")
-    
-    if not url:
-        logging.error("[Tibber] URL not found in database")
-        return []
-    
-    try:
-        graphql_path = Path(__file__).parent / "graphql" / "tibber_price_info.graphql"
-        with open(graphql_path, "r") as file:
-            query: str = file.read()
+    api: str = fetch_values("manufacturer", "Tibber Strompreis Info", "api")
 
-        response: Response = requests.post(url, headers=load_tibber_auth(), json={'query': query})
-        api: str = fetch_values("manufacturer", "Tibber Strompreis Info", "api")
-        
-        if not api:
-            logging.error("[Tibber] API path not found in database")
-            return []
-        
-        data: dict = extract_datapoints_from_json_with_api(api, response.json())
+    if not url or not api:
+        logging.error("[Tibber] URL or API path not found in database")
+        return []
 
-    except FileNotFoundError as fnfe:
-        logging.error(f"Error by open file: {fnfe}")
+    try:
+        query: str = load_graphql_query("tibber_price_info.graphql")
+    except OSError as ose:
+        logging.error(f"[Tibber] Error by reading GraphQL-file: {ose}")
         return []
-    except requests.exceptions.HTTPError as errh:
-        logging.error(f"Error by http request: {errh}")
+
+    try:
+        # GraphQL queries only read, so they may be retried like a GET
+        response: Response = http_client.post(
+            url, headers=load_tibber_auth(), json={'query': query}, timeout=10, retries=Config.HTTP_RETRIES
+        )
+        response.raise_for_status()
+    except requests.exceptions.RequestException as rex:
+        logging.error(f"[Tibber] HTTP-Error: {rex}")
         return []
 
-    return data.get("today", []) + data.get("tomorrow", [])
+    try:
+        data: dict = extract_datapoints_from_json_with_api(api, response.json(), ("today", "tomorrow"), default=None)
+        return (data["today"] or []) + (data["tomorrow"] or [])
+    except (ValueError, KeyError, TypeError, AttributeError) as parse_err:
+        logging.error(f"[Tibber] Error by parsing the api-request: {parse_err}")
+        return []
 
 
 def pull_consume_information_from_tibber_api() -> float:
@@ -84,9 +101,7 @@ def pull_consume_information_from_tibber_api() -> float:
         return 0.0
 
     try:
-        graphql_path = Path(__file__).parent / "graphql" / "tibber_consume_info.graphql"
-        with open(graphql_path, "r", encoding="utf-8") as file:
-            query: str = file.read()
+        query: str = load_graphql_query("tibber_consume_info.graphql")
 
     except FileNotFoundError as fnfe:
         logging.error(f"[Tibber] GraphQL-file not found: {fnfe}")
@@ -97,7 +112,10 @@ def pull_consume_information_from_tibber_api() -> float:
         return 0.0
 
     try:
-        response: Response = requests.post(url, headers=load_tibber_auth(), json={"query": query}, timeout=10)
+        # GraphQL queries only read, so they may be retried like a GET
+        response: Response = http_client.post(
+            url, headers=load_tibber_auth(), json={"query": query}, timeout=10, retries=Config.HTTP_RETRIES
+        )
         response.raise_for_status()
 
     except requests.exceptions.RequestException as rex:
@@ -2,9 +2,15 @@
 Externe API-Zugriffe: Wetter, Solar-Forecast, Tibber etc.
 """
 
-import requests
 from typing import Optional
 
+from requests.exceptions import RequestException
+
+from services.http_client import http_client
+from utils.logging_service import LoggingService
+
+logging = LoggingService()
+
 
 class WeatherService:
     def __init__(self, api_key: str, location: str = "Berlin", unit: str = "metric"):
@@ -16,7 +22,7 @@ class WeatherService:
     def get_weather(self) -> Optional[dict]:
         """Holt aktuelle Wetterdaten von OpenWeatherMap"""
         try:
-            response = requests.get(self.base_url, params={
+            response = http_client.get(self.base_url, params={
                 "q": self.location,
                 "units": self.unit,
                 "appid": self.api_key
@@ -24,8 +30,8 @@ class WeatherService:
             if response.ok:
                 return response.json()
             return None
-        except Exception as e:
-            print(f"[Weather] Fehler beim Abrufen: {e}")
+        except (RequestException, ValueError) as e:
+            logging.error(f"[Weather] Fehler beim Abrufen: {e}")
             return None
 
 
@@ -36,12 +42,12 @@ class SolarForecastService:
     def get_forecast(self, system_id: str) -> Optional[dict]:
         """Lädt Forecast-Daten für eine PV-Anlage"""
         try:
-            response = requests.get(f"{self.url}?system_id={system_id}")
+            response = http_client.get(self.url, params={"system_id": system_id})
             if response.ok:
                 return response.json()
             return None
-        except Exception as e:
-            print(f"[Forecast] Fehler: {e}")
+        except (RequestException, ValueError) as e:
+            logging.error(f"[Forecast] Fehler: {e}")
             return None
 
 
@@ -70,14 +76,15 @@ class TibberService:
         }
         """
         try:
-            response = requests.post(
+            response = http_client.post(
                 self.api_url,
                 headers={"Authorization": f"Bearer {self.token}"},
-                json={"query": query}
+                json={"query": query},
+                retries=http_client.retries
             )
             if response.ok:
                 return response.json()
             return None
-        except Exception as e:
-            print(f"[Tibber] Fehler: {e}")
+        except (RequestException, ValueError) as e:
+            logging.error(f"[Tibber] Fehler: {e}")
             return None
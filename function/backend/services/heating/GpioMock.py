@@ -1,12 +1,24 @@
-import time
+import collections
 import threading
+import time
 
 from utils.logging_service import LoggingService
 
 logging = LoggingService()
 
+# Number of pin transitions kept for inspection
+TRANSITION_LOG_SIZE: int = 1000
+
 
 class RPiGPIOSimulator:
+    """
+    Stand-in for ``RPi.GPIO`` off the Raspberry Pi.
+
+    The simulator is event-driven: edge callbacks registered with ``add_event_detect`` fire synchronously in the thread
+    that changes the pin state (``output`` or ``set_input``), once per edge, instead of being polled. All callers share
+    the module-level instance ``gpio_simulator``, and every state change is kept in a bounded transition log.
+    """
+
     BCM = 'BCM'
     BOARD = 'BOARD'
     IN = 'IN'
@@ -21,12 +33,11 @@ class RPiGPIOSimulator:
 
     def __init__(self):
         self.mode = None
-        self.pins = {pin: {'mode': None, 'state': None, 'pull': None, 'callbacks': []} for pin in range(1, 41)}
+        self.pins = self._empty_pins()
         self.pwm_instances = {}
-        self.running = True
         self.warnings = True
-        self.event_thread = threading.Thread(target=self._event_loop, daemon=True)
-        self.event_thread.start()
+        self.transitions = collections.deque(maxlen=TRANSITION_LOG_SIZE)
+        self._lock = threading.RLock()
 
     def setmode(self, mode):
         if mode not in [self.BCM, self.BOARD]:
@@ -40,25 +51,27 @@ class RPiGPIOSimulator:
             raise ValueError("State must be a boolean")
         self.warnings = state
 
-    def setup(self, pin, mode, pull=None):
+    def setup(self, pin, mode, pull=None, initial=None):
         if pin not in self.pins:
             logging.error(f"Invalid GPIO pin: {pin}")
             raise ValueError("Invalid GPIO pin")
-        self.pins[pin]['mode'] = mode
-        self.pins[pin]['pull'] = pull
+
+        with self._lock:
+            self.pins[pin]['mode'] = mode
+            self.pins[pin]['pull'] = pull
 
         if mode == self.OUT:
-            self.pins[pin]['state'] = self.LOW
+            self._set_state(pin, self.LOW if initial is None else initial)
         elif mode == self.IN and pull == self.PUD_UP:
-            self.pins[pin]['state'] = self.HIGH
+            self._set_state(pin, self.HIGH)
         elif mode == self.IN and pull == self.PUD_DOWN:
-            self.pins[pin]['state'] = self.LOW
+            self._set_state(pin, self.LOW)
 
     def output(self, pin, state):
         if pin not in self.pins:
             logging.error(f"Pin {pin} not set as OUTPUT.")
             raise ValueError("Pin not set as OUTPUT")
-        self.pins[pin]['state'] = state
+        self._set_state(pin, state)
 
     def input(self, pin):
         if pin not in self.pins:
@@ -66,25 +79,83 @@ class RPiGPIOSimulator:
             raise ValueError("Pin not set as INPUT")
         return self.pins[pin]['state']
 
-    def add_event_detect(self, pin, edge, callback):
+    def set_input(self, pin, state):
+        """
+        Drives an input pin from outside (e.g. a test or a simulated sensor) and fires its edge callbacks.
+        """
         if pin not in self.pins or self.pins[pin]['mode'] != self.IN:
             logging.error(f"Pin {pin} not set as INPUT.")
             raise ValueError("Pin not set as INPUT")
-        self.pins[pin]['callbacks'].append((edge, callback))
-
-    def _event_loop(self):
-        while self.running:
-            for pin, config in self.pins.items():
-                if config['mode'] == self.IN:
-                    for edge, callback in config['callbacks']:
-                        if edge == self.RISING and config['state'] == self.HIGH:
-                            callback(pin)
-                        elif edge == self.FALLING and config['state'] == self.LOW:
-                            callback(pin)
-            time.sleep(0.01)
+        self._set_state(pin, state)
+
+    def add_event_detect(self, pin, edge, callback=None, bouncetime=None):
+        if pin not in self.pins or self.pins[pin]['mode'] != self.IN:
+            logging.error(f"Pin {pin} not set as INPUT.")
+            raise ValueError("Pin not set as INPUT")
+        if edge not in [self.RISING, self.FALLING, self.BOTH]:
+            logging.error(f"Invalid edge: {edge}")
+            raise ValueError("Invalid edge")
+
+        with self._lock:
+            self.pins[pin]['edge'] = edge
+            if callback is not None:
+                self.pins[pin]['callbacks'].append(callback)
+
+    def add_event_callback(self, pin, callback):
+        if pin not in self.pins or self.pins[pin]['edge'] is None:
+            logging.error(f"No event detection on pin {pin}.")
+            raise RuntimeError("Add event detection using add_event_detect first")
+        with self._lock:
+            self.pins[pin]['callbacks'].append(callback)
+
+    def remove_event_detect(self, pin):
+        if pin not in self.pins:
+            logging.error(f"Invalid GPIO pin: {pin}")
+            raise ValueError("Invalid GPIO pin")
+        with self._lock:
+            self.pins[pin]['edge'] = None
+            self.pins[pin]['callbacks'] = []
+
+    def get_transitions(self, pin=None) -> list:
+        """
+        Returns the recorded state changes (oldest first), optionally of one pin only.
+        """
+        with self._lock:
+            return [transition for transition in self.transitions if pin is None or transition['pin'] == pin]
 
     def cleanup(self):
-        self.running = False
-        self.event_thread.join()
-        self.pins = {pin: {'mode': None, 'state': None, 'pull': None, 'callbacks': []} for pin in range(1, 41)}
+        with self._lock:
+            self.mode = None
+            self.pins = self._empty_pins()
+            self.transitions.clear()
         logging.info("Cleanup complete")
+
+    def _set_state(self, pin, state):
+        with self._lock:
+            config: dict = self.pins[pin]
+            previous = config['state']
+            config['state'] = state
+            if previous is not None and bool(previous) == bool(state):
+                return
+
+            self.transitions.append({"timestamp": time.time(), "pin": pin, "from": previous, "to": state})
+            if previous is None or config['edge'] is None:
+                return
+
+            if config['edge'] not in (self.BOTH, self.RISING if state else self.FALLING):
+                return
+            callbacks: list = list(config['callbacks'])
+
+        # Outside the lock, so callbacks may use the simulator themselves
+        for callback in callbacks:
+            try:
+                callback(pin)
+            except Exception as err:
+                logging.error(f"[GPIOSIM] Callback for pin {pin} failed: {err}")
+
+    @staticmethod
+    def _empty_pins() -> dict:
+        return {pin: {'mode': None, 'state': None, 'pull': None, 'edge': None, 'callbacks': []} for pin in range(1, 41)}
+
+
+gpio_simulator = RPiGPIOSimulator()
@@ -1,13 +1,22 @@
+import time
+
 from database.fetch_data import fetch_heat_pipe_setting
-from services.heating.helper import load_memory, toggle_all_relais, read_sensors_by_tank_with_heat_pipe, toggle_relay
+from services.heating.helper import load_memory, toggle_all_relais, read_sensors_by_tank_with_heat_pipe, set_relays
+from services.heating.planner import heating_planner
+from services.heating.stage_controller import StageController, controller_for
 from utils.logging_service import LoggingService
+from utils.metrics import metrics
 
 logging = LoggingService()
 
+CONTROL_TICK_SECONDS = metrics.histogram("viki_control_tick_seconds", "Duration of automatic_control ticks")
+
 DEV_MODE: bool = True
 
 
-def automatic_control(cover: int):
+@CONTROL_TICK_SECONDS.time()
+def automatic_control(cover: int, now: float = None):
+    now = time.time() if now is None else now
     memory: dict = load_memory()
     
     if not memory:
@@ -27,18 +36,22 @@ def automatic_control(cover: int):
         pass
 
     if mode == "Urlaub":
-        toggle_all_relais(False)
+        toggle_all_relais(False, now)
         pass
 
     sensors: dict = read_sensors_by_tank_with_heat_pipe()
-    temp: float = sensors.get("tank")[2]
+    if not sensors.get("tank"):
+        logging.error("[HeatPipe] No readings of the heat-pipe tank available")
+        return
+    # Top sensor of the tank
+    temp: float = list(sensors["tank"].values())[-1]
     dest_temp: float = sensors.get("dest_temp", 0.0)
 
     if mode == "Schnell heizen":
         if temp >= dest_temp:
-            toggle_all_relais(False)
+            toggle_all_relais(False, now)
         else:
-            toggle_all_relais(True)
+            toggle_all_relais(True, now)
         pass
 
     heat_pipe_config: dict = fetch_heat_pipe_setting()
@@ -46,29 +59,58 @@ def automatic_control(cover: int):
         logging.warning("[HeatPipe] No configuration available, skipping automatic control")
         return
 
+    controller: StageController = controller_for(heat_pipe_config)
+
+    if mode == "Preisoptimiert":
+        active_stage: int = sum(1 for state in heat_pipes.values() if state)
+        stage: int | None = heating_planner.current_stage(temp, active_stage, now)
+        if stage is None:
+            logging.warning("[HeatPipe] No heating plan available (prices missing), falling back to Automatik")
+            mode = "Automatik"
+        else:
+            permitted: dict = controller.filter(
+                {pipe_number: pipe_number <= stage for pipe_number in heat_pipes_range}, memory, now)
+            if permitted:
+                set_relays(permitted, now)
+            return
+
     if mode == "Automatik":
-        if temp < dest_temp:
+        if controller.below_target(temp, dest_temp, any(heat_pipes.values())):
+            switching: dict = memory.get("switching", {})
+            requested: dict = {}
 
             for pipe_number in heat_pipes_range:
-                phase = heat_pipe_config.get(f"pipe_{pipe_number}")
-                buffer = heat_pipe_config.get(f"buffer_{pipe_number}")
-                
-                if phase is None or buffer is None:
+                rules: dict | None = controller.rules(pipe_number)
+                if rules is None:
                     logging.warning(f"[HeatPipe] Config missing for pipe {pipe_number}")
                     continue
 
-                if cover > (phase + buffer):
-                    new_state = toggle_relay(pipe_number, True)
-                    if not new_state:
-                        logging.debug(f"[HeatPipe] Pipe {pipe_number} already ON")
-                    if DEV_MODE:
-                        cover -= (phase + buffer)
+                target: bool | None = controller.surplus_request(pipe_number, heat_pipes.get(str(pipe_number)), cover)
+                if target is None:
+                    continue
+                if not controller.permits(pipe_number, target, switching, now):
+                    logging.debug(f"[HeatPipe] Pipe {pipe_number} held by dwell time or rate limit")
+                    continue
+
+                requested[pipe_number] = target
+                if target and DEV_MODE:
+                    cover -= rules["on_threshold"]
 
-                elif cover < 0:
-                    new_state = toggle_relay(pipe_number, False)
-                    if not new_state:
-                        logging.debug(f"[HeatPipe] Pipe {pipe_number} already OFF")
+            # All pipes switch in one transition
+            if requested:
+                set_relays(requested, now)
 
-        else:
-            toggle_all_relais(False)
-            pass
+        elif temp >= dest_temp:
+            toggle_all_relais(False, now)
+
+
+def get_heating_power() -> float:
+    """
+    Returns the nominal power in W of all heat pipes that are currently switched on.
+    """
+    heat_pipe_config: dict | None = fetch_heat_pipe_setting()
+    if heat_pipe_config is None:
+        return 0.0
+
+    heat_pipes: dict = load_memory().get("heat_pipes", {})
+    return float(sum(heat_pipe_config.get(f"pipe_{pipe}") or 0 for pipe, state in heat_pipes.items() if state))
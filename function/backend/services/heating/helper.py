@@ -1,107 +1,106 @@
-import json
-import threading
-
-from services.temperature.modbus_temp_module import read_temp_sensors_from_r4dcb08
+import sqlite3
+from typing import Callable
+
+from services.heating.relay_driver import relay_driver
+from services.heating.stage_controller import record_switches
+from services.heating.state_store import state_store
+from services.temperature.modbus_temp_module import get_r4dcb08_temperatures
+from services.temperature.sensor_registry import buffer_tank, get_tank_layout, heat_pipe_tank, tank_readings
 from utils.logging_service import LoggingService
+from utils.metrics import metrics
 
-MEMORY_FILE = "memory.json"
-_memory_lock = threading.Lock()
 DEV_MODE: bool = False
 
 logging = LoggingService()
-RELAY_PINS: dict = {1: 20, 2: 21, 3: 26}
-
-
-def is_raspberry_pi():
-    try:
-        with open('/proc/cpuinfo') as f:
-            return 'raspberry' in f.read().lower()
-    except BaseException:
-        return False
-
+RELAY_SWITCHES = metrics.counter("viki_relay_switches_total", "Heat-pipe relay switches", ("relay", "state"))
 
-IS_RPi: bool = is_raspberry_pi()
+# Tanks shown on the dashboard and how they are found in the sensor layout
+DASHBOARD_TANKS: dict = {
+    "heating_tank": heat_pipe_tank,
+    "buffer_tank": buffer_tank,
+}
 
 
 def load_memory() -> dict:
-    with _memory_lock:
-        try:
-            with open(MEMORY_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            logging.error(f"[MEMORY] Mode file not found: {MEMORY_FILE}")
-            # Erstelle Default-Memory wenn nicht vorhanden
-            default_memory = {
-                "heat_pipes": {"1": False, "2": False, "3": False},
-                "mode": "Automatik"
-            }
-            save_memory(default_memory)
-            return default_memory
-
-
-def save_memory(memory: dict) -> None:
-    with _memory_lock:
-        try:
-            with open(MEMORY_FILE, 'w', encoding='utf-8') as f:
-                json.dump(memory, f, indent=2, ensure_ascii=False)
-        except (FileNotFoundError, IOError) as e:
-            logging.error(f"[MEMORY] Error saving memory file: {e}")
+    """
+    Returns a snapshot of the controller state (``heat_pipes``, ``mode``).
+    """
+    return state_store.load()
 
 
-def toggle_all_relais(state: bool) -> None:
-    gpio = get_gpio()
-    try:
-        memory: dict = load_memory()
-
-        for pin in RELAY_PINS:
-            gpio.output(RELAY_PINS[pin], not state)
-            memory["heat_pipes"][str(pin)] = state
+def update_memory(mutator: Callable[[dict], None]) -> dict:
+    """
+    Atomically applies ``mutator`` to the controller state, see ``StateStore.update``.
+    """
+    return state_store.update(mutator)
 
-        save_memory(memory)
 
-    except Exception as err:
-        logging.error(f"[TOGGLEALLRELAIS] Failed to toggle relay: {err}")
+def toggle_all_relais(state: bool, now: float = None) -> None:
+    set_relays({relay: state for relay in relay_driver.relays}, now)
 
 
 def toggle_relay(pin: int, state: bool) -> bool:
-    gpio = get_gpio()
-    
-    if pin not in RELAY_PINS:
+    if pin not in relay_driver.relays:
         logging.error(f"[TOGGLERELAY] Invalid pin: {pin}")
         return False
-        
-    try:
-        memory: dict = load_memory()
-        
+
+    return state if set_relays({pin: state}) is not None else False
+
+
+def set_relays(states: dict, now: float = None) -> dict | None:
+    """
+    Switches several relays (``{relay: on}``) in one transition and records them in the controller state, including
+    the switching history (``switching``, see ``record_switches``).
+
+    The state is committed first and the relay lines are driven afterwards, so a failed commit never leaves a relay
+    switched without record. If the write fails, the lines keep their old levels until ``sync_relays`` applies the
+    recorded states again. Processes that have not claimed the relays only record the states.
+
+    Returns:
+        dict | None: The relays whose state changed, None if the transition failed.
+    """
+    switched: dict = {}
+
+    def apply(memory: dict) -> None:
         if not memory.get("heat_pipes"):
-            logging.error("[TOGGLERELAY] Heat pipes not initialized in memory")
-            return False
-
-        if memory["heat_pipes"].get(str(pin)) != state:
-            gpio.output(RELAY_PINS[pin], not state)
-            memory["heat_pipes"][str(pin)] = state
-            save_memory(memory)
-            logging.info(f"[TOGGLERELAY] Pipe {pin} set to {state}")
-            return state
-        else:
-            logging.debug(f"[TOGGLERELAY] Pipe {pin} already in state {state}")
-            return state
-
-    except (KeyError, TypeError, ValueError) as err:
-        logging.error(f"[TOGGLERELAY] Failed to toggle relay {pin}: {err}")
-        return False
+            raise KeyError("heat_pipes")
 
+        relay_driver.check(states)
+        current: dict = {int(relay): state for relay, state in memory["heat_pipes"].items()}
+        changed: dict = {relay: state for relay, state in states.items() if current.get(relay) != state}
+        record_switches(memory, changed, now)
+        memory["heat_pipes"].update({str(relay): state for relay, state in states.items()})
+        switched.update(changed)
 
-def read_sensors_by_tank_with_heat_pipe() -> dict:
-    # TODO: Add selector to get active heat pipe tank
-    tank_with_sensor = 0
+    try:
+        memory: dict = update_memory(apply)
+    except (KeyError, TypeError, ValueError, RuntimeError, OSError, sqlite3.Error) as err:
+        logging.error(f"[SETRELAYS] Failed to switch relays {states}: {err}")
+        return None
+
+    if relay_driver.claimed:
+        try:
+            relay_driver.apply({int(relay): state for relay, state in memory["heat_pipes"].items()})
+        except (ValueError, RuntimeError, OSError) as err:
+            logging.error(f"[SETRELAYS] Relays {states} recorded but not written, retrying with the next sync: {err}")
+
+    for relay, state in switched.items():
+        RELAY_SWITCHES.inc(1, str(relay), "on" if state else "off")
+        logging.info(f"[TOGGLERELAY] Pipe {relay} set to {state}")
+    return switched
 
-    if tank_with_sensor == 0:
-        tank: dict = read_temp_sensors_from_r4dcb08({0: 0.0, 1: 0.0, 2: 0.0})
-        dest_temp: float = 50.0  # TODO: Load from database
-    else:
-        tank: dict = read_temp_sensors_from_r4dcb08({3: 0.0, 4: 0.0, 5: 0.0})
-        dest_temp: float = 35.0  # TODO: Load from database
+
+def read_sensors_by_tank_with_heat_pipe() -> dict:
+    """
+    Returns the readings of the tank heated by the heat pipes (``{channel: temperature}`` from bottom to top) and its
+    destination temperature, mapped from one module scan by the sensor registry. Channels without reading are left
+    out, so ``tank`` is empty while the module cannot be read.
+    """
+    tank_setting: dict = heat_pipe_tank(get_tank_layout())
+    tank: dict = {channel: temperature
+                  for channel, temperature in tank_readings(tank_setting, get_r4dcb08_temperatures()).items()
+                  if temperature is not None}
+    dest_temp: float = tank_setting["dest_temp"]
 
     # DEBUG Modus nur wenn gewünscht:
     if DEV_MODE and False:  # Explizit deaktiviert, aktiviere mit True
@@ -111,20 +110,62 @@ def read_sensors_by_tank_with_heat_pipe() -> dict:
     return {"tank": tank, "dest_temp": dest_temp}
 
 
-def get_gpio():
-    if IS_RPi:
-        import RPi.GPIO as GPIO
-    else:
-        from services.heating.GpioMock import RPiGPIOSimulator
-        GPIO = RPiGPIOSimulator()
+def get_tank_sensor_data(tank: str | dict, temperatures: list[float | None] | None) -> dict:
+    """
+    Builds the dashboard view of one tank from a full scan of the *R4DCB08* module.
 
-    return GPIO
+    Args:
+        tank (str | dict): Name in ``DASHBOARD_TANKS`` or a tank of the sensor layout.
+        temperatures (list[float | None] | None): The channel readings, None if the module could not be read.
 
+    Returns:
+        dict: ``dest_temp``, ``sensor_1`` … (bottom to top, ``None`` without reading) and ``heat_pipe``; empty if the
+        tank does not exist.
+    """
+    if isinstance(tank, str):
+        tank = DASHBOARD_TANKS[tank](get_tank_layout())
+        if tank is None:
+            return {}
+
+    data: dict = {'dest_temp': tank["dest_temp"]}
+    for index, temperature in enumerate(tank_readings(tank, temperatures).values(), start=1):
+        data[f'sensor_{index}'] = temperature
+    data['heat_pipe'] = tank["heat_pipe"]
+    return data
 
-def init_gpio():
-    GPIO = get_gpio()
 
-    GPIO.setmode(GPIO.BCM)
-    for pin in RELAY_PINS.values():
-        GPIO.setup(pin, GPIO.OUT)
-        GPIO.output(pin, True)
+def get_all_tank_sensor_data(temperatures: list[float | None] | None) -> list[dict]:
+    """
+    Builds the view of every tank of the sensor layout from one module scan.
+    """
+    return [{"id": tank["id"], "description": tank["description"], **get_tank_sensor_data(tank, temperatures)}
+            for tank in get_tank_layout()]
+
+
+def init_gpio():
+    """
+    Claims the relay lines for this process and sets them to the states recorded in the controller state, so a restart
+    keeps the heat pipes (and their dwell times) as they are. Relays without a recorded state start switched off.
+    Called by the scheduler leader only, see ``LeaderScheduler.on_leader``.
+    """
+    def apply(memory: dict) -> None:
+        recorded: dict = memory.get("heat_pipes") or {}
+        memory["heat_pipes"] = {str(relay): bool(recorded.get(str(relay), False)) for relay in relay_driver.relays}
+
+    memory: dict = update_memory(apply)
+    relay_driver.claim({int(relay): state for relay, state in memory["heat_pipes"].items()})
+    logging.info(f"[GPIO] Relays claimed with {memory['heat_pipes']}")
+
+
+def sync_relays() -> dict:
+    """
+    Drives the relay lines to the states in the controller state, e.g. after a worker process recorded a manual
+    switch. Does nothing in processes that have not claimed the relays.
+
+    Returns:
+        dict: The relays that were written, with their new state.
+    """
+    if not relay_driver.claimed:
+        return {}
+    heat_pipes: dict = load_memory().get("heat_pipes") or {}
+    return relay_driver.apply({int(relay): state for relay, state in heat_pipes.items()})
@@ -0,0 +1,437 @@
+"""
+Cost-optimal heat-pipe schedule for the next 24–36 h from the price curve, the expected PV surplus and the tank state.
+
+The horizon is split into 15-minute slots. A backward dynamic program over (tank temperature, active stage) finds for
+every slot the heating stage (0 = off, 1–3 = heat pipes ``pipe_1`` … ``pipe_N`` on) that minimises grid cost plus lost
+feed-in, while the tank reaches its destination temperature at every deadline and at the end of the horizon.
+"""
+
+import bisect
+import datetime
+import threading
+import time
+from typing import Callable
+
+import numpy as np
+
+from config import Config
+from services.energy.energy_history import query_energy
+from services.energy.price_cache import get_price_curve
+from services.energy.pv_forecast import forecast_cloud_cover, forecast_production
+from services.heating.tank_model import TankModel, get_stage_powers, get_tank_model
+from services.temperature.sensor_registry import get_tank_layout, heat_pipe_tank
+from utils.logging_service import LoggingService
+
+logging = LoggingService()
+
+SLOT_SECONDS: int = 900
+MIN_HORIZON: int = 24 * 3600
+MAX_HORIZON: int = 36 * 3600
+# J/(l·K)
+WATER_HEAT_CAPACITY: float = 4186.0
+# Fraction of the tank/ambient temperature difference lost per hour (≈ 2 kWh/day for 300 l at 60 °C)
+LOSS_RATE: float = 0.006
+AMBIENT_TEMP: float = 20.0
+DEFAULT_VOLUME: int = 300
+# € per K below the destination temperature at a deadline, dominates every realistic energy cost
+DEFICIT_PENALTY: float = 10.0
+# € per slot and K below the minimum temperature
+COMFORT_PENALTY: float = 1.0
+# € per stage change, keeps the relays from chattering between nearly equal options
+SWITCH_COST: float = 0.01
+
+
+class HeatingPlan:
+    """
+    Schedule for the remaining slots of a policy, simulated from the current tank state.
+    """
+
+    def __init__(self, start: int, stages: list, powers: list, prices: list, temperatures: list, cost: float):
+        self.start = start
+        self.stages = stages
+        self.powers = powers
+        self.prices = prices
+        self.temperatures = temperatures
+        self.cost = cost
+
+    def stage_at(self, timestamp: float) -> int:
+        index: int = int((timestamp - self.start) // SLOT_SECONDS)
+        if 0 <= index < len(self.stages):
+            return self.stages[index]
+        return 0
+
+    def to_dict(self) -> dict:
+        return {
+            "start": self.start,
+            "slot_seconds": SLOT_SECONDS,
+            "cost": round(self.cost, 4),
+            "slots": [
+                {
+                    "start": self.start + index * SLOT_SECONDS,
+                    "stage": stage,
+                    "power": self.powers[index],
+                    "price": self.prices[index],
+                    "temperature": round(self.temperatures[index + 1], 2),
+                }
+                for index, stage in enumerate(self.stages)
+            ],
+        }
+
+
+class HeatingPolicy:
+    """
+    Result of the backward pass: the best stage for every slot, grid temperature and previously active stage.
+
+    The policy stays valid for the remaining slots as long as their inputs do not change, so later re-plans within the
+    same horizon only simulate forward from the new tank state.
+    """
+
+    def __init__(self, start: int, grid: np.ndarray, policy: np.ndarray, stage_powers: np.ndarray,
+                 heat_per_slot: np.ndarray, prices: np.ndarray, costs: np.ndarray, loss: float, ambient_temp: float,
+                 max_temp: float):
+        self.start = start
+        self.grid = grid
+        self.policy = policy
+        self.stage_powers = stage_powers
+        self.heat_per_slot = heat_per_slot
+        self.prices = prices
+        self.costs = costs
+        self.loss = loss
+        self.ambient_temp = ambient_temp
+        self.max_temp = max_temp
+
+    @property
+    def slots(self) -> int:
+        return self.policy.shape[0]
+
+    @property
+    def end(self) -> int:
+        return self.start + self.slots * SLOT_SECONDS
+
+    def stage_for(self, slot: int, temperature: float, stage: int = 0) -> int:
+        """
+        Returns the stage the policy chooses in ``slot`` for the given tank temperature and active stage.
+        """
+        step: float = float(self.grid[1] - self.grid[0])
+        index: int = int(np.clip(round((temperature - self.grid[0]) / step), 0, len(self.grid) - 1))
+        return int(self.policy[slot, index, min(max(stage, 0), len(self.stage_powers) - 1)])
+
+    def simulate(self, temperature: float, stage: int = 0, from_slot: int = 0) -> HeatingPlan:
+        """
+        Follows the policy from slot ``from_slot`` with the given tank temperature and active stage.
+        """
+        stages: list = []
+        temperatures: list = [temperature]
+        cost: float = 0.0
+
+        for slot in range(from_slot, self.slots):
+            stage = self.stage_for(slot, temperature, stage)
+            temperature = min(_next_temperature(temperature, self.heat_per_slot[stage], self.loss, self.ambient_temp),
+                              self.max_temp)
+            stages.append(stage)
+            temperatures.append(temperature)
+            cost += float(self.costs[slot, stage])
+
+        return HeatingPlan(
+            start=self.start + from_slot * SLOT_SECONDS,
+            stages=stages,
+            powers=[int(self.stage_powers[stage]) for stage in stages],
+            prices=[round(float(price), 4) for price in self.prices[from_slot:]],
+            temperatures=temperatures,
+            cost=cost,
+        )
+
+
+def solve_heating_policy(start: int, prices: list, surplus: list, stage_powers: list, target_temp: float,
+                         volume: float = DEFAULT_VOLUME, deadlines: list = (), min_temp: float = None,
+                         max_temp: float = None, feed_in_price: float = None, loss_rate: float = LOSS_RATE,
+                         ambient_temp: float = AMBIENT_TEMP, temp_step: float = 0.25) -> HeatingPolicy:
+    """
+    Solves the heating schedule with a backward dynamic program, vectorised over all tank temperatures.
+
+    Args:
+        start (int): Start of the first slot (UNIX epoch seconds, multiple of ``SLOT_SECONDS``).
+        prices (list): Grid price in €/kWh per slot.
+        surplus (list): Expected PV surplus in W per slot (production minus household consumption).
+        stage_powers (list): Power in W per stage, ``stage_powers[0]`` must be ``0``.
+        target_temp (float): Destination temperature that must be reached at every deadline and at the end.
+        volume (float): Tank volume in liters.
+        deadlines (list): Slot indices at whose end the destination temperature must be reached.
+        min_temp (float): Temperature the tank should never fall below, default ``target_temp - 15``.
+        max_temp (float): Upper tank limit, default ``PLANNER_MAX_TEMP``.
+        feed_in_price (float): €/kWh earned for PV surplus fed into the grid, default ``PLANNER_FEED_IN_PRICE``.
+        loss_rate (float): Fraction of the tank/ambient difference lost per hour.
+        ambient_temp (float): Temperature around the tank.
+        temp_step (float): Resolution of the temperature grid in K.
+
+    Returns:
+        HeatingPolicy: The optimal policy for all slots.
+    """
+    min_temp = target_temp - 15.0 if min_temp is None else min_temp
+    max_temp = Config.PLANNER_MAX_TEMP if max_temp is None else max_temp
+    feed_in_price = Config.PLANNER_FEED_IN_PRICE if feed_in_price is None else feed_in_price
+
+    prices_arr: np.ndarray = np.asarray(prices, dtype=float)
+    surplus_kwh: np.ndarray = np.clip(np.asarray(surplus, dtype=float), 0.0, None) * SLOT_SECONDS / 3_600_000
+    powers: np.ndarray = np.asarray(stage_powers, dtype=float)
+    stage_kwh: np.ndarray = powers * SLOT_SECONDS / 3_600_000
+    heat_per_slot: np.ndarray = stage_kwh * 3_600_000 / (volume * WATER_HEAT_CAPACITY)
+    loss: float = loss_rate * SLOT_SECONDS / 3600
+    slots: int = len(prices_arr)
+    stages: int = len(powers)
+
+    # Grid energy is bought, PV surplus used for heating is not fed in
+    from_pv: np.ndarray = np.minimum(stage_kwh[None, :], surplus_kwh[:, None])
+    costs: np.ndarray = (stage_kwh[None, :] - from_pv) * prices_arr[:, None] + from_pv * feed_in_price
+
+    grid: np.ndarray = np.arange(min(ambient_temp, min_temp - 10.0), max_temp + temp_step, temp_step)
+    switch: np.ndarray = SWITCH_COST * np.abs(np.arange(stages)[:, None] - np.arange(stages)[None, :])
+    deadline_slots: set = set(deadlines)
+
+    # value[t, s]: minimal cost from the current slot on with grid temperature t and stage s active before
+    value: np.ndarray = np.repeat((DEFICIT_PENALTY * np.clip(target_temp - grid, 0.0, None))[:, None], stages, axis=1)
+    policy: np.ndarray = np.zeros((slots, len(grid), stages), dtype=np.int8)
+
+    # The temperature after a slot only depends on grid point and stage, so the interpolation positions and the
+    # penalties are computed once for all slots: following[t, s] lies between grid[lower[t, s]] and the next point
+    following: np.ndarray = _next_temperature(grid[:, None], heat_per_slot[None, :], loss, ambient_temp)
+    lower: np.ndarray = np.clip(np.searchsorted(grid, following, side="right") - 1, 0, len(grid) - 2)
+    weight: np.ndarray = np.clip((following - grid[lower]) / (grid[lower + 1] - grid[lower]), 0.0, 1.0)
+    points: np.ndarray = np.arange(len(grid))[:, None]
+    columns: np.ndarray = np.arange(stages)[None, :]
+    comfort: np.ndarray = COMFORT_PENALTY * np.clip(min_temp - following, 0.0, None)
+    deficit: np.ndarray = DEFICIT_PENALTY * np.clip(target_temp - following, 0.0, None)
+    overheated: np.ndarray = following > max_temp + temp_step
+    overheated[:, 0] = False
+
+    for slot in range(slots - 1, -1, -1):
+        below: np.ndarray = value[lower, columns]
+        action: np.ndarray = costs[slot][None, :] + (below + weight * (value[lower + 1, columns] - below))
+        action += comfort
+        if slot in deadline_slots:
+            action += deficit
+        action[overheated] = np.inf
+
+        # total[t, previous, stage]
+        total: np.ndarray = action[:, None, :] + switch[None, :, :]
+        policy[slot] = np.argmin(total, axis=2)
+        value = total[points, columns, policy[slot]]
+
+    return HeatingPolicy(start, grid, policy, powers, heat_per_slot, prices_arr, costs, loss, ambient_temp, max_temp)
+
+
+def _next_temperature(temperature, heat: float, loss: float, ambient_temp: float):
+    return temperature + heat - loss * (temperature - ambient_temp)
+
+
+class HeatingPlanner:
+    """
+    Keeps the current policy and re-plans incrementally.
+
+    ``refresh`` collects the inputs (prices, PV surplus, heat-pipe power, destination temperature, tank volume) from
+    the database. The backward pass only runs again if the inputs of the remaining slots changed; otherwise the
+    existing policy is kept. In the scheduler leader ``refresh_heating_plan`` calls it periodically, so the control tick
+    only looks up the current slot with ``current_stage``.
+
+    Args:
+        collect (Callable): ``(now, target_temp) -> inputs`` used instead of ``collect_planner_inputs`` (replay).
+    """
+
+    def __init__(self, collect: Callable = None):
+        self.collect = collect
+        self._policy: HeatingPolicy | None = None
+        self._inputs: tuple | None = None
+        self._lock = threading.Lock()
+
+    def refresh(self, target_temp: float, now: float = None) -> HeatingPolicy | None:
+        """
+        Collects the inputs and solves the policy again if they changed.
+
+        Returns:
+            HeatingPolicy | None: The current policy, ``None`` if no prices or heat-pipe settings are available.
+        """
+        now = time.time() if now is None else now
+        inputs: dict | None = (self.collect or collect_planner_inputs)(now, target_temp)
+
+        with self._lock:
+            if inputs is None:
+                self._policy = self._inputs = None
+                return None
+
+            policy: HeatingPolicy | None = self._reusable_policy(inputs)
+            if policy is None:
+                started: float = time.perf_counter()
+                policy = solve_heating_policy(**inputs)
+                logging.debug(f"[PLANNER] Solved {policy.slots} slots in {time.perf_counter() - started:.3f}s")
+                self._policy = policy
+                self._inputs = _fingerprint(inputs)
+            return policy
+
+    def plan(self, temperature: float, target_temp: float, stage: int = 0, now: float = None) -> HeatingPlan | None:
+        """
+        Refreshes the policy and returns the plan from the current slot on, ``None`` if no prices or heat-pipe settings
+        are available.
+        """
+        now = time.time() if now is None else now
+        policy: HeatingPolicy | None = self.refresh(target_temp, now)
+        if policy is None:
+            return None
+        return policy.simulate(temperature, stage, int(now - policy.start) // SLOT_SECONDS)
+
+    def current_stage(self, temperature: float, stage: int = 0, now: float = None) -> int | None:
+        """
+        Returns the stage of the current slot in the policy of the last ``refresh``, ``None`` if there is none or it
+        does not cover ``now``. Runs no queries.
+        """
+        now = time.time() if now is None else now
+        policy: HeatingPolicy | None = self._policy
+        if policy is None:
+            return None
+        slot: int = int(now - policy.start) // SLOT_SECONDS
+        if not 0 <= slot < policy.slots:
+            return None
+        return policy.stage_for(slot, temperature, stage)
+
+    def _reusable_policy(self, inputs: dict) -> HeatingPolicy | None:
+        policy, previous = self._policy, self._inputs
+        if policy is None or previous is None:
+            return None
+
+        offset: int = (inputs["start"] - policy.start) // SLOT_SECONDS
+        current: tuple = _fingerprint(inputs)
+        if offset < 0 or offset >= policy.slots or policy.end != inputs["start"] + len(inputs["prices"]) * SLOT_SECONDS:
+            return None
+
+        # Same settings, and the remaining slots of the old horizon have the same prices, surplus and deadlines
+        if current[0] != previous[0]:
+            return None
+        if current[1] != previous[1][offset:] or current[2] != previous[2][offset:]:
+            return None
+        if current[3] != tuple(slot - offset for slot in previous[3] if slot >= offset):
+            return None
+        return policy
+
+
+def _fingerprint(inputs: dict) -> tuple:
+    settings: tuple = (tuple(inputs["stage_powers"]), inputs["target_temp"], inputs["volume"], inputs["loss_rate"],
+                       inputs["ambient_temp"])
+    return settings, tuple(inputs["prices"]), tuple(inputs["surplus"]), tuple(inputs["deadlines"])
+
+
+def collect_planner_inputs(now: float, target_temp: float) -> dict | None:
+    """
+    Gathers the arguments of ``solve_heating_policy`` from the database, see ``build_planner_inputs``. The PV
+    production comes from the local forecast (clear sky reduced by the stored cloud cover forecast), volume and standby
+    loss from the fitted model of the heat-pipe tank.
+
+    Returns:
+        dict | None: Keyword arguments for ``solve_heating_policy`` or ``None`` without prices or heat pipes.
+    """
+    layout: list = get_tank_layout()
+    return build_planner_inputs(
+        now, target_temp, get_stage_powers(), get_tank_model(layout.index(heat_pipe_tank(layout))),
+        price_curve=get_price_curve,
+        energy_history=lambda start, end: query_energy(start, end, "hour", now),
+        production_forecast=lambda start, end: forecast_production(
+            start, end, SLOT_SECONDS, forecast_cloud_cover(start, end, SLOT_SECONDS)),
+    )
+
+
+def build_planner_inputs(now: float, target_temp: float, stage_powers: list, tank: TankModel, price_curve: Callable,
+                         energy_history: Callable, production_forecast: Callable) -> dict | None:
+    """
+    Builds the arguments of ``solve_heating_policy`` from the given sources, so the replay can plan without a database.
+
+    The horizon ends with the last known price, at least 24 h and at most 36 h ahead. Slots without a published price
+    use the price of the same time one day earlier. The PV surplus is the production forecast minus the regular
+    household consumption of the same hour on the last day with data; without a forecast (no configured PV arrays) it
+    is the measured surplus of that hour (persistence forecast).
+
+    Args:
+        now (float): Current time.
+        target_temp (float): Destination temperature of the heat-pipe tank.
+        stage_powers (list): Power in W per stage, see ``get_stage_powers``.
+        tank (TankModel): Model of the heat-pipe tank, provides volume and standby loss.
+        price_curve (Callable): ``(start, end) -> [(starts_at, €/kWh), …]`` of the published prices.
+        energy_history (Callable): ``(start, end) -> [{"timestamp", "production", "regular", …}, …]`` per hour in kWh.
+        production_forecast (Callable): ``(start, end) -> [W per slot]``, None without PV arrays.
+
+    Returns:
+        dict | None: Keyword arguments for ``solve_heating_policy`` or ``None`` without prices or heat pipes.
+    """
+    if len(stage_powers) < 2:
+        return None
+
+    start: int = int(now // SLOT_SECONDS * SLOT_SECONDS)
+    curve: list = price_curve(start - 86400, start + MAX_HORIZON)
+    if not curve:
+        return None
+
+    interval: int = min((b[0] - a[0] for a, b in zip(curve, curve[1:])), default=3600)
+    known_end: int = curve[-1][0] + interval
+    end: int = min(max(known_end, start + MIN_HORIZON), start + MAX_HORIZON)
+    end = end // SLOT_SECONDS * SLOT_SECONDS
+    slot_starts: list = list(range(start, end, SLOT_SECONDS))
+
+    starts: list = [starts_at for starts_at, _ in curve]
+    prices: list = [_price_at(curve, starts, interval, slot) for slot in slot_starts]
+    if any(price is None for price in prices):
+        known: list = [price for price in prices if price is not None] or [value for _, value in curve]
+        fallback: float = sum(known) / len(known)
+        prices = [fallback if price is None else price for price in prices]
+
+    history: list = energy_history(start - 7 * 86400, start)
+    production: list | None = production_forecast(start, end)
+    if production is None:
+        hours: dict = {entry["timestamp"]: max(entry["production"] - entry["regular"], 0.0) * 1000 for entry in history}
+        surplus: list = [_persistence(hours, slot // 3600 * 3600, start) for slot in slot_starts]
+    else:
+        regular: dict = {entry["timestamp"]: entry["regular"] * 1000 for entry in history}
+        surplus: list = [max(power - _persistence(regular, slot // 3600 * 3600, start), 0.0)
+                         for slot, power in zip(slot_starts, production)]
+
+    deadlines: list = [
+        index for index, slot in enumerate(slot_starts)
+        if datetime.datetime.fromtimestamp(slot + SLOT_SECONDS).strftime("%H:%M") == f"{Config.PLANNER_TARGET_HOUR:02d}:00"
+    ]
+
+    return {
+        "start": start,
+        "prices": [round(price, 5) for price in prices],
+        "surplus": [round(value, 1) for value in surplus],
+        "stage_powers": stage_powers,
+        "target_temp": float(target_temp),
+        "volume": tank.volume,
+        "loss_rate": round(tank.loss_rate, 6),
+        "ambient_temp": tank.ambient_temp,
+        "deadlines": deadlines,
+    }
+
+
+def refresh_heating_plan(now: float = None) -> None:
+    """
+    Scheduler job: refreshes the policy of ``heating_planner`` for the destination temperature of the heat-pipe tank.
+    """
+    tank: dict = heat_pipe_tank(get_tank_layout())
+    if heating_planner.refresh(tank["dest_temp"], now) is None:
+        logging.warning("[PLANNER] No prices or heat-pipe settings available, no heating plan")
+
+
+def _price_at(curve: list, starts: list, interval: int, timestamp: int) -> float | None:
+    # Published price of the interval containing the timestamp, otherwise the one of the same time a day earlier
+    for moment in (timestamp, timestamp - 86400):
+        index: int = bisect.bisect_right(starts, moment) - 1
+        if index >= 0 and moment < starts[index] + interval:
+            return curve[index][1]
+    return None
+
+
+def _persistence(hours: dict, hour: int, start: int) -> float:
+    for days in range(1, 8):
+        moment: int = hour - days * 86400
+        if moment < start and moment in hours:
+            return hours[moment]
+    return 0.0
+
+
+heating_planner = HeatingPlanner()
@@ -0,0 +1,229 @@
+"""
+Heat-pipe relay driver: configurable pin map, shadow register and pluggable GPIO backends.
+"""
+
+import threading
+from typing import Callable
+
+from config import Config
+from database.fetch_data import fetch_relay_pins
+from utils.logging_service import LoggingService
+
+logging = LoggingService()
+
+# Default BCM pin per relay (heat pipe 1–3), overridden by ``heating_settings.gpio_pin``
+RELAY_PINS: dict = {1: 20, 2: 21, 3: 26}
+GPIOD_CONSUMER: str = "viki-relays"
+
+
+def is_raspberry_pi():
+    try:
+        with open('/proc/cpuinfo') as f:
+            return 'raspberry' in f.read().lower()
+    except BaseException:
+        return False
+
+
+IS_RPi: bool = is_raspberry_pi()
+
+
+class GpioModuleBackend:
+    """
+    Backend for modules with the ``RPi.GPIO`` API, i.e. ``RPi.GPIO`` itself and the simulator in ``GpioMock``.
+    Levels are physical (True = high).
+    """
+
+    def __init__(self, gpio):
+        self.gpio = gpio
+
+    def setup(self, levels: dict) -> None:
+        self.gpio.setmode(self.gpio.BCM)
+        for pin, level in levels.items():
+            self.gpio.setup(pin, self.gpio.OUT, initial=level)
+
+    def write(self, levels: dict) -> None:
+        for pin, level in levels.items():
+            self.gpio.output(pin, level)
+
+
+class GpiodBackend:
+    """
+    Backend for the Linux GPIO character device (``gpiod`` ≥ 2.0). All relay lines are held in one line request, so a
+    multi-relay write is a single ``set_values`` call.
+    """
+
+    def __init__(self, chip: str = None):
+        import gpiod
+        from gpiod.line import Direction, Value
+
+        self._gpiod = gpiod
+        self._direction = Direction
+        self._value = Value
+        self.chip = chip or Config.RELAY_GPIO_CHIP
+        self._request = None
+
+    def setup(self, levels: dict) -> None:
+        if self._request is not None:
+            self._request.release()
+        self._request = self._gpiod.request_lines(
+            self.chip,
+            consumer=GPIOD_CONSUMER,
+            config={pin: self._gpiod.LineSettings(direction=self._direction.OUTPUT, output_value=self._level(level))
+                    for pin, level in levels.items()},
+        )
+
+    def write(self, levels: dict) -> None:
+        self._request.set_values({pin: self._level(level) for pin, level in levels.items()})
+
+    def _level(self, level: bool):
+        return self._value.ACTIVE if level else self._value.INACTIVE
+
+
+def create_backend(name: str = None):
+    """
+    Creates the GPIO backend ``name`` (``auto``, ``rpi``, ``gpiod`` or ``simulator``, default ``RELAY_BACKEND``).
+    ``auto`` uses ``RPi.GPIO`` on a Raspberry Pi and the simulator elsewhere.
+    """
+    name = (name or Config.RELAY_BACKEND).lower()
+    if name == "auto":
+        name = "rpi" if IS_RPi else "simulator"
+
+    if name == "rpi":
+        import RPi.GPIO as GPIO
+        GPIO.setwarnings(False)
+        return GpioModuleBackend(GPIO)
+    if name == "gpiod":
+        return GpiodBackend()
+    if name == "simulator":
+        from services.heating.GpioMock import gpio_simulator
+        return GpioModuleBackend(gpio_simulator)
+    raise ValueError(f"Unknown relay backend '{name}'")
+
+
+class RelayDriver:
+    """
+    Switches the heat-pipe relays (active low) through a GPIO backend.
+
+    Relay N is wired to the ``gpio_pin`` of the N-th heat-pipe row in ``heating_settings``, relays without a configured
+    pin keep their default from ``RELAY_PINS``. The pin map is re-read from the settings cache on every call and the
+    lines are set up again only when it changes.
+
+    GPIO lines can only be held by one process, so the driver does nothing until ``claim`` is called. Only the
+    scheduler leader claims the relays (see ``helper.init_gpio``); the other worker processes record the requested
+    states in the shared controller state, which the leader applies with ``helper.sync_relays``.
+
+    A shadow register holds the state last written per relay, so relays that are already in the requested state are
+    never written, and ``apply`` switches several relays with one backend write. A failed write leaves the shadow
+    unchanged, so the next ``apply`` with the same states retries it.
+
+    Args:
+        backend: GPIO backend, created lazily with ``create_backend`` if omitted.
+        pin_loader (Callable): Returns the configured ``{relay: pin}`` overrides, None if they cannot be read.
+    """
+
+    def __init__(self, backend=None, pin_loader: Callable[[], dict | None] = None):
+        self._backend = backend
+        self._pin_loader = pin_loader or fetch_relay_pins
+        self._pins: dict | None = None
+        self._shadow: dict = {}
+        self._lock = threading.RLock()
+        self.claimed: bool = False
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = create_backend()
+        return self._backend
+
+    @property
+    def relays(self) -> tuple:
+        return tuple(RELAY_PINS)
+
+    def pins(self) -> dict:
+        """
+        Returns the current ``{relay: pin}`` map.
+        """
+        with self._lock:
+            if not self.claimed:
+                return self._load_pins() or dict(RELAY_PINS)
+            self._refresh_pins()
+            return dict(self._pins)
+
+    def check(self, states: dict) -> None:
+        """
+        Raises ValueError if ``states`` contains a relay that does not exist.
+        """
+        unknown: set = set(states) - set(RELAY_PINS)
+        if unknown:
+            raise ValueError(f"Invalid relay: {', '.join(map(str, sorted(unknown)))}")
+
+    def claim(self, states: dict = None) -> None:
+        """
+        Takes over the relay lines for this process and sets them up with ``states`` (``{relay: on}``), relays
+        without a state are switched off.
+        """
+        with self._lock:
+            self._shadow = {relay: bool((states or {}).get(relay, False)) for relay in RELAY_PINS}
+            self._pins = None
+            self._refresh_pins()
+            self.claimed = True
+
+    def apply(self, states: dict) -> dict:
+        """
+        Switches the relays in ``states`` (``{relay: on}``) with one backend write.
+
+        Args:
+            states (dict): Requested state per relay.
+
+        Returns:
+            dict: The relays that were actually written, with their new state.
+
+        Raises:
+            ValueError: If a relay does not exist.
+            RuntimeError: If this process has not claimed the relays.
+        """
+        if not self.claimed:
+            raise RuntimeError("Relays are not claimed by this process")
+        self.check(states)
+
+        with self._lock:
+            self._refresh_pins()
+
+            changed: dict = {relay: state for relay, state in states.items() if self._shadow.get(relay) != state}
+            if changed:
+                self.backend.write({self._pins[relay]: not state for relay, state in changed.items()})
+                self._shadow.update(changed)
+            return changed
+
+    def _load_pins(self) -> dict | None:
+        try:
+            configured: dict | None = self._pin_loader()
+        except Exception as err:
+            logging.error(f"[RELAY] Could not load the relay pins: {err}")
+            return None
+        if configured is None:
+            # Settings unreadable: keep the current pins instead of falling back to the defaults
+            return None
+        return {relay: configured.get(relay) or pin for relay, pin in RELAY_PINS.items()}
+
+    def _refresh_pins(self) -> None:
+        pins: dict | None = self._load_pins()
+        if pins is None:
+            if self._pins is not None:
+                return
+            pins = dict(RELAY_PINS)
+        if pins == self._pins:
+            return
+
+        if self._pins is not None:
+            # Release the relays from pins that are no longer used before taking over the new ones
+            released: dict = {pin: True for pin in set(self._pins.values()) - set(pins.values())}
+            if released:
+                self.backend.write(released)
+            logging.info(f"[RELAY] Relay pins changed from {self._pins} to {pins}")
+
+        self.backend.setup({pin: not self._shadow.get(relay, False) for relay, pin in pins.items()})
+        self._pins = pins
+
+
+relay_driver = RelayDriver()
@@ -0,0 +1,385 @@
+"""
+Deterministic replay of the heat-pipe control loop, faster than real time.
+
+Recorded or synthetic production/consumption series are fed tick by tick through the real ``automatic_control`` and
+relay code. GPIO, the Modbus temperature module, the controller state and the heat-pipe settings are replaced by
+in-process stand-ins, and the tank reacts to the switched power through the ``TankModel``. In mode ``Preisoptimiert``
+the real planner runs on the replayed prices and energy history instead of the database.
+
+Usage::
+
+    python -m services.heating.simulation --days 365                      # synthetic year
+    python -m services.heating.simulation --from-db 2025-06-01 2025-06-08  # recorded week
+    python -m services.heating.simulation --days 30 --mode Preisoptimiert --dynamic-prices
+"""
+
+import argparse
+import contextlib
+import datetime
+import json
+import operator
+import sys
+import time
+
+import numpy as np
+
+from config import Config
+from services.energy.price_cache import TOMORROW_PUBLISHED_HOUR
+from services.heating import heat_pipe, helper
+from services.heating.planner import HeatingPlanner, build_planner_inputs
+from services.heating.relay_driver import RELAY_PINS, RelayDriver
+from services.heating.state_store import DEFAULT_STATE, MemoryStateStore
+from services.heating.tank_model import LAYERS, TankModel, get_stage_powers
+from services.temperature.sensor_registry import DEFAULT_TANKS, heat_pipe_tank
+from utils.logging_service import LoggingService
+
+logging = LoggingService()
+
+TICK_SECONDS: int = 30
+DEFAULT_HEAT_PIPE_CONFIG: dict = {"pipe_1": 2000, "buffer_1": 100, "pipe_2": 2000, "buffer_2": 100,
+                                  "pipe_3": 2000, "buffer_3": 100}
+COLD_WATER_TEMP: float = 10.0
+SUPPORTED_MODES: tuple = ("Automatik", "Manuell", "Schnell heizen", "Urlaub", "Preisoptimiert")
+
+
+class ReplayBackend:
+    """
+    Relay backend stand-in that records the pin levels and counts real transitions per pin.
+    """
+
+    def __init__(self):
+        self.levels: dict = {}
+        self.switches: dict = {pin: 0 for pin in RELAY_PINS.values()}
+
+    def setup(self, levels: dict) -> None:
+        self.levels.update(levels)
+
+    def write(self, levels: dict) -> None:
+        for pin, level in levels.items():
+            if self.levels.get(pin, True) != level:
+                self.switches[pin] = self.switches.get(pin, 0) + 1
+            self.levels[pin] = level
+
+
+class ReplayStateStore(MemoryStateStore):
+    """
+    Single-threaded controller state without defensive copies. The control code only reads the snapshots and changes
+    the state through ``update``, so sharing the dict is safe and saves most of the per-tick overhead. ``version``
+    counts the updates, so the replay only recomputes derived values (heating power) after a transition.
+    """
+
+    version: int = 0
+
+    def load(self) -> dict:
+        return self._state
+
+    def update(self, mutator) -> dict:
+        mutator(self._state)
+        self.version += 1
+        return self._state
+
+
+class ReplayPlannerSources:
+    """
+    Planner inputs of a replay instead of the database: the hourly price curve as far as it is published at the
+    replayed time (the next day from ``TOMORROW_PUBLISHED_HOUR`` on) and the hourly energy history of the completed
+    hours. There is no PV forecast, so the planner uses the persistence forecast of the history, as without configured
+    PV arrays. Days of the replay start at multiples of 86400 s.
+
+    Args:
+        prices: Grid price in €/kWh per tick, averaged per hour.
+        production: PV production in W per tick.
+        consumption: Household consumption without heat pipes in W per tick.
+        heat_pipe_config (dict): Heat-pipe settings, gives the stage powers.
+        tank (TankModel): Tank model, gives volume and standby loss.
+        tick_seconds (int): Length of one tick in seconds.
+    """
+
+    def __init__(self, prices, production, consumption, heat_pipe_config: dict, tank: TankModel,
+                 tick_seconds: int = TICK_SECONDS):
+        hour: np.ndarray = np.arange(len(production)) * tick_seconds // 3600
+        ticks_per_hour: np.ndarray = np.bincount(hour)
+        to_kwh: float = tick_seconds / 3_600_000
+        self.prices: list = (np.bincount(hour, weights=prices) / ticks_per_hour).tolist()
+        self.production: list = (np.bincount(hour, weights=production) * to_kwh).tolist()
+        self.regular: list = (np.bincount(hour, weights=consumption) * to_kwh).tolist()
+        self.stage_powers: list = get_stage_powers(heat_pipe_config)
+        self.tank = tank
+        self.now: float = 0.0
+
+    def collect(self, now: float, target_temp: float) -> dict | None:
+        self.now = now
+        return build_planner_inputs(now, target_temp, self.stage_powers, self.tank, self.price_curve,
+                                    self.energy_history, lambda start, end: None)
+
+    def price_curve(self, start: float, end: float) -> list:
+        day: int = int(self.now // 86400)
+        published: int = (day + (2 if self.now % 86400 >= TOMORROW_PUBLISHED_HOUR * 3600 else 1)) * 86400
+        hours: range = range(max(int(-(-start // 3600)), 0), min(int(-(-min(end, published) // 3600)), len(self.prices)))
+        return [(hour * 3600, self.prices[hour]) for hour in hours]
+
+    def energy_history(self, start: float, end: float) -> list:
+        completed: int = min(int(self.now // 3600), len(self.production))
+        hours: range = range(max(int(-(-start // 3600)), 0), min(int(-(-end // 3600)), completed))
+        return [{"timestamp": hour * 3600, "production": self.production[hour], "regular": self.regular[hour]}
+                for hour in hours]
+
+
+@contextlib.contextmanager
+def replay_environment(store: ReplayStateStore, backend: ReplayBackend, channels: list, heat_pipe_config: dict,
+                       planner: HeatingPlanner = None):
+    """
+    Temporarily routes the hardware and persistence dependencies of the control code to in-process stand-ins.
+
+    Args:
+        store (ReplayStateStore): Controller state used instead of the persistent store.
+        backend (ReplayBackend): GPIO backend of the relay driver, with the default pin map.
+        channels (list): Mutable list of the six channel temperatures returned instead of a Modbus read.
+        heat_pipe_config (dict): Heat-pipe settings returned instead of the database values.
+        planner (HeatingPlanner): Planner used by mode ``Preisoptimiert``, default an empty one (no plan).
+    """
+    quiet = LoggingService(prefix="SIM", level="ERROR")
+    driver = RelayDriver(backend, pin_loader=dict)
+    driver.claim()
+    replacements: list = [
+        (helper, "state_store", store),
+        (helper, "relay_driver", driver),
+        (helper, "get_r4dcb08_temperatures", lambda: channels),
+        (helper, "get_tank_layout", lambda: DEFAULT_TANKS),
+        (helper, "logging", quiet),
+        (heat_pipe, "fetch_heat_pipe_setting", lambda: heat_pipe_config),
+        (heat_pipe, "heating_planner", planner or HeatingPlanner(collect=lambda now, target_temp: None)),
+        (heat_pipe, "logging", quiet),
+    ]
+    originals: list = [(module, name, getattr(module, name)) for module, name, _ in replacements]
+    try:
+        for module, name, value in replacements:
+            setattr(module, name, value)
+        yield
+    finally:
+        for module, name, value in originals:
+            setattr(module, name, value)
+
+
+def run_replay(production, consumption, mode: str = "Automatik", prices=None, feed_in_price: float = 0.08,
+               initial_temps=(45.0, 48.0, 50.0), hot_water_demand=None, heat_pipe_config: dict = None,
+               tank: TankModel = None, tick_seconds: int = TICK_SECONDS) -> dict:
+    """
+    Replays one series through the control loop.
+
+    Args:
+        production: PV production in W per tick.
+        consumption: Household consumption without heat pipes in W per tick.
+        mode (str): Controller mode, one of ``SUPPORTED_MODES``.
+        prices: Grid price in €/kWh per tick (scalar or array), default 0.35. In mode ``Preisoptimiert`` also the
+            price curve of the planner.
+        feed_in_price (float): Feed-in tariff in €/kWh.
+        initial_temps: Initial layer temperatures of the heat-pipe tank (bottom to top).
+        hot_water_demand: Heat drawn from the tank in W per tick, default none.
+        heat_pipe_config (dict): ``pipe_N`` / ``buffer_N`` settings, default 3 × 2 kW.
+        tank (TankModel): Tank model, default 300 l.
+        tick_seconds (int): Length of one control tick in seconds.
+
+    Returns:
+        dict: Report with relay switch counts, energies (kWh), self-consumption ratio, cost and runtime.
+    """
+    if mode not in SUPPORTED_MODES:
+        raise ValueError(f"Mode '{mode}' cannot be replayed, use one of {SUPPORTED_MODES}")
+
+    production = np.asarray(production, dtype=float)
+    consumption = np.asarray(consumption, dtype=float)
+    ticks: int = len(production)
+    prices = np.broadcast_to(np.asarray(0.35 if prices is None else prices, dtype=float), (ticks,))
+    demand = np.broadcast_to(np.asarray(0.0 if hot_water_demand is None else hot_water_demand, dtype=float), (ticks,))
+    # A fresh dict per replay, the stage controller is rebuilt when the settings object changes
+    heat_pipe_config = dict(heat_pipe_config or DEFAULT_HEAT_PIPE_CONFIG)
+    tank = tank or TankModel()
+    pipe_powers: dict = {str(index): heat_pipe_config.get(f"pipe_{index}", 0) for index in RELAY_PINS}
+
+    planner: HeatingPlanner | None = None
+    if mode == "Preisoptimiert":
+        sources = ReplayPlannerSources(prices, production, consumption, heat_pipe_config, tank, tick_seconds)
+        planner = HeatingPlanner(collect=sources.collect)
+    dest_temp: float = heat_pipe_tank(DEFAULT_TANKS)["dest_temp"]
+    refresh_ticks: int = max(Config.PLANNER_REFRESH_INTERVAL // tick_seconds, 1)
+
+    store = ReplayStateStore({**DEFAULT_STATE, "mode": mode})
+    backend = ReplayBackend()
+    channels: list = [0.0] * (2 * LAYERS)
+    heating: np.ndarray = np.empty(ticks)
+    top: np.ndarray = np.empty(ticks)
+
+    # One tank step as plain floats, numpy calls per 30 s tick would dominate the runtime
+    matrix, gain, offset = (value.tolist() for value in tank.step_operator(tick_seconds))
+    draw_gain: float = tick_seconds / tank.layer_capacity
+    temps: list = [float(value) for value in initial_temps]
+    cover: list = (production - consumption).tolist()
+    draws: list = demand.tolist()
+    # The undecorated tick, replayed ticks must not show up in the control tick histogram
+    control = heat_pipe.automatic_control.__wrapped__
+    version: int = -1
+    power: float = 0.0
+    rows: list = []
+
+    started: float = time.perf_counter()
+    with replay_environment(store, backend, channels, heat_pipe_config, planner):
+        for tick in range(ticks):
+            now: int = tick * tick_seconds
+            if planner is not None and tick % refresh_ticks == 0:
+                planner.refresh(dest_temp, now)
+
+            channels[:LAYERS] = temps
+            control(int(cover[tick] - power), now)
+
+            if store.version != version:
+                version = store.version
+                power = float(sum(pipe_powers[pipe] for pipe, state in store.load()["heat_pipes"].items() if state))
+                rows = [(row, gain[layer] * power + offset[layer]) for layer, row in enumerate(matrix)]
+            heating[tick] = power
+
+            temps = sorted([sum(map(operator.mul, row, temps)) + bias for row, bias in rows])
+            # Drawn hot water is replaced by cold water at the bottom, which cannot cool below the inlet temperature
+            temps[0] = max(temps[0] - draw_gain * draws[tick], COLD_WATER_TEMP)
+            temps.sort()
+            top[tick] = temps[-1]
+    runtime: float = time.perf_counter() - started
+
+    to_kwh: float = tick_seconds / 3_600_000
+    load: np.ndarray = consumption + heating
+    self_used: np.ndarray = np.minimum(production, load)
+    grid_import: np.ndarray = load - self_used
+    export: np.ndarray = production - self_used
+    pv_total: float = float(production.sum() * to_kwh)
+
+    return {
+        "ticks": ticks,
+        "simulated_days": round(ticks * tick_seconds / 86400, 2),
+        "runtime_seconds": round(runtime, 3),
+        "ticks_per_second": round(ticks / runtime) if runtime > 0 else None,
+        "switches": {str(pipe): backend.switches.get(pin, 0) for pipe, pin in RELAY_PINS.items()},
+        "heating_kwh": round(float(heating.sum() * to_kwh), 3),
+        "heating_from_pv_kwh": round(float(np.minimum(heating, np.clip(production - consumption, 0, None)).sum()
+                                           * to_kwh), 3),
+        "production_kwh": round(pv_total, 3),
+        "grid_import_kwh": round(float(grid_import.sum() * to_kwh), 3),
+        "export_kwh": round(float(export.sum() * to_kwh), 3),
+        "self_consumption_ratio": round(float(self_used.sum() * to_kwh / pv_total), 4) if pv_total else None,
+        "cost_eur": round(float((grid_import * prices).sum() * to_kwh - export.sum() * to_kwh * feed_in_price), 2),
+        "tank_top_min": round(float(top.min()), 2),
+        "tank_top_max": round(float(top.max()), 2),
+    }
+
+
+def synthetic_inputs(days: int, tick_seconds: int = TICK_SECONDS, peak_power: float = 8000.0, seed: int = 0) -> dict:
+    """
+    Generates a deterministic year-like series: seasonal clear-sky PV with daily cloudiness, a household base load with
+    morning/evening peaks and hot-water draws.
+
+    Returns:
+        dict: ``production``, ``consumption`` and ``hot_water_demand`` in W per tick.
+    """
+    rng = np.random.default_rng(seed)
+    ticks: int = int(days * 86400 / tick_seconds)
+    seconds: np.ndarray = np.arange(ticks) * tick_seconds
+    day: np.ndarray = seconds // 86400
+    hour: np.ndarray = (seconds % 86400) / 3600
+
+    season: np.ndarray = 0.55 + 0.45 * np.cos(2 * np.pi * (day - 172) / 365)
+    daylight: np.ndarray = 8 + 8 * season
+    sun: np.ndarray = np.clip(np.cos(np.pi * (hour - 13) / daylight), 0, None)
+    clouds: np.ndarray = rng.uniform(0.2, 1.0, size=days + 1)[day]
+    production: np.ndarray = peak_power * season * sun * clouds
+
+    peaks: np.ndarray = np.exp(-((hour - 7.5) ** 2) / 0.5) + 1.5 * np.exp(-((hour - 19) ** 2) / 2)
+    consumption: np.ndarray = 300 + 700 * peaks + rng.normal(0, 50, size=ticks).clip(-200, 200)
+    hot_water: np.ndarray = 3000 * (np.exp(-((hour - 7) ** 2) / 0.1) + np.exp(-((hour - 20) ** 2) / 0.2))
+
+    return {"production": production, "consumption": consumption, "hot_water_demand": hot_water}
+
+
+def synthetic_prices(days: int, tick_seconds: int = TICK_SECONDS, seed: int = 0) -> np.ndarray:
+    """
+    Generates a deterministic day-ahead-like price curve: hourly prices around 0.30 €/kWh with morning and evening peaks,
+    a midday dip that is deeper in summer and a random level per day.
+
+    Returns:
+        np.ndarray: Grid price in €/kWh per tick.
+    """
+    rng = np.random.default_rng(seed)
+    hours: np.ndarray = np.arange(days * 24)
+    hour: np.ndarray = hours % 24
+    season: np.ndarray = 0.55 + 0.45 * np.cos(2 * np.pi * (hours // 24 - 172) / 365)
+
+    peaks: np.ndarray = 0.06 * np.exp(-((hour - 8) ** 2) / 2) + 0.10 * np.exp(-((hour - 19) ** 2) / 3)
+    dip: np.ndarray = 0.12 * season * np.exp(-((hour - 13) ** 2) / 6)
+    level: np.ndarray = rng.normal(0.0, 0.03, size=days)[hours // 24]
+    hourly: np.ndarray = np.round(np.clip(0.30 + peaks - dip + level, 0.05, None), 4)
+
+    ticks: int = int(days * 86400 / tick_seconds)
+    return hourly[np.arange(ticks) * tick_seconds // 3600]
+
+
+def recorded_inputs(start: int, end: int, tick_seconds: int = TICK_SECONDS) -> dict:
+    """
+    Loads recorded inverter and heat-pipe series from the time-series store and resamples them to the tick grid.
+    Needs an application context.
+
+    Returns:
+        dict: ``production`` and ``consumption`` (household without heat pipes) in W per tick.
+    """
+    from services.timeseries_service import query_series
+
+    grid: np.ndarray = np.arange(start, end, tick_seconds, dtype=float)
+
+    def resampled(source: str, metric: str) -> np.ndarray:
+        samples: list = query_series(source, metric, start, end, 0)
+        if not samples:
+            return np.zeros_like(grid)
+        return np.interp(grid, [s["timestamp"] for s in samples], [s["value"] for s in samples])
+
+    heating: np.ndarray = resampled("heat_pipes", "heating")
+    return {
+        "production": resampled("inverter", "production"),
+        "consumption": np.clip(resampled("inverter", "consume") - heating, 0, None),
+    }
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay the heat-pipe control loop offline")
+    parser.add_argument("--days", type=int, default=365, help="days of synthetic data (default 365)")
+    parser.add_argument("--from-db", nargs=2, metavar=("START", "END"), help="replay recorded data (ISO dates)")
+    parser.add_argument("--mode", default="Automatik", choices=SUPPORTED_MODES)
+    parser.add_argument("--price", type=float, default=0.35, help="grid price in €/kWh")
+    parser.add_argument("--dynamic-prices", action="store_true", help="synthetic hourly prices instead of --price")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.from_db:
+        from flask import Flask
+
+        from config import Config
+        from extensions import db
+
+        # Database only: the full app would initialise the relays and start the scheduler next to the running service
+        app = Flask(__name__)
+        app.config.from_object(Config)
+        db.init_app(app)
+
+        start, end = (int(datetime.datetime.fromisoformat(value).timestamp()) for value in args.from_db)
+        with app.app_context():
+            inputs: dict = recorded_inputs(start, end)
+    else:
+        inputs = synthetic_inputs(args.days, seed=args.seed)
+
+    prices = args.price
+    if args.dynamic_prices:
+        ticks: int = len(inputs["production"])
+        prices = synthetic_prices(ticks * TICK_SECONDS // 86400 + 1, seed=args.seed)[:ticks]
+    report: dict = run_replay(mode=args.mode, prices=prices, **inputs)
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""
+Anti-chatter rules for the heat-pipe relays: hysteresis bands, minimum on/off times and a switching rate limit.
+"""
+
+import time
+
+from config import Config
+from utils.logging_service import LoggingService
+
+logging = LoggingService()
+
+# Window of the switching rate limit in seconds
+SWITCH_WINDOW: int = 3600
+
+
+class StageController:
+    """
+    Decides per heat pipe whether the surplus rule may switch it.
+
+    Heating starts only once the tank is ``HEAT_PIPE_TEMP_HYSTERESIS`` below its destination temperature and stops
+    when it is reached. Every pipe has two thresholds on the grid feed-in ``cover``: it switches on above
+    ``pipe_N + buffer_N`` and, once on, only switches off below ``-hysteresis_N``. The pipe's own consumption is
+    already part of ``cover`` while it runs, so the band between the thresholds is where it keeps its state. On top of
+    the band a pipe has to stay on for ``min_on_N`` and off for ``min_off_N`` seconds, and may switch at most
+    ``max_switches_N`` times per hour (0 = no limit). The switching history comes from the controller state
+    (``switching``), see ``record_switches``.
+
+    Args:
+        heat_pipe_config (dict): Heat-pipe settings from ``fetch_heat_pipe_setting``.
+    """
+
+    def __init__(self, heat_pipe_config: dict):
+        self.config = heat_pipe_config
+        self._rules: dict = {}
+
+    def rules(self, pipe: int) -> dict | None:
+        """
+        Returns the thresholds and timers of ``pipe``, None if its power or buffer is not configured. Parsed once per
+        pipe; the returned dict is shared and must not be modified.
+        """
+        if pipe not in self._rules:
+            self._rules[pipe] = self._parse_rules(pipe)
+        return self._rules[pipe]
+
+    def _parse_rules(self, pipe: int) -> dict | None:
+        phase = self.config.get(f"pipe_{pipe}")
+        buffer = self.config.get(f"buffer_{pipe}")
+        if phase is None or buffer is None:
+            return None
+
+        return {
+            "on_threshold": phase + buffer,
+            "off_threshold": -self.config.get(f"hysteresis_{pipe}", Config.HEAT_PIPE_HYSTERESIS),
+            "min_on": self.config.get(f"min_on_{pipe}", Config.HEAT_PIPE_MIN_ON_TIME),
+            "min_off": self.config.get(f"min_off_{pipe}", Config.HEAT_PIPE_MIN_OFF_TIME),
+            "max_switches": self.config.get(f"max_switches_{pipe}", Config.HEAT_PIPE_MAX_SWITCHES),
+        }
+
+    @staticmethod
+    def below_target(temp: float, dest_temp: float, heating: bool) -> bool:
+        """
+        Returns True if the tank may be heated: while any pipe runs up to ``dest_temp``, otherwise only once the tank
+        has cooled ``HEAT_PIPE_TEMP_HYSTERESIS`` below it.
+        """
+        return temp < dest_temp - (0 if heating else Config.HEAT_PIPE_TEMP_HYSTERESIS)
+
+    def surplus_request(self, pipe: int, state: bool, cover: float) -> bool | None:
+        """
+        Returns the state the surplus rule asks for (``None`` = keep the current state) from the hysteresis band.
+        """
+        rules: dict | None = self.rules(pipe)
+        if rules is None:
+            return None
+        if not state and cover > rules["on_threshold"]:
+            return True
+        if state and cover < rules["off_threshold"]:
+            return False
+        return None
+
+    def permits(self, pipe: int, target: bool, switching: dict, now: float) -> bool:
+        """
+        Returns True if ``pipe`` may switch to ``target`` now, given its dwell time and switches in the last hour.
+        """
+        rules: dict | None = self.rules(pipe)
+        if rules is None:
+            return False
+
+        history: dict = switching.get(str(pipe)) or {}
+        last: float | None = history.get("last")
+        if last is not None and now - last < (rules["min_off"] if target else rules["min_on"]):
+            return False
+
+        recent: int = sum(1 for timestamp in history.get("recent", []) if now - timestamp < SWITCH_WINDOW)
+        return not (rules["max_switches"] and recent >= rules["max_switches"])
+
+    def filter(self, requested: dict, memory: dict, now: float) -> dict:
+        """
+        Returns the changes of ``requested`` (``{pipe: state}``) the rules permit; requests for the current state and
+        blocked switches are dropped.
+        """
+        heat_pipes: dict = memory.get("heat_pipes", {})
+        switching: dict = memory.get("switching", {})
+
+        permitted: dict = {}
+        for pipe, target in requested.items():
+            if heat_pipes.get(str(pipe)) == target:
+                continue
+            if self.permits(pipe, target, switching, now):
+                permitted[pipe] = target
+            else:
+                logging.debug(f"[STAGE] Pipe {pipe} held {'OFF' if target else 'ON'} (dwell time or rate limit)")
+        return permitted
+
+
+_controller: StageController | None = None
+
+
+def controller_for(heat_pipe_config: dict) -> StageController:
+    """
+    Returns a controller for ``heat_pipe_config``. The settings cache returns the same dict until the heat-pipe settings
+    change, so the controller and its parsed rules are only rebuilt then instead of on every control tick.
+    """
+    global _controller
+    controller: StageController | None = _controller
+    if controller is None or controller.config is not heat_pipe_config:
+        controller = _controller = StageController(heat_pipe_config)
+    return controller
+
+
+def record_switches(memory: dict, switched: dict, now: float = None) -> None:
+    """
+    Adds the switched relays (``{relay: state}``) to the switching history in the controller state: total ``count``,
+    time of the ``last`` switch and the switch times of the last hour (``recent``).
+    """
+    now = time.time() if now is None else now
+    switching: dict = memory.setdefault("switching", {})
+    for relay in switched:
+        history: dict = switching.setdefault(str(relay), {"count": 0, "last": None, "recent": []})
+        history["count"] += 1
+        history["last"] = now
+        history["recent"] = [timestamp for timestamp in history["recent"] if now - timestamp < SWITCH_WINDOW] + [now]
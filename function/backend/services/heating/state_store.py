@@ -0,0 +1,184 @@
+"""
+Persistent controller state (relay states, heating mode) shared by all worker processes.
+"""
+
+import copy
+import json
+import os
+import sqlite3
+import threading
+from typing import Callable
+
+from config import Config
+from utils.logging_service import LoggingService
+
+logging = LoggingService()
+
+DEFAULT_STATE: dict = {
+    "heat_pipes": {"1": False, "2": False, "3": False},
+    "mode": "Automatik"
+}
+
+
+class StateStore:
+    """
+    Interface of a controller state store.
+
+    The state is a flat mapping of top-level keys (``heat_pipes``, ``mode``, ...) to JSON-serialisable values. All
+    modifications go through ``update``, which runs the complete read-modify-write atomically.
+    """
+
+    def load(self) -> dict:
+        raise NotImplementedError
+
+    def update(self, mutator: Callable[[dict], None]) -> dict:
+        """
+        Atomically applies ``mutator`` to the current state.
+
+        Args:
+            mutator (Callable[[dict], None]): Receives a private copy of the state and modifies it in place. Raising an
+                exception aborts the update without any change.
+
+        Returns:
+            dict: The state after the update.
+        """
+        raise NotImplementedError
+
+    def compare_and_set(self, key: str, expected, value) -> bool:
+        """
+        Sets ``key`` to ``value`` only if its current value equals ``expected``.
+
+        Returns:
+            bool: True if the value was written.
+        """
+        swapped: list = []
+
+        def apply(state: dict) -> None:
+            if state.get(key) == expected:
+                state[key] = value
+                swapped.append(True)
+
+        self.update(apply)
+        return bool(swapped)
+
+
+class MemoryStateStore(StateStore):
+    """
+    Process-local state store, e.g. for simulations that must not touch the persistent state.
+    """
+
+    def __init__(self, initial: dict = None):
+        self._state: dict = copy.deepcopy(initial if initial is not None else DEFAULT_STATE)
+        self._lock = threading.Lock()
+
+    def load(self) -> dict:
+        with self._lock:
+            return copy.deepcopy(self._state)
+
+    def update(self, mutator: Callable[[dict], None]) -> dict:
+        with self._lock:
+            state: dict = copy.deepcopy(self._state)
+            mutator(state)
+            self._state = state
+            return copy.deepcopy(state)
+
+
+class SQLiteStateStore(StateStore):
+    """
+    State store backed by an SQLite database in WAL mode.
+
+    Every update runs inside a ``BEGIN IMMEDIATE`` transaction, which takes the database write lock, so concurrent
+    read-modify-writes from any thread or worker process are serialized. Commits are written with
+    ``synchronous=FULL`` and survive a crash or power loss. Only keys whose value changed are written.
+
+    On first use the state is seeded from the legacy ``memory.json`` if present, otherwise from ``DEFAULT_STATE``.
+    """
+
+    def __init__(self, path: str, legacy_file: str = None):
+        self.path = path
+        self.legacy_file = legacy_file
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def load(self) -> dict:
+        connection: sqlite3.Connection = self._connection()
+        return self._read(connection)
+
+    def update(self, mutator: Callable[[dict], None]) -> dict:
+        connection: sqlite3.Connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            current: dict = self._read(connection)
+            state: dict = copy.deepcopy(current)
+            mutator(state)
+            self._write_changes(connection, current, state)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return state
+
+    def _connection(self) -> sqlite3.Connection:
+        connection: sqlite3.Connection | None = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=FULL")
+            self._local.connection = connection
+            self._ensure_schema(connection)
+        return connection
+
+    def _ensure_schema(self, connection: sqlite3.Connection) -> None:
+        with self._init_lock:
+            if self._initialized:
+                return
+
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS state ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, version INTEGER NOT NULL DEFAULT 0)"
+                )
+                if connection.execute("SELECT COUNT(*) FROM state").fetchone()[0] == 0:
+                    initial: dict = self._initial_state()
+                    connection.executemany(
+                        "INSERT INTO state (key, value, version) VALUES (?, ?, 1)",
+                        [(key, json.dumps(value)) for key, value in initial.items()]
+                    )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            self._initialized = True
+
+    def _initial_state(self) -> dict:
+        if self.legacy_file and os.path.exists(self.legacy_file):
+            try:
+                with open(self.legacy_file, "r", encoding="utf-8") as f:
+                    legacy: dict = json.load(f)
+                logging.info(f"[STATESTORE] Imported state from {self.legacy_file}")
+                return {**DEFAULT_STATE, **legacy}
+            except (OSError, ValueError) as err:
+                logging.error(f"[STATESTORE] Could not import {self.legacy_file}: {err}")
+        return copy.deepcopy(DEFAULT_STATE)
+
+    @staticmethod
+    def _read(connection: sqlite3.Connection) -> dict:
+        return {key: json.loads(value) for key, value in connection.execute("SELECT key, value FROM state")}
+
+    @staticmethod
+    def _write_changes(connection: sqlite3.Connection, current: dict, state: dict) -> None:
+        for key, value in state.items():
+            if key in current and current[key] == value:
+                continue
+            connection.execute(
+                "INSERT INTO state (key, value, version) VALUES (?, ?, 1) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, version = state.version + 1",
+                (key, json.dumps(value))
+            )
+        for key in current.keys() - state.keys():
+            connection.execute("DELETE FROM state WHERE key = ?", (key,))
+
+
+state_store: StateStore = SQLiteStateStore(Config.STATE_STORE_PATH, legacy_file="memory.json")
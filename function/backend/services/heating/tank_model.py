@@ -0,0 +1,310 @@
+"""
+Stratified thermal model of a hot-water tank, vectorised over many candidate heating schedules.
+"""
+
+import time
+
+import numpy as np
+
+from database.fetch_data import fetch_heat_pipe_setting, fetch_tank_volumes
+from services.telemetry_cache import telemetry_cache
+from services.temperature.sensor_registry import get_tank_layout
+from services.timeseries_service import query_series
+from utils.logging_service import LoggingService
+
+logging = LoggingService()
+
+LAYERS: int = 3
+# J/(l·K)
+WATER_HEAT_CAPACITY: float = 4186.0
+DEFAULT_VOLUME: int = 300
+# Heat loss of the whole tank in W/K (≈ 2 kWh/day for 300 l at 60 °C and 20 °C ambient)
+DEFAULT_LOSS_COEFFICIENT: float = 2.1
+# Heat exchange between neighbouring layers in W/K (conduction and slow mixing)
+DEFAULT_MIXING_COEFFICIENT: float = 5.0
+AMBIENT_TEMP: float = 20.0
+
+
+class TankModel:
+    """
+    Tank split into ``LAYERS`` layers of equal volume, ordered bottom (index 0) to top, matching the three *R4DCB08*
+    channels of a tank in the sensor layout.
+
+    Per time step the heat pipes heat the bottom layer, every layer loses heat to the ambient in proportion to its
+    share of the loss coefficient, and neighbouring layers exchange heat. Water that ends up warmer than the layer above
+    rises (buoyancy), which is modelled by re-sorting the layers – with equal layer masses this conserves energy.
+
+    All methods accept any leading batch dimensions, e.g. temperatures of shape ``(schedules, LAYERS)`` and powers of
+    shape ``(schedules, steps)``, so a planner can evaluate thousands of schedules in one call.
+
+    Args:
+        volume (float): Tank volume in liters.
+        loss_coefficient (float): Heat loss of the whole tank in W/K.
+        mixing_coefficient (float): Heat exchange between neighbouring layers in W/K.
+        efficiency (float): Share of the electrical heat-pipe power that reaches the water.
+        ambient_temp (float): Temperature around the tank in °C.
+    """
+
+    def __init__(self, volume: float = DEFAULT_VOLUME, loss_coefficient: float = DEFAULT_LOSS_COEFFICIENT,
+                 mixing_coefficient: float = DEFAULT_MIXING_COEFFICIENT, efficiency: float = 1.0,
+                 ambient_temp: float = AMBIENT_TEMP):
+        self.volume = float(volume)
+        self.loss_coefficient = float(loss_coefficient)
+        self.mixing_coefficient = float(mixing_coefficient)
+        self.efficiency = float(efficiency)
+        self.ambient_temp = float(ambient_temp)
+
+    @property
+    def layer_capacity(self) -> float:
+        """
+        Heat capacity of one layer in J/K.
+        """
+        return self.volume / LAYERS * WATER_HEAT_CAPACITY
+
+    @property
+    def loss_rate(self) -> float:
+        """
+        Fraction of the tank/ambient temperature difference lost per hour (single-node equivalent).
+        """
+        return self.loss_coefficient * 3600 / (self.volume * WATER_HEAT_CAPACITY)
+
+    def step(self, temperatures: np.ndarray, power, dt: float) -> np.ndarray:
+        """
+        Advances the layer temperatures by ``dt`` seconds with the given heat-pipe power (W).
+
+        Args:
+            temperatures (np.ndarray): Shape ``(..., LAYERS)``.
+            power: Scalar or array broadcastable to ``temperatures.shape[:-1]``.
+            dt (float): Step length in seconds.
+
+        Returns:
+            np.ndarray: New temperatures of the same shape.
+        """
+        temperatures = np.asarray(temperatures, dtype=float)
+        heat: np.ndarray = np.zeros_like(temperatures)
+        heat[..., 0] += self.efficiency * np.asarray(power, dtype=float)
+        heat -= self.loss_coefficient / LAYERS * (temperatures - self.ambient_temp)
+
+        exchange: np.ndarray = self.mixing_coefficient * np.diff(temperatures, axis=-1)
+        heat[..., :-1] += exchange
+        heat[..., 1:] -= exchange
+
+        return np.sort(temperatures + heat * dt / self.layer_capacity, axis=-1)
+
+    def step_operator(self, dt: float) -> tuple:
+        """
+        Returns the affine form of ``step`` before the buoyancy sort, ``T' = matrix @ T + gain * power + offset``, for
+        callers that advance a single tank many times (replay) and want to avoid the per-call numpy overhead.
+
+        Returns:
+            tuple: ``matrix`` of shape ``(LAYERS, LAYERS)``, ``gain`` and ``offset`` of shape ``(LAYERS,)``.
+        """
+        scale: float = dt / self.layer_capacity
+        loss: float = self.loss_coefficient / LAYERS * scale
+        mixing: float = self.mixing_coefficient * scale
+
+        matrix: np.ndarray = np.eye(LAYERS) * (1 - loss)
+        for layer in range(LAYERS - 1):
+            matrix[layer, layer] -= mixing
+            matrix[layer, layer + 1] += mixing
+            matrix[layer + 1, layer] += mixing
+            matrix[layer + 1, layer + 1] -= mixing
+
+        gain: np.ndarray = np.zeros(LAYERS)
+        gain[0] = self.efficiency * scale
+        return matrix, gain, np.full(LAYERS, loss * self.ambient_temp)
+
+    def simulate(self, temperatures, powers, dt: float = 900.0) -> np.ndarray:
+        """
+        Simulates power schedules.
+
+        Args:
+            temperatures: Initial layer temperatures, shape ``(LAYERS,)`` or ``(batch, LAYERS)``.
+            powers: Heat-pipe power in W per step, shape ``(steps,)`` or ``(batch, steps)``.
+            dt (float): Step length in seconds.
+
+        Returns:
+            np.ndarray: Temperatures of shape ``(batch, steps + 1, LAYERS)`` (``batch`` omitted for 1-D input), the
+            initial state included.
+        """
+        powers = np.asarray(powers, dtype=float)
+        current: np.ndarray = np.broadcast_to(np.asarray(temperatures, dtype=float),
+                                              powers.shape[:-1] + (LAYERS,)).copy()
+
+        result: np.ndarray = np.empty(powers.shape[:-1] + (powers.shape[-1] + 1, LAYERS))
+        result[..., 0, :] = current
+        for index in range(powers.shape[-1]):
+            current = self.step(current, powers[..., index], dt)
+            result[..., index + 1, :] = current
+        return result
+
+    def evaluate_schedules(self, temperatures, stages, stage_powers, dt: float = 900.0) -> dict:
+        """
+        Evaluates stage schedules (e.g. planner candidates).
+
+        Args:
+            temperatures: Initial layer temperatures, shape ``(LAYERS,)``.
+            stages: Stage per step, integer array of shape ``(schedules, steps)``.
+            stage_powers: Power in W per stage, ``stage_powers[0] == 0``.
+            dt (float): Step length in seconds.
+
+        Returns:
+            dict: ``top`` (top-layer temperature per step), ``final`` (final layer temperatures), ``min_top`` and
+            ``energy`` (electrical energy in kWh), each with one entry per schedule.
+        """
+        powers: np.ndarray = np.asarray(stage_powers, dtype=float)[np.asarray(stages)]
+        trajectory: np.ndarray = self.simulate(temperatures, powers, dt)
+        return {
+            "top": trajectory[..., 1:, -1],
+            "final": trajectory[..., -1, :],
+            "min_top": trajectory[..., 1:, -1].min(axis=-1),
+            "energy": powers.sum(axis=-1) * dt / 3_600_000,
+        }
+
+    def heat_loss(self, temperatures) -> np.ndarray:
+        """
+        Returns the current heat loss to the ambient in W.
+        """
+        temperatures = np.asarray(temperatures, dtype=float)
+        return self.loss_coefficient / LAYERS * (temperatures - self.ambient_temp).sum(axis=-1)
+
+    def stored_energy(self, temperatures, reference_temp: float = None) -> np.ndarray:
+        """
+        Returns the heat stored above ``reference_temp`` (default ambient) in kWh.
+        """
+        reference_temp = self.ambient_temp if reference_temp is None else reference_temp
+        temperatures = np.asarray(temperatures, dtype=float)
+        return self.layer_capacity * (temperatures - reference_temp).sum(axis=-1) / 3_600_000
+
+    def time_to_target(self, temperatures, power, target_temp: float, layer: int = -1, max_hours: float = 24.0,
+                       dt: float = 60.0) -> np.ndarray:
+        """
+        Returns the seconds until ``layer`` (default top) reaches ``target_temp`` at constant ``power``, ``inf`` if it
+        is not reached within ``max_hours``. ``power`` may be an array to compare several stages at once.
+        """
+        power = np.asarray(power, dtype=float)
+        steps: int = int(max_hours * 3600 / dt)
+        trajectory: np.ndarray = self.simulate(temperatures, np.repeat(power[..., None], steps, axis=-1), dt)
+        reached: np.ndarray = trajectory[..., layer] >= target_temp
+        first: np.ndarray = np.argmax(reached, axis=-1)
+        return np.where(reached.any(axis=-1), first * dt, np.inf)
+
+    def to_dict(self) -> dict:
+        return {
+            "volume": self.volume,
+            "loss_coefficient": self.loss_coefficient,
+            "mixing_coefficient": self.mixing_coefficient,
+            "efficiency": self.efficiency,
+            "ambient_temp": self.ambient_temp,
+        }
+
+
+def fit_tank_model(timestamps, layer_temperatures, powers, volume: float = DEFAULT_VOLUME,
+                   ambient_temp: float = AMBIENT_TEMP) -> TankModel:
+    """
+    Fits heat-pipe efficiency and loss coefficient from history with a least-squares energy balance:
+    ``C · dT_mean/dt = efficiency · P − UA · (T_mean − T_ambient)``.
+
+    Args:
+        timestamps: Sample times in seconds, shape ``(n,)``.
+        layer_temperatures: Layer temperatures, shape ``(n, LAYERS)``.
+        powers: Heat-pipe power in W during each interval, shape ``(n,)``.
+        volume (float): Tank volume in liters.
+        ambient_temp (float): Temperature around the tank.
+
+    Returns:
+        TankModel: Model with the fitted parameters; defaults where the history is not informative.
+    """
+    timestamps = np.asarray(timestamps, dtype=float)
+    mean_temp: np.ndarray = np.asarray(layer_temperatures, dtype=float).mean(axis=-1)
+    powers = np.asarray(powers, dtype=float)
+
+    dt: np.ndarray = np.diff(timestamps)
+    valid: np.ndarray = (dt > 0) & (dt <= 900)
+    capacity: float = volume * WATER_HEAT_CAPACITY
+    heat_flow: np.ndarray = capacity * np.diff(mean_temp)[valid] / dt[valid]
+    design: np.ndarray = np.column_stack([powers[:-1][valid], -(mean_temp[:-1][valid] - ambient_temp)])
+
+    model = TankModel(volume=volume, ambient_temp=ambient_temp)
+    if len(heat_flow) < 10 or np.linalg.matrix_rank(design) < 2:
+        logging.info("[TANKMODEL] Not enough varied history to fit, using default parameters")
+        return model
+
+    (efficiency, loss_coefficient), *_ = np.linalg.lstsq(design, heat_flow, rcond=None)
+    if 0.3 <= efficiency <= 1.1:
+        model.efficiency = float(efficiency)
+    if 0.0 < loss_coefficient < 50.0:
+        model.loss_coefficient = float(loss_coefficient)
+    return model
+
+
+def load_tank_history(tank_index: int, start: int, end: int, resolution: int = 60) -> tuple:
+    """
+    Loads the layer temperatures of one tank (its channels in the sensor layout) and the heat-pipe power from the
+    time-series store, aligned on common timestamps.
+
+    Returns:
+        tuple: ``(timestamps, layer_temperatures, powers)`` as NumPy arrays, empty if the tank has not exactly
+               ``LAYERS`` sensors.
+    """
+    layout: list = get_tank_layout()
+    if tank_index >= len(layout) or len(layout[tank_index]["channels"]) != LAYERS:
+        logging.warning(f"[TANKMODEL] Tank {tank_index} has no {LAYERS} sensors, skipping history")
+        return np.empty(0), np.empty((0, LAYERS)), np.empty(0)
+
+    channels: list = [f"channel_{channel}" for channel in layout[tank_index]["channels"]]
+    series: list = [
+        {sample["timestamp"]: sample["value"] for sample in query_series("r4dcb08", channel, start, end, resolution)}
+        for channel in channels
+    ]
+    power: dict = {sample["timestamp"]: sample["value"]
+                   for sample in query_series("heat_pipes", "heating", start, end, resolution)}
+
+    common: list = sorted(set(power).intersection(*series))
+    return (
+        np.asarray(common, dtype=float),
+        np.asarray([[layer[timestamp] for layer in series] for timestamp in common], dtype=float).reshape(-1, LAYERS),
+        np.asarray([power[timestamp] for timestamp in common], dtype=float),
+    )
+
+
+def refit_tank_models(days: int = 7, now: float = None) -> None:
+    """
+    Scheduler job: refits the model of every configured tank from the last ``days`` of history and publishes the
+    parameters to all worker processes.
+    """
+    now = time.time() if now is None else now
+    volumes: list | None = fetch_tank_volumes()
+    if volumes is None:
+        logging.warning("[TANKMODEL] Tank settings unavailable, skipping refit")
+        return
+
+    for tank_index, volume in enumerate(volumes):
+        timestamps, temperatures, powers = load_tank_history(tank_index, int(now - days * 86400), int(now))
+        model: TankModel = fit_tank_model(timestamps, temperatures, powers, volume or DEFAULT_VOLUME)
+        telemetry_cache.put(f"tank_model_{tank_index}", model.to_dict())
+        logging.info(f"[TANKMODEL] Tank {tank_index}: {model.to_dict()}")
+
+
+def get_tank_model(tank_index: int = 0) -> TankModel:
+    """
+    Returns the latest fitted model of a tank, a default model from the settings if none was fitted yet.
+    """
+    parameters: dict | None = telemetry_cache.get_with_timestamp(f"tank_model_{tank_index}")[0]
+    if parameters:
+        return TankModel(**parameters)
+
+    volumes: list = fetch_tank_volumes() or []
+    volume = volumes[tank_index] if tank_index < len(volumes) else None
+    return TankModel(volume=volume or DEFAULT_VOLUME)
+
+
+def get_stage_powers(heat_pipe_config: dict = None) -> list:
+    """
+    Returns the power in W per heating stage (``[0, pipe_1, pipe_1 + pipe_2, …]``) from ``heat_pipe_config``, default
+    ``fetch_heat_pipe_setting``.
+    """
+    if heat_pipe_config is None:
+        heat_pipe_config = fetch_heat_pipe_setting() or {}
+    pipes: list = [heat_pipe_config[f"pipe_{index}"] for index in range(1, 4) if f"pipe_{index}" in heat_pipe_config]
+    return [0] + [int(sum(pipes[:count])) for count in range(1, len(pipes) + 1)]
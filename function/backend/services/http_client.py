@@ -0,0 +1,278 @@
+"""
+Shared HTTP client for device and cloud APIs: keep-alive pools per host, default timeouts, retries with jitter, a
+circuit breaker per host and latency statistics.
+"""
+
+import ipaddress
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, RequestException, Timeout
+
+from config import Config
+from utils.logging_service import LoggingService
+from utils.metrics import metrics
+
+logging = LoggingService()
+
+REQUEST_SECONDS = metrics.histogram("viki_http_client_request_seconds", "Duration of outgoing HTTP requests",
+                                    ("host",))
+REQUEST_FAILURES = metrics.counter("viki_http_client_failures_total", "Failed, retried and rejected requests",
+                                   ("host", "reason"))
+
+# Status codes that are worth another attempt (rate limit, gateway and availability errors)
+RETRY_STATUS: frozenset = frozenset({429, 502, 503, 504})
+# Methods that are retried by default; callers can allow retries for other idempotent requests (e.g. GraphQL queries)
+IDEMPOTENT_METHODS: frozenset = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class CircuitOpenError(RequestException):
+    """
+    Raised without a network call while the circuit breaker of a host is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Stops requests to a host after ``failures`` consecutive failures for ``reset`` seconds. After that one trial
+    request is let through (half-open): success closes the circuit, another failure opens it again.
+    """
+
+    def __init__(self, failures: int, reset: float):
+        self.failures = failures
+        self.reset = reset
+        self.consecutive: int = 0
+        self.opened_at: float | None = None
+        self._trial: bool = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.reset else "open"
+
+    def allow(self) -> bool:
+        state: str = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._trial:
+            self._trial = True
+            return True
+        return False
+
+    def success(self) -> None:
+        self.consecutive = 0
+        self.opened_at = None
+        self._trial = False
+
+    def failure(self) -> bool:
+        """
+        Counts a failure and returns True if it opened the circuit.
+        """
+        self.consecutive += 1
+        self._trial = False
+        if self.failures and (self.opened_at is not None or self.consecutive >= self.failures):
+            opened: bool = self.opened_at is None or self.state == "half-open"
+            self.opened_at = time.monotonic()
+            return opened
+        return False
+
+
+class HostStats:
+    """
+    Request counters and latencies (ms) of one host.
+    """
+
+    def __init__(self):
+        self.requests: int = 0
+        self.errors: int = 0
+        self.retries: int = 0
+        self.rejected: int = 0
+        self.total_ms: float = 0.0
+        self.max_ms: float = 0.0
+        self.last_ms: float | None = None
+
+    def observe(self, elapsed_ms: float, ok: bool) -> None:
+        self.requests += 1
+        self.errors += 0 if ok else 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.last_ms = elapsed_ms
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "rejected": self.rejected,
+            "avg_ms": round(self.total_ms / self.requests, 1) if self.requests else None,
+            "max_ms": round(self.max_ms, 1),
+            "last_ms": round(self.last_ms, 1) if self.last_ms is not None else None,
+        }
+
+
+class HttpClient:
+    """
+    One keep-alive ``requests.Session`` per host (scheme, host, port), so repeated calls reuse the TCP/TLS connection
+    instead of paying the handshake for every small payload.
+
+    ``request`` applies ``HTTP_TIMEOUT`` if no timeout is given and retries connection errors, timeouts and
+    ``RETRY_STATUS`` responses up to ``retries`` times with exponential backoff and full jitter. Only idempotent
+    methods are retried by default. Hosts in the local network (private IPs, ``.local``) do not look up proxy settings
+    from the environment. Every host has a ``CircuitBreaker``; while it is open, ``request`` raises
+    ``CircuitOpenError`` immediately. All errors are ``requests`` exceptions, so callers keep their existing
+    ``except RequestException`` handling. Statistics are per process, see ``stats``.
+
+    Args:
+        timeout (float): Default timeout in seconds.
+        retries (int): Default number of retries of idempotent requests.
+        backoff (float): Base delay of the retry backoff in seconds.
+        pool_maxsize (int): Connections kept open per host.
+        circuit_failures (int): Consecutive failures that open the circuit of a host, 0 disables the breaker.
+        circuit_reset (float): Seconds the circuit stays open before a trial request.
+    """
+
+    def __init__(self, timeout: float = None, retries: int = None, backoff: float = None, pool_maxsize: int = None,
+                 circuit_failures: int = None, circuit_reset: float = None):
+        self.timeout = timeout if timeout is not None else Config.HTTP_TIMEOUT
+        self.retries = retries if retries is not None else Config.HTTP_RETRIES
+        self.backoff = backoff if backoff is not None else Config.HTTP_BACKOFF
+        self.pool_maxsize = pool_maxsize if pool_maxsize is not None else Config.HTTP_POOL_MAXSIZE
+        self.circuit_failures = circuit_failures if circuit_failures is not None else Config.HTTP_CIRCUIT_FAILURES
+        self.circuit_reset = circuit_reset if circuit_reset is not None else Config.HTTP_CIRCUIT_RESET
+        self._sessions: dict[tuple, requests.Session] = {}
+        self._breakers: dict[tuple, CircuitBreaker] = {}
+        self._stats: dict[tuple, HostStats] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _host(url: str) -> tuple:
+        parts = urlsplit(url)
+        return parts.scheme, parts.hostname or "", parts.port
+
+    @staticmethod
+    def _is_local(hostname: str) -> bool:
+        if hostname == "localhost" or hostname.endswith(".local"):
+            return True
+        try:
+            return ipaddress.ip_address(hostname).is_private
+        except ValueError:
+            return False
+
+    def session(self, url: str) -> requests.Session:
+        """
+        Returns the keep-alive session of the host of ``url``.
+        """
+        host: tuple = self._host(url)
+        with self._lock:
+            session: requests.Session | None = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                session.trust_env = not self._is_local(host[1])
+                # Retries are handled in ``request``, the adapter only pools the connections
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize, max_retries=0)
+                session.mount(f"{host[0]}://", adapter)
+                self._sessions[host] = session
+                self._breakers[host] = CircuitBreaker(self.circuit_failures, self.circuit_reset)
+                self._stats[host] = HostStats()
+            return session
+
+    def request(self, method: str, url: str, timeout: float | tuple = None, retries: int = None,
+                **kwargs) -> requests.Response:
+        """
+        Sends a request through the pooled session of the host of ``url``. Keyword arguments are passed on to
+        ``requests.Session.request``.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Absolute URL.
+            timeout (float | tuple): Timeout in seconds, default ``HTTP_TIMEOUT``.
+            retries (int): Retries after the first attempt, default ``HTTP_RETRIES`` for idempotent methods, else 0.
+
+        Returns:
+            requests.Response: The last response. Error status codes are not raised, use ``raise_for_status``.
+
+        Raises:
+            CircuitOpenError: If the circuit of the host is open.
+            requests.exceptions.RequestException: If the last attempt failed.
+        """
+        method = method.upper()
+        session: requests.Session = self.session(url)
+        host: tuple = self._host(url)
+        breaker: CircuitBreaker = self._breakers[host]
+        stats: HostStats = self._stats[host]
+        if retries is None:
+            retries = self.retries if method in IDEMPOTENT_METHODS else 0
+
+        attempt: int = 0
+        while True:
+            with self._lock:
+                allowed: bool = breaker.allow()
+                if not allowed:
+                    stats.rejected += 1
+            if not allowed:
+                REQUEST_FAILURES.inc(1, host[1], "circuit_open")
+                raise CircuitOpenError(f"Circuit open for {host[1]}")
+
+            started: float = time.perf_counter()
+            try:
+                response: requests.Response = session.request(
+                    method, url, timeout=timeout if timeout is not None else self.timeout, **kwargs
+                )
+                error: RequestException | None = None
+            except RequestException as err:
+                response, error = None, err
+
+            failed: bool = error is not None or response.status_code in RETRY_STATUS or response.status_code >= 500
+            elapsed: float = time.perf_counter() - started
+            REQUEST_SECONDS.observe(elapsed, host[1])
+            if failed:
+                REQUEST_FAILURES.inc(1, host[1], "error")
+            with self._lock:
+                stats.observe(elapsed * 1000, not failed)
+                if not failed:
+                    breaker.success()
+                elif breaker.failure():
+                    logging.warning(f"[HTTP] Circuit for {host[1]} opened for {breaker.reset}s")
+
+            if error is not None:
+                retryable: bool = isinstance(error, (ConnectionError, Timeout))
+            else:
+                retryable: bool = response.status_code in RETRY_STATUS
+            if not retryable or attempt >= retries:
+                if error is not None:
+                    raise error
+                return response
+
+            attempt += 1
+            REQUEST_FAILURES.inc(1, host[1], "retry")
+            with self._lock:
+                stats.retries += 1
+            delay: float = random.uniform(0, self.backoff * 2 ** (attempt - 1))
+            logging.debug(f"[HTTP] Retry {attempt}/{retries} for {host[1]} in {delay:.2f}s")
+            time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def stats(self) -> dict:
+        """
+        Returns the request statistics and circuit state per host of this process, keyed by ``host[:port]``.
+        """
+        with self._lock:
+            return {
+                f"{host[1]}:{host[2]}" if host[2] else host[1]: {
+                    **self._stats[host].to_dict(), "circuit": self._breakers[host].state
+                }
+                for host in self._stats
+            }
+
+
+http_client = HttpClient()
@@ -0,0 +1,159 @@
+"""
+WebSocket push of live data (namespace ``/live``) to the dashboards connected to this worker process.
+"""
+
+import threading
+from typing import Iterable
+
+from config import Config
+from extensions import socketio
+from services.heating.helper import DASHBOARD_TANKS, get_tank_sensor_data, load_memory
+from services.telemetry_cache import telemetry_cache
+from utils.logging_service import LoggingService
+
+logging = LoggingService()
+
+LIVE_NAMESPACE: str = "/live"
+ROOMS: tuple = ("energy", "tanks", "relays", "mode")
+
+
+def compute_delta(old: dict, new: dict) -> dict:
+    """
+    Returns the changes from ``old`` to ``new``: changed or added keys with their new value (nested dicts recursively),
+    removed keys as ``None``. Applying the delta to ``old`` with a recursive merge yields ``new``.
+    """
+    delta: dict = {}
+    for key, value in new.items():
+        previous = old.get(key)
+        if key in old and previous == value:
+            continue
+        if isinstance(previous, dict) and isinstance(value, dict):
+            delta[key] = compute_delta(previous, value)
+        else:
+            delta[key] = value
+    for key in old.keys() - new.keys():
+        delta[key] = None
+    return delta
+
+
+class LivePublisher:
+    """
+    Watches the live snapshots and emits changes to the subscribed rooms.
+
+    Every worker process runs one publisher for its own WebSocket clients. It only reads what the scheduler leader has
+    already published (telemetry cache, controller state), so the hardware is never polled for the push. Subscribers
+    of a room receive the full ``snapshot`` once when joining and afterwards only ``update`` events with the delta to
+    the previous state, numbered per room by ``seq``. Only rooms with at least one subscriber are collected.
+    """
+
+    def __init__(self, socketio, interval: float = None):
+        self.socketio = socketio
+        self.interval = interval if interval is not None else Config.LIVE_PUSH_INTERVAL
+        self._snapshots: dict = {}
+        self._seq: dict = {room: 0 for room in ROOMS}
+        # sid -> rooms the client joined
+        self._subscribers: dict[str, set] = {}
+        self._lock = threading.Lock()
+        self._started: bool = False
+
+    def start(self) -> None:
+        """
+        Starts the watcher task of this process (once).
+        """
+        with self._lock:
+            if self._started or self.interval <= 0:
+                return
+            self._started = True
+        self.socketio.start_background_task(self._run)
+        logging.info(f"[LIVE] Live push started (interval {self.interval}s)")
+
+    def subscribe(self, sid: str, rooms: Iterable = ROOMS) -> None:
+        """
+        Records that client ``sid`` joined ``rooms``.
+        """
+        with self._lock:
+            joined: set = self._subscribers.get(sid, set()) | set(rooms)
+            if joined:
+                self._subscribers[sid] = joined
+
+    def unsubscribe(self, sid: str, rooms: Iterable = None) -> None:
+        """
+        Records that client ``sid`` left ``rooms`` (default: all, e.g. on disconnect). A client without rooms is
+        dropped.
+        """
+        with self._lock:
+            remaining: set = self._subscribers.pop(sid, set()) - set(ROOMS if rooms is None else rooms)
+            if remaining:
+                self._subscribers[sid] = remaining
+
+    def watched_rooms(self) -> set:
+        """
+        Returns the rooms with at least one subscriber in this process.
+        """
+        with self._lock:
+            return set().union(*self._subscribers.values())
+
+    def snapshot(self, room: str) -> dict:
+        """
+        Returns the last published state of ``room`` for a joining client, collected on demand if there is none yet.
+        """
+        with self._lock:
+            data: dict | None = self._snapshots.get(room)
+            if data is None:
+                data = self._collect(room)
+                self._snapshots[room] = data
+            return {"room": room, "seq": self._seq[room], "data": data}
+
+    def poll(self) -> None:
+        """
+        Compares the current state of every room with the last published one and emits the deltas.
+        """
+        watched: set = self.watched_rooms()
+        for room in ROOMS:
+            if room not in watched:
+                # Nobody watches, forget the snapshot so the next subscriber gets a fresh one
+                with self._lock:
+                    self._snapshots.pop(room, None)
+                continue
+
+            try:
+                data: dict = self._collect(room)
+            except Exception as err:
+                logging.error(f"[LIVE] Could not collect '{room}': {err}")
+                continue
+
+            with self._lock:
+                previous: dict | None = self._snapshots.get(room)
+                self._snapshots[room] = data
+                if previous is None:
+                    continue
+                delta: dict = compute_delta(previous, data)
+                if not delta:
+                    continue
+                self._seq[room] += 1
+                seq: int = self._seq[room]
+
+            self.socketio.emit("update", {"room": room, "seq": seq, "delta": delta}, to=room, namespace=LIVE_NAMESPACE)
+
+    def _run(self) -> None:
+        while True:
+            self.poll()
+            self.socketio.sleep(self.interval)
+
+    @staticmethod
+    def _collect(room: str) -> dict:
+        if room == "energy":
+            return telemetry_cache.get_with_timestamp("inverter")[0] or {}
+        if room == "tanks":
+            temperatures: list | None = telemetry_cache.get_with_timestamp("r4dcb08")[0]
+            if not temperatures:
+                return {}
+            return {tank: get_tank_sensor_data(tank, temperatures) for tank in DASHBOARD_TANKS}
+        if room == "relays":
+            return load_memory().get("heat_pipes", {})
+        if room == "mode":
+            return {"mode": load_memory().get("mode")}
+        raise ValueError(f"Unknown room '{room}'")
+
+
+live_publisher = LivePublisher(socketio)
@@ -0,0 +1,195 @@
+"""
+Leader-elected background scheduler shared by all worker processes.
+"""
+
+import os
+import time
+from typing import Callable, Optional
+
+from apscheduler.events import EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED, JobEvent
+from apscheduler.schedulers.background import BackgroundScheduler
+from flask import Flask
+
+from utils.logging_service import LoggingService
+from utils.metrics import metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows development setups
+    fcntl = None
+
+logging = LoggingService()
+
+JOB_SECONDS = metrics.histogram("viki_scheduler_job_seconds", "Duration of periodic jobs", ("job",))
+JOB_ERRORS = metrics.counter("viki_scheduler_job_errors_total", "Periodic jobs that raised", ("job",))
+# "missed": started too late (misfire), "running": skipped because the previous run had not finished
+JOB_MISSED = metrics.counter("viki_scheduler_missed_runs_total", "Periodic job runs that did not start",
+                             ("job", "reason"))
+
+
+class LeaderLock:
+    """
+    Non-blocking exclusive file lock. The process holding it is the scheduler leader.
+
+    The lock is released by the kernel when the owning process dies, so a standby worker can take over without any
+    stale-lock cleanup.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._fd is not None
+
+    def try_acquire(self) -> bool:
+        if self._fd is not None:
+            return True
+
+        if fcntl is None:
+            self._fd = -1
+            return True
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        if self._fd is None:
+            return
+        if self._fd >= 0:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+        self._fd = None
+
+
+class LeaderScheduler:
+    """
+    Wraps an APScheduler ``BackgroundScheduler`` so that periodic jobs run in exactly one process.
+
+    Every worker starts the scheduler, but only the lock holder registers the periodic jobs. All other workers run a
+    single standby job which retries the lock and promotes the worker if the current leader went away.
+    """
+
+    def __init__(self):
+        self.app: Optional[Flask] = None
+        self.lock: Optional[LeaderLock] = None
+        self.sched = BackgroundScheduler(daemon=True)
+        self.sched.add_listener(self._on_missed, EVENT_JOB_MISSED | EVENT_JOB_MAX_INSTANCES)
+        self._jobs: list[tuple[Callable, str, int]] = []
+        self._leader_callbacks: list[Callable] = []
+
+    @property
+    def running(self) -> bool:
+        return self.sched.running
+
+    @property
+    def is_leader(self) -> bool:
+        return self.lock is not None and self.lock.is_leader
+
+    def init_app(self, app: Flask) -> None:
+        self.app = app
+        self.lock = LeaderLock(app.config["SCHEDULER_LOCK_FILE"])
+
+    def add_job(self, func: Callable, job_id: str, seconds: int) -> None:
+        """
+        Registers a periodic job. It is scheduled immediately if this process is already the leader, otherwise as soon
+        as the process wins the election.
+        """
+        self._jobs.append((func, job_id, seconds))
+        if self.is_leader and self.running:
+            self._schedule(func, job_id, seconds)
+
+    def on_leader(self, callback: Callable) -> None:
+        """
+        Registers a callback that starts a leader-only service outside APScheduler (e.g. the acquisition engine). It
+        is called immediately if this process is already the leader, otherwise as soon as the process wins the election.
+        """
+        self._leader_callbacks.append(callback)
+        if self.is_leader and self.running:
+            self._start_service(callback)
+
+    def start(self) -> None:
+        if self.running:
+            return
+
+        self.sched.start()
+
+        if self.lock.try_acquire():
+            self._promote()
+        else:
+            self.sched.add_job(
+                self._standby,
+                trigger='interval',
+                seconds=self.app.config["SCHEDULER_STANDBY_INTERVAL"],
+                max_instances=1,
+                id='leader_election'
+            )
+            logging.info(f"[SCHEDULER] Process {os.getpid()} is standby, periodic jobs run in the leader")
+
+    def shutdown(self) -> None:
+        if self.running:
+            self.sched.shutdown(wait=False)
+        if self.lock is not None:
+            self.lock.release()
+
+    def _standby(self) -> None:
+        if self.lock.try_acquire():
+            self.sched.remove_job('leader_election')
+            self._promote()
+
+    def _promote(self) -> None:
+        for func, job_id, seconds in self._jobs:
+            self._schedule(func, job_id, seconds)
+        for callback in self._leader_callbacks:
+            self._start_service(callback)
+        logging.info(f"[SCHEDULER] Process {os.getpid()} is leader, {len(self._jobs)} periodic jobs scheduled")
+
+    def _schedule(self, func: Callable, job_id: str, seconds: int) -> None:
+        self.sched.add_job(
+            self._wrap(func, job_id),
+            trigger='interval',
+            seconds=seconds,
+            max_instances=1,
+            coalesce=True,
+            id=job_id,
+            replace_existing=True
+        )
+
+    def _start_service(self, callback: Callable) -> None:
+        try:
+            with self.app.app_context():
+                callback()
+        except Exception as e:
+            logging.error(f"[SCHEDULER] Starting {getattr(callback, '__qualname__', callback)} failed: {e}")
+
+    def _wrap(self, func: Callable, job_id: str) -> Callable:
+        def job():
+            started: float = time.perf_counter()
+            with self.app.app_context():
+                try:
+                    func()
+                except Exception as e:
+                    JOB_ERRORS.inc(1, job_id)
+                    logging.error(f"[SCHEDULER] {job_id} failed: {e}")
+            JOB_SECONDS.observe(time.perf_counter() - started, job_id)
+
+        return job
+
+    @staticmethod
+    def _on_missed(event: JobEvent) -> None:
+        reason: str = "missed" if event.code == EVENT_JOB_MISSED else "running"
+        JOB_MISSED.inc(1, event.job_id, reason)
+        logging.warning(f"[SCHEDULER] Run of {event.job_id} skipped ({reason})")
+
+
+scheduler = LeaderScheduler()
@@ -0,0 +1,100 @@
+"""
+Cache for the latest live readings of every device (inverter, temperature modules, ...).
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+from config import Config
+from utils.logging_service import LoggingService
+from utils.shared_store import SharedStore, shared_store
+
+logging = LoggingService()
+
+
+class TelemetryCache:
+    """
+    Latest snapshot plus timestamp per device, shared between all worker processes.
+
+    The background poller writes snapshots with ``put``. API routes read them with ``get`` / ``get_or_read``, which only
+    touch the hardware if the snapshot is older than the configured max-age. Decoded snapshots are kept in process
+    memory and only re-read from the shared store when its file changed, so a cache hit costs a single ``stat`` call.
+    """
+
+    def __init__(self, store: SharedStore = shared_store, max_age: int = None):
+        self.store = store
+        self.max_age = max_age if max_age is not None else Config.TELEMETRY_MAX_AGE
+        self._local: dict[str, tuple] = {}
+        self._read_locks: dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    @staticmethod
+    def _key(device: str) -> str:
+        return f"telemetry_{device}"
+
+    def put(self, device: str, value) -> None:
+        """
+        Publishes a new snapshot for ``device``.
+        """
+        key: str = self._key(device)
+        self.store.write(key, value)
+        self._local[key] = (self.store.version(key), value, time.time())
+
+    def get(self, device: str, max_age: Optional[int] = None):
+        """
+        Returns the latest snapshot of ``device`` or ``None`` if there is none or it is older than ``max_age`` seconds.
+        """
+        value, timestamp = self.get_with_timestamp(device)
+        if timestamp is None:
+            return None
+
+        max_age = self.max_age if max_age is None else max_age
+        if time.time() - timestamp > max_age:
+            return None
+        return value
+
+    def get_with_timestamp(self, device: str) -> tuple:
+        """
+        Returns ``(value, timestamp)`` of the latest snapshot regardless of its age, ``(None, None)`` if none exists.
+        """
+        key: str = self._key(device)
+        version = self.store.version(key)
+        if version is None:
+            return None, None
+
+        cached: tuple | None = self._local.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1], cached[2]
+
+        value, timestamp = self.store.read(key)
+        self._local[key] = (version, value, timestamp)
+        return value, timestamp
+
+    def get_or_read(self, device: str, reader: Callable, max_age: Optional[int] = None):
+        """
+        Returns the snapshot of ``device`` if it is fresh enough, otherwise calls ``reader`` once and caches its result.
+
+        Concurrent callers in one process share a single ``reader`` call instead of all hitting the device. A reader
+        returning ``None`` (failed read) is not cached, the last snapshot stays in place until it expires.
+        """
+        value = self.get(device, max_age)
+        if value is not None:
+            return value
+
+        with self._guard:
+            lock: threading.Lock = self._read_locks.setdefault(device, threading.Lock())
+
+        with lock:
+            value = self.get(device, max_age)
+            if value is not None:
+                return value
+
+            logging.debug(f"[TELEMETRY] Snapshot of '{device}' missing or stale, reading device directly")
+            value = reader()
+            if value is not None:
+                self.put(device, value)
+            return value
+
+
+telemetry_cache = TelemetryCache()
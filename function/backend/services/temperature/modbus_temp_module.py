@@ -1,11 +1,153 @@
+import atexit
+import threading
+import time
+
 from pymodbus.client import ModbusSerialClient as ModbusClient
 from pymodbus.pdu import ModbusPDU
 
 from database.fetch_data import fetch_r4dcb08_sensor_setting
+from services.telemetry_cache import telemetry_cache
+from services.timeseries_service import record_measurements
 from utils.logging_service import LoggingService
+from utils.metrics import metrics
 
 logging = LoggingService()
 
+R4DCB08_CHANNELS: int = 6
+
+MODBUS_READ_SECONDS = metrics.histogram("viki_modbus_read_seconds", "Duration of Modbus register reads")
+MODBUS_ERRORS = metrics.counter("viki_modbus_errors_total", "Failed Modbus connects and reads", ("reason",))
+
+
+class R4DCB08Manager:
+    """
+    Long-lived, thread-safe Modbus-RTU session to the *R4DCB08* temperature module.
+
+    The serial port stays open between reads and every bus transaction is serialized by a lock, so concurrent readers
+    can no longer collide on the port. After a failed connect or read the session is dropped and reconnected with
+    exponential backoff. The connection settings come from the settings cache, so they are only reloaded from the
+    database – and the port reopened – after the sensor settings changed.
+    """
+
+    def __init__(self, slave: int = 1, max_backoff: float = 60.0):
+        self.slave = slave
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self._client: ModbusClient | None = None
+        self._config: dict | None = None
+        self._failures: int = 0
+        self._retry_at: float = 0.0
+
+    def read_holding_registers(self, address: int, count: int) -> list[int] | None:
+        """
+        Reads ``count`` holding registers starting at ``address``.
+
+        Returns:
+            list[int] | None: The register values, or ``None`` if the module is not configured, unreachable or
+            answered with an error.
+        """
+        with self._lock:
+            client: ModbusClient | None = self._ensure_connected()
+            if client is None:
+                return None
+
+            started: float = time.perf_counter()
+            try:
+                response: ModbusPDU = client.read_holding_registers(address, count=count, slave=self.slave)
+            except Exception as e:
+                MODBUS_ERRORS.inc(1, "read")
+                logging.error(f"[R4DCB08] Error reading sensor: {e}")
+                self._drop_connection()
+                return None
+            finally:
+                MODBUS_READ_SECONDS.observe(time.perf_counter() - started)
+
+            if response.isError():
+                MODBUS_ERRORS.inc(1, "response")
+                logging.error(f"[R4DCB08] Modbus read error: {response}")
+                self._drop_connection()
+                return None
+
+            self._failures = 0
+            return response.registers
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_client()
+
+    def _ensure_connected(self) -> ModbusClient | None:
+        self._reload_config_if_changed()
+        if self._config is None:
+            return None
+
+        if self._client is not None and self._client.connected:
+            return self._client
+
+        if time.monotonic() < self._retry_at:
+            return None
+
+        self._close_client()
+        client = ModbusClient(
+            port=self._config['port'],
+            baudrate=self._config['baudrate'],
+            timeout=self._config['timeout'],
+            parity=self._config['parity'],
+            stopbits=self._config['stopbits'],
+            bytesize=self._config['bytesize']
+        )
+
+        try:
+            connected: bool = client.connect()
+        except Exception as e:
+            logging.error(f"[R4DCB08] Error connecting to Modbus device: {e}")
+            connected = False
+
+        if not connected:
+            MODBUS_ERRORS.inc(1, "connect")
+            logging.error("[R4DCB08] Could not connect to Modbus device")
+            self._client = client
+            self._drop_connection()
+            return None
+
+        logging.info(f"[R4DCB08] Connected to {self._config['port']}")
+        self._client = client
+        return client
+
+    def _reload_config_if_changed(self) -> None:
+        config: dict | None = fetch_r4dcb08_sensor_setting()
+        if config is self._config:
+            return
+
+        if not config:
+            logging.error("[R4DCB08] No sensor configuration found")
+
+        if config != self._config:
+            self._close_client()
+            self._failures = 0
+            self._retry_at = 0.0
+
+        self._config = config
+
+    def _drop_connection(self) -> None:
+        self._close_client()
+        self._failures += 1
+        backoff: float = min(self.max_backoff, 2 ** (self._failures - 1))
+        self._retry_at = time.monotonic() + backoff
+        logging.warning(f"[R4DCB08] Reconnecting in {backoff:.0f}s (failure {self._failures})")
+
+    def _close_client(self) -> None:
+        if self._client is None:
+            return
+        try:
+            self._client.close()
+        except Exception as e:
+            logging.error(f"[R4DCB08] Error closing connection: {e}")
+        self._client = None
+
+
+r4dcb08 = R4DCB08Manager()
+atexit.register(r4dcb08.close)
+
 
 def read_temp_sensors_from_r4dcb08(temp_sensor_data: dict) -> dict:
     """
@@ -21,52 +163,63 @@ def read_temp_sensors_from_r4dcb08(temp_sensor_data: dict) -> dict:
             The same dictionary instance with any successfully read channels overwritten. If the serial connection cannot
             be established or a read error occurs, the original values are returned unchanged.
     """
-    client_con_data: dict = fetch_r4dcb08_sensor_setting()
-    
-    if not client_con_data:
-        logging.error("[R4DCB08] No sensor configuration found")
+    temperatures: list[int] | None = r4dcb08.read_holding_registers(0x0000, count=R4DCB08_CHANNELS)
+    if temperatures is None:
         return temp_sensor_data
-    
-    client = ModbusClient(
-        port=client_con_data['port'],
-        baudrate=client_con_data['baudrate'],
-        timeout=client_con_data['timeout'],
-        parity=client_con_data['parity'],
-        stopbits=client_con_data['stopbits'],
-        bytesize=client_con_data['bytesize']
-    )
-
-    connection_successful = False
-    try:
-        connection_successful = client.connect()
-        if not connection_successful:
-            logging.error("[R4DCB08] Could not connect to Modbus device")
-            return temp_sensor_data
-
-        response: ModbusPDU = client.read_holding_registers(0x0000, count=6, slave=1)
-        
-        if response.isError():
-            logging.error(f"[R4DCB08] Modbus read error: {response}")
-            return temp_sensor_data
-            
-        temperatures: list[int] = response.registers
-        for i, temp in enumerate(temperatures[:6]):
-            if temp < 30000:
-                temp_sensor_data[i] = temp / 10.0
-                
-    except Exception as e:
-        logging.error(f"[R4DCB08] Error reading sensor: {e}")
-
-    finally:
-        if connection_successful:
-            try:
-                client.close()
-            except Exception as e:
-                logging.error(f"[R4DCB08] Error closing connection: {e}")
+
+    for i, temp in enumerate(temperatures[:R4DCB08_CHANNELS]):
+        if temp < 30000:
+            temp_sensor_data[i] = temp / 10.0
 
     return temp_sensor_data
 
 
+def read_all_channels_from_r4dcb08() -> list[float | None] | None:
+    """
+    Reads all channels of the *R4DCB08* module in one bus transaction.
+
+    Returns:
+        list[float | None] | None: One temperature in °C per channel, ``None`` for channels reporting the error value
+        (no sensor connected). ``None`` if the module could not be read at all.
+    """
+    temperatures: list[int] | None = r4dcb08.read_holding_registers(0x0000, count=R4DCB08_CHANNELS)
+    if temperatures is None:
+        return None
+
+    channels: list = [temp / 10.0 if temp < 30000 else None for temp in temperatures[:R4DCB08_CHANNELS]]
+    return channels + [None] * (R4DCB08_CHANNELS - len(channels))
+
+
+def pull_temperatures_from_r4dcb08() -> list[float | None] | None:
+    """
+    Scheduler job: scans the *R4DCB08* module once, publishes the readings to the telemetry cache and records the
+    channels that could be read in the time-series store.
+    """
+    return publish_temperatures(read_all_channels_from_r4dcb08())
+
+
+def publish_temperatures(temperatures: list[float | None] | None) -> list[float | None] | None:
+    """
+    Publishes one scan to the telemetry cache and records the channels that could be read in the time-series store.
+    A failed scan (``None``) publishes nothing, so the last readings stay valid until they expire.
+    """
+    if temperatures is None:
+        logging.warning("[R4DCB08] No readings available")
+        return None
+
+    telemetry_cache.put("r4dcb08", temperatures)
+    record_measurements("r4dcb08", {f"channel_{i}": temp for i, temp in enumerate(temperatures) if temp is not None})
+    return temperatures
+
+
+def get_r4dcb08_temperatures() -> list[float | None] | None:
+    """
+    Returns the latest *R4DCB08* readings from the telemetry cache. The bus is only read directly if the cached
+    snapshot is missing or older than ``TELEMETRY_MAX_AGE``. None while no readings are available.
+    """
+    return telemetry_cache.get_or_read("r4dcb08", read_all_channels_from_r4dcb08)
+
+
 def get_temp_of_tank_with_heat_pipe(temp_sensors: dict, tanks: dict) -> tuple[float, float]:
     """
     Determines the current temperature of the tank that has an active heating element and returns it together with that
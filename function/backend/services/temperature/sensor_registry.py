@@ -0,0 +1,132 @@
+"""
+Sensor registry: maps the channels of the *R4DCB08* module to the tanks of the sensor settings
+(``SensorSetting.measuring_device`` / ``measuring_position``), so one bus scan fills the readings of every tank.
+"""
+
+from database.fetch_data import fetch_tank_sensors
+from services.temperature.modbus_temp_module import R4DCB08_CHANNELS
+from utils.logging_service import LoggingService
+
+logging = LoggingService()
+
+# Sensors per tank of the default layout (bottom, middle, top)
+LAYERS: int = 3
+# Destination temperature (°C) of tanks without own value beyond the default layout
+DEFAULT_DEST_TEMP: float = 50.0
+# Layout used as long as no tank has sensors in the settings: heat-pipe tank on channels 0–2, buffer tank on 3–5.
+# Tanks configured without sensors take over the channels, names and temperatures in this order.
+DEFAULT_TANKS: list = [
+    {"id": None, "description": "heating_tank", "dest_temp": 50.0, "heat_pipe": True, "channels": [0, 1, 2]},
+    {"id": None, "description": "buffer_tank", "dest_temp": 35.0, "heat_pipe": False, "channels": [3, 4, 5]},
+]
+
+_layout_source: list | None = None
+_layout: list = DEFAULT_TANKS
+
+
+def build_layout(tanks: list) -> list[dict]:
+    """
+    Assigns module channels to the sensors of ``fetch_tank_sensors``.
+
+    Sensors with a configured ``channel`` keep it; the others get the lowest free channels in the order of tank id and
+    measuring position. Channels outside the module or already taken are skipped with a warning. Without any sensor in
+    the settings, the tanks are laid out like ``DEFAULT_TANKS``.
+
+    Returns:
+        list[dict]: One entry per tank with ``id``, ``description``, ``dest_temp``, ``heat_pipe`` and ``channels``
+                    (bottom to top). Exactly one tank has ``heat_pipe`` set.
+    """
+    if not tanks:
+        return DEFAULT_TANKS
+
+    if not any(tank["sensors"] for tank in tanks):
+        channels: list = [list(range(LAYERS * index, LAYERS * index + LAYERS))
+                          for index in range(R4DCB08_CHANNELS // LAYERS)]
+        assigned: dict = {tank["id"]: channels[index] if index < len(channels) else []
+                          for index, tank in enumerate(tanks)}
+    else:
+        assigned: dict = {tank["id"]: [] for tank in tanks}
+        taken: set = set()
+        pending: list = []
+        for tank in tanks:
+            for sensor in tank["sensors"]:
+                channel = sensor["channel"]
+                if channel is None:
+                    pending.append((tank["id"], sensor))
+                elif not 0 <= channel < R4DCB08_CHANNELS or channel in taken:
+                    logging.warning(f"[SENSORS] Channel {channel} of sensor {sensor['id']} is invalid or taken")
+                else:
+                    taken.add(channel)
+                    assigned[tank["id"]].append((sensor, channel))
+
+        free: list = [channel for channel in range(R4DCB08_CHANNELS) if channel not in taken]
+        for tank_id, sensor in pending:
+            if not free:
+                logging.warning(f"[SENSORS] No free channel left for sensor {sensor['id']}")
+                continue
+            assigned[tank_id].append((sensor, free.pop(0)))
+
+        order: dict = {sensor["id"]: index for tank in tanks for index, sensor in enumerate(tank["sensors"])}
+        assigned = {tank_id: [channel for sensor, channel in sorted(entries, key=lambda entry: order[entry[0]["id"]])]
+                    for tank_id, entries in assigned.items()}
+
+    layout: list = []
+    for index, tank in enumerate(tanks):
+        default: dict = DEFAULT_TANKS[index] if index < len(DEFAULT_TANKS) else {}
+        layout.append({
+            "id": tank["id"],
+            "description": tank["description"],
+            "dest_temp": tank["dest_temp"] if tank["dest_temp"] is not None
+            else default.get("dest_temp", DEFAULT_DEST_TEMP),
+            "heat_pipe": bool(tank["heat_pipe"]),
+            "channels": assigned[tank["id"]],
+        })
+
+    # Without a marked tank the first one is heated by the heat pipes, as before the flag existed
+    heated: list = [tank for tank in layout if tank["heat_pipe"]]
+    if len(heated) != 1:
+        if len(heated) > 1:
+            logging.warning(f"[SENSORS] Several tanks marked with heat pipes, using tank {heated[0]['id']}")
+        for tank in layout:
+            tank["heat_pipe"] = tank is (heated[0] if heated else layout[0])
+    return layout
+
+
+def get_tank_layout() -> list[dict]:
+    """
+    Returns the channel layout of all tanks, see ``build_layout``. Rebuilt only after the settings changed. While the
+    settings cannot be read, the last known layout is kept (``DEFAULT_TANKS`` before the first successful read).
+    """
+    global _layout_source, _layout
+
+    tanks: list | None = fetch_tank_sensors()
+    if tanks is not None and tanks is not _layout_source:
+        _layout = build_layout(tanks)
+        _layout_source = tanks
+    return _layout
+
+
+def heat_pipe_tank(layout: list) -> dict:
+    """
+    Returns the tank heated by the heat pipes.
+    """
+    return next(tank for tank in layout if tank["heat_pipe"])
+
+
+def buffer_tank(layout: list) -> dict | None:
+    """
+    Returns the first tank without heat pipes, None if there is none.
+    """
+    return next((tank for tank in layout if not tank["heat_pipe"]), None)
+
+
+def tank_readings(tank: dict, temperatures: list[float | None] | None) -> dict:
+    """
+    Picks the channels of one tank from a full module scan.
+
+    Returns:
+        dict[int, float | None]: ``{channel: temperature}`` from bottom to top, ``None`` for channels without reading
+        (all of them if ``temperatures`` is None).
+    """
+    temperatures = temperatures or []
+    return {channel: temperatures[channel] if channel < len(temperatures) else None for channel in tank["channels"]}
@@ -0,0 +1,235 @@
+"""
+Time-series storage for telemetry: batched raw inserts, continuous rollups and retention.
+"""
+
+import threading
+import time
+
+from sqlalchemy import delete, func, insert, literal, select
+
+from config import Config
+from database.analyse import EnergyPrice, Measurement, MeasurementRollup
+from extensions import db
+from utils.logging_service import LoggingService
+
+logging = LoggingService()
+
+# Rollup resolutions in seconds, each one is aggregated from the previous one (0 = raw samples)
+RESOLUTIONS: tuple = (60, 900, 3600)
+# Buckets are only rolled up once they ended this many seconds ago, so late buffered samples are not missed
+ROLLUP_DELAY: int = 60
+
+
+class MeasurementBuffer:
+    """
+    Collects raw samples in memory and writes them with one multi-row INSERT per flush.
+    """
+
+    def __init__(self, max_rows: int = 50000):
+        self.max_rows = max_rows
+        self._rows: list = []
+        self._lock = threading.Lock()
+
+    def add(self, source: str, metrics: dict, timestamp: float = None) -> None:
+        """
+        Buffers one sample per numeric entry of ``metrics``.
+
+        Args:
+            source (str): Device the values were read from.
+            metrics (dict): ``{metric_name: value}``, non-numeric values are skipped.
+            timestamp (float): Sample time as UNIX epoch seconds, defaults to now.
+        """
+        ts: int = int(timestamp if timestamp is not None else time.time())
+        rows: list = [
+            {"timestamp": ts, "source": source, "metric": str(metric), "value": float(value)}
+            for metric, value in metrics.items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)
+        ]
+
+        with self._lock:
+            self._rows.extend(rows)
+            if len(self._rows) > self.max_rows:
+                dropped: int = len(self._rows) - self.max_rows
+                del self._rows[:dropped]
+                logging.warning(f"[TIMESERIES] Buffer full, dropped {dropped} oldest samples")
+
+    def flush(self) -> int:
+        """
+        Writes all buffered samples. On failure the samples are put back and retried with the next flush.
+
+        Returns:
+            int: Number of written samples.
+        """
+        with self._lock:
+            rows, self._rows = self._rows, []
+
+        if not rows:
+            return 0
+
+        try:
+            db.session.execute(insert(Measurement), rows)
+            db.session.commit()
+        except Exception as err:
+            db.session.rollback()
+            logging.error(f"[TIMESERIES] Could not write {len(rows)} samples: {err}")
+            with self._lock:
+                self._rows[:0] = rows
+            return 0
+
+        return len(rows)
+
+
+measurement_buffer = MeasurementBuffer()
+
+
+def record_measurements(source: str, metrics: dict, timestamp: float = None) -> None:
+    measurement_buffer.add(source, metrics, timestamp)
+
+
+def rollup_measurements(now: float = None) -> int:
+    """
+    Aggregates all completed buckets that are not rolled up yet, first raw samples into 1-min buckets, then 1-min into
+    15-min and 15-min into 1-h buckets.
+
+    Returns:
+        int: Number of written rollup rows.
+    """
+    now = time.time() if now is None else now
+    written: int = 0
+    source_resolution: int = 0
+
+    for resolution in RESOLUTIONS:
+        end: int = int((now - ROLLUP_DELAY) // resolution * resolution)
+        start: int | None = _next_bucket(resolution, source_resolution)
+        if start is not None and start < end:
+            written += _rollup(resolution, source_resolution, start, end)
+        source_resolution = resolution
+
+    db.session.commit()
+    return written
+
+
+def apply_retention(now: float = None) -> int:
+    """
+    Deletes raw samples, rollups and Tibber prices older than their configured retention.
+
+    Returns:
+        int: Number of deleted rows.
+    """
+    now = time.time() if now is None else now
+    retention_days: dict = {
+        0: Config.TIMESERIES_RETENTION_RAW,
+        60: Config.TIMESERIES_RETENTION_1M,
+        900: Config.TIMESERIES_RETENTION_15M,
+        3600: Config.TIMESERIES_RETENTION_1H,
+    }
+    deleted: int = 0
+
+    for resolution, days in retention_days.items():
+        if days <= 0:
+            continue
+        cutoff: int = int(now - days * 86400)
+        if resolution == 0:
+            stmt = delete(Measurement).where(Measurement.timestamp < cutoff)
+        else:
+            stmt = delete(MeasurementRollup).where(
+                MeasurementRollup.resolution == resolution,
+                MeasurementRollup.bucket < cutoff
+            )
+        deleted += db.session.execute(stmt).rowcount or 0
+
+    if Config.TIMESERIES_RETENTION_PRICES > 0:
+        cutoff: int = int(now - Config.TIMESERIES_RETENTION_PRICES * 86400)
+        deleted += db.session.execute(delete(EnergyPrice).where(EnergyPrice.starts_at < cutoff)).rowcount or 0
+
+    db.session.commit()
+    if deleted:
+        logging.info(f"[TIMESERIES] Retention removed {deleted} rows")
+    return deleted
+
+
+def flush_and_rollup() -> None:
+    """
+    Scheduler job: writes the buffered samples and rolls up completed buckets.
+    """
+    measurement_buffer.flush()
+    rollup_measurements()
+
+
+def query_series(source: str, metric: str, start: int, end: int, resolution: int = 0) -> list[dict]:
+    """
+    Returns the samples of one series in ``[start, end)``.
+
+    Args:
+        source (str): Device name.
+        metric (str): Metric name.
+        start (int): Range start as UNIX epoch seconds.
+        end (int): Range end as UNIX epoch seconds (exclusive).
+        resolution (int): ``0`` for raw samples, otherwise one of ``RESOLUTIONS`` for pre-aggregated buckets.
+
+    Returns:
+        list[dict]: Samples ordered by time, see ``Measurement.to_dict`` / ``MeasurementRollup.to_dict``.
+
+    Raises:
+        ValueError: If ``resolution`` is not supported.
+    """
+    if resolution == 0:
+        rows = db.session.execute(
+            select(Measurement)
+            .where(Measurement.source == source, Measurement.metric == metric,
+                   Measurement.timestamp >= start, Measurement.timestamp < end)
+            .order_by(Measurement.timestamp)
+        ).scalars()
+    elif resolution in RESOLUTIONS:
+        rows = db.session.execute(
+            select(MeasurementRollup)
+            .where(MeasurementRollup.resolution == resolution, MeasurementRollup.source == source,
+                   MeasurementRollup.metric == metric,
+                   MeasurementRollup.bucket >= start, MeasurementRollup.bucket < end)
+            .order_by(MeasurementRollup.bucket)
+        ).scalars()
+    else:
+        raise ValueError(f"Unsupported resolution {resolution}, use 0 or one of {RESOLUTIONS}")
+
+    return [row.to_dict() for row in rows]
+
+
+def _next_bucket(resolution: int, source_resolution: int) -> int | None:
+    last: int | None = db.session.execute(
+        select(func.max(MeasurementRollup.bucket)).where(MeasurementRollup.resolution == resolution)
+    ).scalar()
+    if last is not None:
+        return last + resolution
+
+    if source_resolution == 0:
+        first: int | None = db.session.execute(select(func.min(Measurement.timestamp))).scalar()
+    else:
+        first = db.session.execute(
+            select(func.min(MeasurementRollup.bucket)).where(MeasurementRollup.resolution == source_resolution)
+        ).scalar()
+    return None if first is None else first // resolution * resolution
+
+
+def _rollup(resolution: int, source_resolution: int, start: int, end: int) -> int:
+    columns: list = ["resolution", "source", "metric", "bucket", "count", "total", "minimum", "maximum"]
+
+    if source_resolution == 0:
+        bucket = (Measurement.timestamp // resolution * resolution).label("bucket")
+        source_stmt = (
+            select(literal(resolution), Measurement.source, Measurement.metric, bucket,
+                   func.count(), func.sum(Measurement.value), func.min(Measurement.value), func.max(Measurement.value))
+            .where(Measurement.timestamp >= start, Measurement.timestamp < end)
+            .group_by(Measurement.source, Measurement.metric, bucket)
+        )
+    else:
+        rollup = MeasurementRollup
+        bucket = (rollup.bucket // resolution * resolution).label("bucket")
+        source_stmt = (
+            select(literal(resolution), rollup.source, rollup.metric, bucket,
+                   func.sum(rollup.count), func.sum(rollup.total), func.min(rollup.minimum), func.max(rollup.maximum))
+            .where(rollup.resolution == source_resolution, rollup.bucket >= start, rollup.bucket < end)
+            .group_by(rollup.source, rollup.metric, bucket)
+        )
+
+    result = db.session.execute(insert(MeasurementRollup).from_select(columns, source_stmt))
+    return result.rowcount or 0
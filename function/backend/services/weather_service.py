@@ -0,0 +1,277 @@
+"""
+Weather ingestion: the scheduler leader fetches current conditions and forecasts for every weather location into the
+``weather_data`` table, API routes and the planner only read from there.
+"""
+
+import hashlib
+import math
+import threading
+import time
+
+from requests.exceptions import RequestException
+from sqlalchemy import delete, insert, select
+
+from config import Config
+from database.analyse import WeatherData
+from database.fetch_data import fetch_weather_sources
+from extensions import db
+from services.http_client import http_client
+from utils.logging_service import LoggingService
+
+logging = LoggingService()
+
+# Decimal places of the coordinates that identify a location (4 ≈ 10 m)
+COORDINATE_PRECISION: int = 4
+
+_refresh_lock = threading.Lock()
+
+
+def location_key(latitude: float, longitude: float) -> str:
+    """
+    Returns the key shared by all weather settings within about 10 m of each other.
+    """
+    return f"{round(float(latitude), COORDINATE_PRECISION)},{round(float(longitude), COORDINATE_PRECISION)}"
+
+
+class OpenWeatherMapClient:
+    """
+    Reads current conditions and the 5-day/3-hour forecast from OpenWeatherMap through the shared HTTP client.
+
+    Args:
+        api_key (str): API key of the weather setting.
+        base_url (str): Base URL of the API, default ``WEATHER_API_URL``. Pointing it at a local HTTP stub makes the
+            client testable offline.
+    """
+
+    def __init__(self, api_key: str, base_url: str = None):
+        self.api_key = api_key
+        self.base_url = (base_url or Config.WEATHER_API_URL).rstrip("/")
+
+    def current(self, latitude: float, longitude: float) -> dict:
+        """
+        Returns the current conditions as a normalized reading, see ``_reading``.
+
+        Raises:
+            requests.exceptions.RequestException: On HTTP errors.
+            ValueError, KeyError, TypeError: On an unexpected response.
+        """
+        return self._reading(self._get("weather", latitude, longitude))
+
+    def forecast(self, latitude: float, longitude: float) -> list[dict]:
+        """
+        Returns the forecast steps as normalized readings, ordered by time.
+        """
+        return [self._reading(step) for step in self._get("forecast", latitude, longitude)["list"]]
+
+    def _get(self, endpoint: str, latitude: float, longitude: float) -> dict:
+        response = http_client.get(f"{self.base_url}/{endpoint}", params={
+            "lat": latitude,
+            "lon": longitude,
+            "units": "metric",
+            "lang": "de",
+            "appid": self.api_key,
+        })
+        response.raise_for_status()
+        return response.json()
+
+    @staticmethod
+    def _reading(data: dict) -> dict:
+        weather: list = data.get("weather") or [{}]
+        return {
+            "timestamp": int(data["dt"]),
+            "temperature": data.get("main", {}).get("temp"),
+            "cloud_cover": (data.get("clouds") or {}).get("all", 0) / 100,
+            "humidity": data.get("main", {}).get("humidity"),
+            "wind_speed": (data.get("wind") or {}).get("speed"),
+            "description": weather[0].get("description"),
+        }
+
+
+class OfflineWeatherClient:
+    """
+    Deterministic stand-in for ``OpenWeatherMapClient`` without network access (``WEATHER_PROVIDER=offline``), for
+    development and replay runs. Temperatures follow a seasonal and daily cycle, cloud cover varies smoothly per
+    location; the same location and time always give the same reading.
+    """
+
+    def current(self, latitude: float, longitude: float) -> dict:
+        return self._reading(latitude, longitude, int(time.time()))
+
+    def forecast(self, latitude: float, longitude: float) -> list[dict]:
+        start: int = int(time.time()) // 10800 * 10800 + 10800
+        return [self._reading(latitude, longitude, start + index * 10800) for index in range(40)]
+
+    @staticmethod
+    def _reading(latitude: float, longitude: float, timestamp: int) -> dict:
+        seed: int = int(hashlib.sha1(location_key(latitude, longitude).encode()).hexdigest()[:8], 16)
+        day: float = timestamp / 86400
+        solar_hour: float = (timestamp % 86400) / 3600 + longitude / 15
+        temperature: float = (10 - 8 * math.cos(2 * math.pi * (day - 15) / 365.25)
+                              - 4 * math.cos(2 * math.pi * (solar_hour - 3) / 24))
+        cloud_cover: float = 0.5 + 0.3 * math.sin(day * 1.3 + seed % 97) + 0.2 * math.sin(day * 5.1 + seed % 89)
+        return {
+            "timestamp": timestamp,
+            "temperature": round(temperature, 1),
+            "cloud_cover": round(min(max(cloud_cover, 0.0), 1.0), 2),
+            "humidity": 70.0,
+            "wind_speed": 3.0,
+            "description": "offline",
+        }
+
+
+def create_client(source: dict):
+    """
+    Returns the weather client of a weather source from ``fetch_weather_sources`` (``WEATHER_PROVIDER``).
+    """
+    if Config.WEATHER_PROVIDER == "offline":
+        return OfflineWeatherClient()
+    return OpenWeatherMapClient(source["api_key"], source["url"])
+
+
+def refresh_weather(now: float = None) -> int:
+    """
+    Scheduler job: fetches current conditions and forecast of every weather location whose stored data expired.
+
+    Weather settings at the same coordinates (``location_key``) share one fetch, so the number of external calls
+    depends only on the number of locations and the TTLs, never on the number of readers.
+
+    Returns:
+        int: Number of external fetches made.
+    """
+    now = time.time() if now is None else now
+    if not _refresh_lock.acquire(blocking=False):
+        return 0
+
+    try:
+        sources: list | None = fetch_weather_sources()
+        if sources is None:
+            logging.warning("[WEATHER] Weather settings unavailable, retrying with the next run")
+            return 0
+
+        locations: dict = {}
+        for source in sources:
+            key: str = location_key(source["latitude"], source["longitude"])
+            # Prefer a source with API key if several settings share the location
+            if key not in locations or (source["api_key"] and not locations[key]["api_key"]):
+                locations[key] = source
+
+        expiry: dict = _expiry_by_location()
+        fetches: int = 0
+        for key, source in locations.items():
+            if Config.WEATHER_PROVIDER != "offline" and not source["api_key"]:
+                logging.warning(f"[WEATHER] No API key for location {key}")
+                continue
+
+            client = create_client(source)
+            for kind, ttl in (("current", Config.WEATHER_CURRENT_TTL), ("forecast", Config.WEATHER_FORECAST_TTL)):
+                if expiry.get((key, kind), 0) > now:
+                    continue
+                try:
+                    if kind == "current":
+                        readings: list = [client.current(source["latitude"], source["longitude"])]
+                    else:
+                        readings: list = client.forecast(source["latitude"], source["longitude"])
+                except (RequestException, ValueError, KeyError, TypeError) as err:
+                    logging.error(f"[WEATHER] Fetching {kind} weather for {key} failed: {err}")
+                    continue
+
+                fetches += 1
+                _store_readings(key, kind, readings, now, ttl)
+
+        if fetches:
+            logging.info(f"[WEATHER] Refreshed {fetches} weather dataset(s) for {len(locations)} location(s)")
+        return fetches
+    finally:
+        _refresh_lock.release()
+
+
+def get_weather(latitude: float, longitude: float, now: float = None) -> dict | None:
+    """
+    Returns the stored weather of a location: ``current`` reading, upcoming ``forecast`` steps, and ``fetched_at`` /
+    ``expires_at`` of the current reading. Never calls the provider.
+
+    Returns:
+        dict | None: The weather, None if nothing is stored for the location.
+    """
+    now = time.time() if now is None else now
+    key: str = location_key(latitude, longitude)
+    rows: list = db.session.execute(
+        select(WeatherData).where(WeatherData.location_key == key).order_by(WeatherData.valid_at)
+    ).scalars().all()
+    if not rows:
+        return None
+
+    current: WeatherData | None = next((row for row in rows if row.kind == "current"), None)
+    return {
+        "location": key,
+        "current": current.to_dict() if current else None,
+        "forecast": [row.to_dict() for row in rows if row.kind == "forecast" and row.valid_at >= now - 10800],
+        "fetched_at": current.fetched_at if current else None,
+        "expires_at": current.expires_at if current else None,
+    }
+
+
+def get_cloud_cover(latitude: float, longitude: float, start: int, end: int, step: int) -> dict | None:
+    """
+    Returns the forecast cloud cover of a location for every ``step`` interval in ``[start, end)``, linearly
+    interpolated between the stored forecast steps (``{interval start: fraction}``), for ``pv_forecast``.
+
+    Returns:
+        dict | None: Cloud cover per interval start, None without stored forecast. Intervals outside the forecast
+                     keep the nearest value.
+    """
+    key: str = location_key(latitude, longitude)
+    rows: list = db.session.execute(
+        select(WeatherData.valid_at, WeatherData.cloud_cover)
+        .where(WeatherData.location_key == key, WeatherData.kind == "forecast", WeatherData.cloud_cover.isnot(None))
+        .order_by(WeatherData.valid_at)
+    ).all()
+    if not rows:
+        return None
+
+    times: list = [row[0] for row in rows]
+    covers: list = [row[1] for row in rows]
+    result: dict = {}
+    index: int = 0
+    for moment in range(start, end, step):
+        centre: float = moment + step / 2
+        while index < len(times) - 1 and times[index + 1] <= centre:
+            index += 1
+        if centre <= times[0] or index == len(times) - 1:
+            cover: float = covers[0] if centre <= times[0] else covers[-1]
+        else:
+            share: float = (centre - times[index]) / (times[index + 1] - times[index])
+            cover = covers[index] + share * (covers[index + 1] - covers[index])
+        result[moment] = round(cover, 3)
+    return result
+
+
+def _expiry_by_location() -> dict:
+    rows = db.session.execute(
+        select(WeatherData.location_key, WeatherData.kind, db.func.max(WeatherData.expires_at))
+        .group_by(WeatherData.location_key, WeatherData.kind)
+    ).all()
+    return {(row[0], row[1]): row[2] for row in rows}
+
+
+def _store_readings(key: str, kind: str, readings: list, now: float, ttl: int) -> None:
+    rows: dict = {}
+    for reading in readings:
+        rows[reading["timestamp"]] = {
+            "location_key": key,
+            "kind": kind,
+            "valid_at": reading["timestamp"],
+            "temperature": reading["temperature"],
+            "cloud_cover": reading["cloud_cover"],
+            "humidity": reading["humidity"],
+            "wind_speed": reading["wind_speed"],
+            "description": (reading["description"] or "")[:128] or None,
+            "fetched_at": int(now),
+            "expires_at": int(now) + ttl,
+        }
+
+    # A new dataset replaces the stored one of the same kind (the current reading moves, forecast steps are re-issued)
+    db.session.execute(delete(WeatherData).where(WeatherData.location_key == key, WeatherData.kind == kind))
+    if rows:
+        db.session.execute(insert(WeatherData), list(rows.values()))
+    db.session.commit()
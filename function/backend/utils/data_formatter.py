@@ -1,42 +1,154 @@
 import ast
-import re
+import functools
+from typing import Iterable
 
 from utils.logging_service import LoggingService
 
 logging = LoggingService()
 
+# Path step that applies the rest of the path to every element of a list (or every value of a dict)
+WILDCARD: str = "*"
+_MISSING = object()
 
-def extract_datapoints_from_json_with_api(api: str, data: dict) -> dict:
+
+class JsonPath:
+    """
+    Compiled form of an API path string such as ``"['Body', 'Data', 'Site']"`` or
+    ``"['data', 'viewer', 'homes', 0, 'consumption', 'nodes', '*', 'consumption']"``.
+
+    The steps are parsed and validated once by ``compile_path``; resolving a path only walks the data.
+
+    Args:
+        steps (tuple): Dictionary keys (str), list indices (int) and ``WILDCARD``.
+    """
+
+    __slots__ = ("steps",)
+
+    def __init__(self, steps: tuple):
+        self.steps = steps
+
+    def get(self, data, default=_MISSING):
+        """
+        Returns the value at the path. A wildcard step returns a list with one result per element.
+
+        Args:
+            data: The root JSON object.
+            default: Returned for a missing key/index instead of raising (per element below a wildcard).
+
+        Raises:
+            ValueError: If the path cannot be resolved and no default is given.
+        """
+        return self._resolve(data, 0, default)
+
+    def _resolve(self, node, start: int, default):
+        for position in range(start, len(self.steps)):
+            step = self.steps[position]
+            if step == WILDCARD:
+                if isinstance(node, dict):
+                    node = node.values()
+                elif not isinstance(node, list):
+                    return self._missing(step, default)
+                return [self._resolve(item, position + 1, default) for item in node]
+            try:
+                node = node[step]
+            except (KeyError, IndexError, TypeError):
+                return self._missing(step, default)
+        return node
+
+    @staticmethod
+    def _missing(step, default):
+        if default is not _MISSING:
+            return default
+        logging.error(f"Could not extract data from {step}")
+        raise ValueError(f"Path invalid at path: {step}")
+
+
+@functools.lru_cache(maxsize=256)
+def compile_path(api: str) -> JsonPath:
+    """
+    Parses an API path string once; repeated calls with the same string return the cached ``JsonPath``.
+
+    The string must be a Python/JSON list literal of dictionary keys, list indices and ``"*"`` wildcards, e.g.
+    ``"['data', 'viewer', 'homes', 0]"``.
+
+    Raises:
+        ValueError: If the string is not a list of str/int steps.
+    """
+    try:
+        steps = ast.literal_eval(api)
+    except (ValueError, SyntaxError, TypeError) as err:
+        raise ValueError(f"API path is not a list literal: {api!r}") from err
+
+    if not isinstance(steps, (list, tuple)):
+        raise ValueError(f"API path must be a list of keys and indices: {api!r}")
+    for step in steps:
+        if isinstance(step, bool) or not isinstance(step, (str, int)):
+            raise ValueError(f"Invalid step {step!r} in API path {api!r}")
+    return JsonPath(tuple(steps))
+
+
+def validate_api_field(api: str | None) -> str | None:
+    """
+    Checks a ``ManufacturerSetting.api`` value before it is saved. Empty values and dict literals (connection
+    parameters of serial devices) are accepted as they are, everything else must compile as an API path.
+
+    Returns:
+        str | None: The error message, None if the value is valid.
+    """
+    if api is None or not str(api).strip():
+        return None
+    if not isinstance(api, str):
+        return "api must be a string"
+    try:
+        if isinstance(ast.literal_eval(api), dict):
+            return None
+    except (ValueError, SyntaxError, TypeError):
+        pass
+    try:
+        compile_path(api)
+    except ValueError as err:
+        return str(err)
+    return None
+
+
+def extract_datapoints_from_json_with_api(api: str, data: dict, fields: Iterable = None, default=_MISSING):
     """
     Dynamically extracts a nested value from a JSON-like structure using a string-based API path.
 
-    The API string must use Python-style key/index access, e.g.:
-        "['data']['viewer']['homes'][0]['currentSubscription']"
+    The API string is a list of keys and indices, e.g.:
+        "['data', 'viewer', 'homes', 0, 'currentSubscription']"
 
-    This function will parse the string and apply the corresponding steps on
-    the `data` object.
+    The string is compiled once per process (see ``compile_path``), so repeated polls only walk the data.
 
     Args:
         api (str): A string representation of the path to access nested JSON data.
            Supports:
-               • dictionary keys: ['key']
-               • list indices: [0]
+               • dictionary keys: 'key'
+               • list indices: 0
+               • wildcards over list elements: '*'
         data (dict): The root data dictionary or JSON object to extract from.
+        fields (Iterable): Optional keys to pick from the value at the path in the same pass, e.g.
+            ``("P_Load", "P_PV")``; the result is then ``{field: value}``.
+        default: Value for missing keys/indices instead of raising ValueError. With ``fields`` it only replaces
+            missing fields: the path itself must resolve to an object that contains at least one of them.
 
     Returns:
-        dict:
-            The value found at the given path (type depends on content).
+        The value found at the given path (type depends on content), or ``{field: value}`` if ``fields`` is given.
 
     Raises:
-        ValueError: If the path cannot be fully resolved (invalid key/index/type).
+        ValueError: If the path cannot be fully resolved (invalid key/index/type) and no default is given, or if
+            ``fields`` is given and the path does not lead to an object with any of them (e.g. an error response).
     """
-    keys: list = ast.literal_eval(api)
+    if fields is None:
+        return compile_path(api).get(data, default)
 
-    for key in keys:
-        try:
-            data: dict = data[key]
-        except (KeyError, IndexError, TypeError):
-            logging.error(f"Could not extract data from {key}")
-            raise ValueError(f"Path invalid at path: {key}")
+    node = compile_path(api).get(data)
+    if not isinstance(node, dict):
+        logging.error(f"Path {api} does not point to an object")
+        raise ValueError(f"Path {api} does not point to an object")
 
-    return data
+    missing: list = [field for field in fields if field not in node]
+    if missing and (default is _MISSING or len(missing) == len(fields)):
+        logging.error(f"Could not extract data from {missing}")
+        raise ValueError(f"Fields missing at path: {missing}")
+    return {field: node.get(field, default) for field in fields}
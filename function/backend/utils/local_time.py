@@ -0,0 +1,22 @@
+"""
+Local calendar helpers for UNIX timestamps (day buckets, price days, forecast days).
+"""
+
+import datetime
+
+
+def local_midnight(timestamp: float) -> int:
+    """
+    Returns the start of the local day containing ``timestamp`` as UNIX epoch seconds.
+    """
+    local: datetime.datetime = datetime.datetime.fromtimestamp(timestamp)
+    return int(datetime.datetime.combine(local.date(), datetime.time()).timestamp())
+
+
+def next_local_midnight(timestamp: float) -> int:
+    """
+    Returns the start of the local day after the one containing ``timestamp``. Days are not assumed to last 86400 s,
+    so the result is correct across daylight-saving changes.
+    """
+    local: datetime.datetime = datetime.datetime.fromtimestamp(timestamp)
+    return int(datetime.datetime.combine(local.date() + datetime.timedelta(days=1), datetime.time()).timestamp())
@@ -1,40 +1,213 @@
+import atexit
 import datetime
 import os
+import queue
+import threading
+import time
+
+from config import Config
+
+try:
+    import fcntl
+except ImportError:  # Windows development setups
+    fcntl = None
+
+LEVELS: dict = {"DEBUG": 10, "INFO": 20, "WARN": 30, "WARNING": 30, "ERROR": 40}
+
+
+class _LogWriter:
+    """
+    Background writer owning the file handle of one log file.
+
+    Messages are queued by the callers and written in batches by a daemon thread, which keeps the file open between
+    batches. The file is rotated when it exceeds ``max_bytes`` or when a new ``rotate_interval`` period starts;
+    rotation is guarded by a lock file, and writers of other processes reopen the file once they notice it was
+    replaced.
+    """
+
+    BATCH_SIZE: int = 256
+
+    def __init__(self, path: str, max_bytes: int, backup_count: int, rotate_interval: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.rotate_interval = rotate_interval
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._file = None
+        self._period: int = 0
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, line: str) -> None:
+        self._queue.put(line)
+
+    def close(self, timeout: float = 2.0) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            line = self._queue.get()
+            batch: list = [line]
+            while line is not None and len(batch) < self.BATCH_SIZE:
+                try:
+                    line = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(line)
+
+            lines: list = [entry for entry in batch if entry is not None]
+            if lines:
+                self._write(lines)
+            if len(lines) != len(batch):
+                self._close_file()
+                return
+
+    def _write(self, lines: list) -> None:
+        try:
+            self._open_current()
+            self._rotate_if_due()
+            self._file.write("\n".join(lines) + "\n")
+            self._file.flush()
+        except OSError:
+            self._close_file()
+
+    def _open_current(self) -> None:
+        """
+        (Re)opens the log file if it is not open yet or was rotated by another process.
+        """
+        if self._file is not None:
+            try:
+                if os.stat(self.path).st_ino == os.fstat(self._file.fileno()).st_ino:
+                    return
+            except OSError:
+                pass
+            self._close_file()
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._period = self._period_of(os.fstat(self._file.fileno()).st_mtime)
+
+    def _rotate_if_due(self) -> None:
+        size: int = self._file.tell()
+        period: int = self._period_of(time.time())
+        if size < self.max_bytes and period == self._period:
+            return
+
+        lock_fd = self._lock()
+        try:
+            stat = os.stat(self.path)
+            if stat.st_size >= self.max_bytes or (self._period_of(stat.st_mtime) != period and stat.st_size > 0):
+                self._close_file()
+                for index in range(self.backup_count - 1, 0, -1):
+                    source: str = f"{self.path}.{index}"
+                    if os.path.exists(source):
+                        os.replace(source, f"{self.path}.{index + 1}")
+                if self.backup_count > 0:
+                    os.replace(self.path, f"{self.path}.1")
+                else:
+                    os.remove(self.path)
+        finally:
+            self._unlock(lock_fd)
+
+        self._open_current()
+        self._period = period
+
+    def _period_of(self, timestamp: float) -> int:
+        return int(timestamp // self.rotate_interval) if self.rotate_interval > 0 else 0
+
+    def _lock(self):
+        if fcntl is None:
+            return None
+        fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        return fd
+
+    @staticmethod
+    def _unlock(fd) -> None:
+        if fd is None:
+            return
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+
+_writers: dict = {}
+_writers_lock = threading.Lock()
+
+
+def _get_writer(path: str) -> _LogWriter:
+    writer: _LogWriter | None = _writers.get(path)
+    if writer is not None:
+        return writer
+
+    with _writers_lock:
+        if path not in _writers:
+            _writers[path] = _LogWriter(path, Config.LOG_MAX_BYTES, Config.LOG_BACKUP_COUNT, Config.LOG_ROTATE_INTERVAL)
+        return _writers[path]
+
+
+def _close_writers() -> None:
+    for writer in list(_writers.values()):
+        writer.close()
+
+
+def _reset_writers_after_fork() -> None:
+    # Writer threads do not survive a fork, the child starts its own on first use
+    global _writers_lock
+    _writers.clear()
+    _writers_lock = threading.Lock()
+
+
+atexit.register(_close_writers)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_writers_after_fork)
 
 
 class LoggingService:
     """
-    Simple logging service for structured console and file output.
+    Simple logging service for structured file output.
 
-    Supports logging at different severity levels (INFO, DEBUG, WARN, ERROR) and writes
-    to a default or user-defined log file.
+    Supports logging at different severity levels (INFO, DEBUG, WARN, ERROR) and writes to a default or user-defined
+    log file. Messages below ``LOG_LEVEL`` are dropped before formatting. Writing happens asynchronously: all instances
+    logging to the same file share one queue-backed writer thread, which batches lines, keeps the file open and
+    rotates it by size (``LOG_MAX_BYTES``) and time (``LOG_ROTATE_INTERVAL``).
     """
 
-    def __init__(self, prefix: str = "VIKI", log_file: str = None):
+    def __init__(self, prefix: str = "VIKI", log_file: str = None, level: str = None):
         if log_file is None:
             base_dir = os.path.dirname(os.path.abspath(__file__))
             log_file = os.path.abspath(os.path.join(base_dir, "..", "logs", "system.log"))
 
         self.prefix = prefix
         self.log_file = log_file
-
-        os.makedirs(os.path.dirname(self.log_file), exist_ok=True)
-        with open(self.log_file, "a", encoding="utf-8"):
-            pass
+        self.min_level: int = LEVELS.get((level or Config.LOG_LEVEL).upper(), LEVELS["INFO"])
 
     def log(self, message: str, level: str = "INFO") -> None:
         """
-        Logs a message with a given severity level to the console and the log file.
+        Queues a message with a given severity level for the log file.
 
         Args:
             message (str): The log message to record.
             level (str): The log level (e.g., "INFO", "DEBUG", "WARN", "ERROR").
         """
+        if LEVELS.get(level, LEVELS["INFO"]) < self.min_level:
+            return
+
         timestamp = datetime.datetime.now().isoformat(timespec="seconds")
         formatted = f"[{self.prefix}] [{timestamp}] [{level}] {message}"
 
-        with open(self.log_file, "a", encoding="utf-8") as f:
-            f.write(formatted + "\n")
+        _get_writer(self.log_file).put(formatted)
+
+    def is_enabled_for(self, level: str) -> bool:
+        return LEVELS.get(level, LEVELS["INFO"]) >= self.min_level
 
     def info(self, message: str) -> None:
         self.log(message, "INFO")
@@ -0,0 +1,308 @@
+"""
+In-process metrics (counters, gauges, histograms) exported in the Prometheus text format.
+"""
+
+import bisect
+import functools
+import os
+import threading
+import time
+from typing import Callable, Iterable
+
+from config import Config
+from utils.logging_service import LoggingService
+from utils.shared_store import SharedStore, shared_store
+
+logging = LoggingService()
+
+# Histogram buckets in seconds, from sub-millisecond cache hits to multi-second device timeouts
+DEFAULT_BUCKETS: tuple = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Metric:
+    """
+    Base of all metric types: name, help text, label names and the values per label combination.
+
+    Every metric guards its values with its own lock. The lock is held only for a dict update, so recording stays
+    cheap, and ``samples`` never sees a half-written histogram entry.
+    """
+
+    kind: str = "untyped"
+
+    def __init__(self, registry: "MetricsRegistry", name: str, documentation: str, labelnames: Iterable = ()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple, float | list] = {}
+        self._lock = threading.Lock()
+
+    def describe(self) -> dict:
+        return {"type": self.kind, "help": self.documentation, "labels": list(self.labelnames)}
+
+    def samples(self) -> dict:
+        """
+        Returns a copy of the values as ``{label values: value}``.
+        """
+        with self._lock:
+            return {labels: list(value) if isinstance(value, list) else value for labels, value in self._values.items()}
+
+
+class Counter(Metric):
+    """
+    Monotonic counter.
+    """
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, *labels) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+
+class Gauge(Metric):
+    """
+    Last written value, e.g. pool usage.
+    """
+
+    kind = "gauge"
+
+    def set(self, value: float, *labels) -> None:
+        with self._lock:
+            self._values[labels] = float(value)
+
+
+class Histogram(Metric):
+    """
+    Distribution of durations in seconds over fixed ``buckets``.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, registry: "MetricsRegistry", name: str, documentation: str, labelnames: Iterable = (),
+                 buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def describe(self) -> dict:
+        return {**super().describe(), "buckets": list(self.buckets)}
+
+    def observe(self, value: float, *labels) -> None:
+        bucket: int = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry: list | None = self._values.get(labels)
+            if entry is None:
+                # One count per bucket plus +Inf, then sum and count
+                entry = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            entry[bucket] += 1
+            entry[-2] += value
+            entry[-1] += 1
+
+    def time(self, *labels) -> "Timer":
+        """
+        Returns a context manager / decorator that observes the elapsed time of a block or function.
+        """
+        return Timer(self, labels)
+
+
+class Timer:
+    def __init__(self, histogram: Histogram, labels: tuple):
+        self.histogram = histogram
+        self.labels = labels
+        self._started: float = 0.0
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.histogram.observe(time.perf_counter() - self._started, *self.labels)
+
+    def __call__(self, func: Callable) -> Callable:
+        histogram, labels = self.histogram, self.labels
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started: float = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started, *labels)
+
+        return wrapper
+
+
+class MetricsRegistry:
+    """
+    Process-wide metric registry. Collectors registered with ``add_collector`` refresh gauges right before a snapshot,
+    for values that are cheaper to read on demand (e.g. pool usage).
+
+    Worker processes publish their snapshot to the shared store every ``METRICS_DUMP_INTERVAL`` seconds (see
+    ``start``); ``render`` merges the own live snapshot with the recent dumps of all other processes.
+    """
+
+    def __init__(self, store: SharedStore = shared_store):
+        self.store = store
+        self.metrics: dict[str, Metric] = {}
+        self._collectors: list[Callable] = []
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            existing: Metric | None = self.metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} already registered with another type or labels")
+                return existing
+            self.metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable = ()) -> Counter:
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable = ()) -> Gauge:
+        return self._register(Gauge(self, name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable = (),
+                  buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        self._collectors.append(collector)
+
+    def snapshot(self) -> dict:
+        """
+        Returns the metrics of this process as JSON-serialisable dict:
+        ``{name: {type, help, labels[, buckets], samples: [[label values, value], ...]}}``.
+        """
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as err:
+                logging.error(f"[METRICS] Collector {getattr(collector, '__name__', collector)} failed: {err}")
+
+        with self._lock:
+            metrics: dict = dict(self.metrics)
+
+        return {
+            name: {**metric.describe(),
+                   "samples": [[[str(label) for label in labels], value] for labels, value in metric.samples().items()]}
+            for name, metric in metrics.items()
+        }
+
+    def dump(self) -> None:
+        self.store.write(f"metrics_{os.getpid()}", self.snapshot())
+
+    def merged_snapshot(self) -> dict:
+        """
+        Sums the live snapshot of this process with the dumps of all other processes that are not older than three
+        dump intervals. Outdated dumps (e.g. of restarted workers) are removed.
+        """
+        merged: dict = self.snapshot()
+        max_age: float = 3 * max(Config.METRICS_DUMP_INTERVAL, 1)
+        own: str = f"metrics_{os.getpid()}.json"
+        try:
+            names: list = [name for name in os.listdir(self.store.directory)
+                           if name.startswith("metrics_") and name.endswith(".json") and name != own]
+        except OSError as err:
+            logging.error(f"[METRICS] Could not list metric dumps: {err}")
+            names = []
+
+        for name in names:
+            key: str = name[:-len(".json")]
+            snapshot, timestamp = self.store.read(key)
+            if snapshot is None:
+                continue
+            if time.time() - timestamp > max_age:
+                try:
+                    os.remove(os.path.join(self.store.directory, name))
+                except OSError:
+                    pass
+                continue
+            _merge(merged, snapshot)
+        return merged
+
+    def render(self) -> str:
+        """
+        Returns the merged metrics of all processes in the Prometheus text exposition format (version 0.0.4).
+        """
+        lines: list = []
+        for name, metric in sorted(self.merged_snapshot().items()):
+            lines.append(f"# HELP {name} {_escape_help(metric['help'])}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+            for labels, value in sorted(metric["samples"], key=lambda sample: sample[0]):
+                pairs: list = list(zip(metric["labels"], labels))
+                if metric["type"] != "histogram":
+                    lines.append(f"{name}{_labels(pairs)} {_number(value)}")
+                    continue
+                cumulative: int = 0
+                for bound, count in zip(metric["buckets"] + ["+Inf"], value[:-2]):
+                    cumulative += count
+                    le: str = bound if isinstance(bound, str) else _number(bound)
+                    lines.append(f"{name}_bucket{_labels(pairs + [('le', le)])} {cumulative}")
+                lines.append(f"{name}_sum{_labels(pairs)} {_number(value[-2])}")
+                lines.append(f"{name}_count{_labels(pairs)} {value[-1]}")
+        return "\n".join(lines) + "\n"
+
+    def start(self, interval: float = None) -> None:
+        """
+        Starts the daemon thread that dumps the snapshot of this process, 0 disables it.
+        """
+        interval = Config.METRICS_DUMP_INTERVAL if interval is None else interval
+        if interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+
+        def run() -> None:
+            while True:
+                time.sleep(interval)
+                try:
+                    self.dump()
+                except Exception as err:
+                    logging.error(f"[METRICS] Dump failed: {err}")
+
+        self._thread = threading.Thread(target=run, name="metrics-dump", daemon=True)
+        self._thread.start()
+
+
+def _merge(target: dict, snapshot: dict) -> None:
+    for name, metric in snapshot.items():
+        existing: dict | None = target.get(name)
+        if existing is None:
+            target[name] = metric
+            continue
+        if existing["type"] != metric["type"] or existing.get("buckets") != metric.get("buckets"):
+            continue
+        samples: dict = {tuple(labels): value for labels, value in existing["samples"]}
+        for labels, value in metric["samples"]:
+            key: tuple = tuple(labels)
+            if key not in samples:
+                samples[key] = value
+            elif isinstance(value, list):
+                samples[key] = [a + b for a, b in zip(samples[key], value)]
+            else:
+                samples[key] += value
+        existing["samples"] = [[list(labels), value] for labels, value in samples.items()]
+
+
+def _labels(pairs: list) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in pairs) + "}"
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,84 @@
+import json
+import os
+import tempfile
+import time
+
+from config import Config
+from utils.logging_service import LoggingService
+
+logging = LoggingService()
+
+
+class SharedStore:
+    """
+    File-backed snapshot store shared between all worker processes of one host.
+
+    Every key is kept in its own JSON file inside ``directory``. Writes go to a temporary file first and are moved into
+    place with ``os.replace`` so readers never observe a half-written snapshot.
+    """
+
+    def __init__(self, directory: str = None):
+        self.directory = directory or Config.SHARED_STATE_DIR
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def write(self, key: str, value) -> None:
+        """
+        Stores ``value`` under ``key`` together with the current timestamp.
+
+        Args:
+            key (str): Name of the snapshot (e.g. "inverter").
+            value: Any JSON-serialisable object.
+        """
+        payload: dict = {"timestamp": time.time(), "value": value}
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f".{key}.", suffix=".tmp")
+        except OSError as err:
+            logging.error(f"[SHAREDSTORE] Could not write snapshot '{key}': {err}")
+            return
+
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+        except (OSError, TypeError, ValueError) as err:
+            logging.error(f"[SHAREDSTORE] Could not write snapshot '{key}': {err}")
+            # Do not leave the partial snapshot behind
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    def version(self, key: str) -> tuple | None:
+        """
+        Returns ``(inode, mtime_ns)`` of the snapshot file, a cheap way to detect changes without reading it. Every
+        write replaces the file, so the tuple changes with each write.
+        """
+        try:
+            stat = os.stat(self._path(key))
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def read(self, key: str) -> tuple:
+        """
+        Reads the latest snapshot stored under ``key``.
+
+        Returns:
+            tuple: ``(value, timestamp)`` or ``(None, None)`` if no snapshot exists.
+        """
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                payload: dict = json.load(f)
+        except FileNotFoundError:
+            return None, None
+        except (OSError, ValueError) as err:
+            logging.error(f"[SHAREDSTORE] Could not read snapshot '{key}': {err}")
+            return None, None
+
+        return payload.get("value"), payload.get("timestamp")
+
+
+shared_store = SharedStore()
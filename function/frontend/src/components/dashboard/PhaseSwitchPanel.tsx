@@ -97,7 +97,7 @@ export function PhaseSwitchPanel() {
           </PopoverTrigger>
           <PopoverContent className="w-48">
             <div className="flex flex-col gap-2">
-              {["Automatik", "Manuell", "Schnell heizen", "Urlaub"].map((option) => (
+              {["Automatik", "Manuell", "Schnell heizen", "Urlaub", "Preisoptimiert"].map((option) => (
                 <Button
                   key={option}
                   variant="ghost"
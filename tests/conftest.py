@@ -1,8 +1,9 @@
 import pytest
+from flask import Flask
 
-from function.backend.extensions import db
-from backend.database.users import User
-from function.backend.app import create_app
+from extensions import db
+from database.users import User
+from app import create_app
 
 
 @pytest.fixture
@@ -21,3 +22,19 @@ def client():
         db.session.commit()
 
     return app.test_client()
+
+
+@pytest.fixture
+def app():
+    """
+    Bare application with an in-memory database and all models, without the scheduler and background services.
+    """
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    app.config["TESTING"] = True
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
@@ -0,0 +1,118 @@
+import asyncio
+import threading
+
+import pytest
+
+from services.acquisition import AcquisitionBus, AcquisitionEngine, Device, Subscription
+
+
+@pytest.fixture
+def engine():
+    engine = AcquisitionEngine()
+    engine._loop = asyncio.new_event_loop()
+    yield engine
+    for device in engine.devices.values():
+        device._executor.shutdown(wait=False)
+    engine._loop.close()
+
+
+def poll(engine, device):
+    engine._loop.run_until_complete(engine._poll(device))
+
+
+def test_busy_subscriber_only_gets_the_latest_message():
+    started, release, done = threading.Event(), threading.Event(), threading.Event()
+    received = []
+
+    def handler(value):
+        received.append(value)
+        started.set()
+        release.wait(1)
+        if value == 3:
+            done.set()
+
+    subscription = Subscription("inverter", handler)
+    subscription.deliver(1, 0.0)
+    assert started.wait(1)
+    subscription.deliver(2, 1.0)
+    subscription.deliver(3, 2.0)
+    release.set()
+
+    assert done.wait(1)
+    subscription.close()
+    assert received == [1, 3]
+    assert subscription.dropped == 1
+    assert subscription.delivered == 2
+
+
+def test_failing_handler_is_counted_and_does_not_stop_delivery():
+    done = threading.Event()
+
+    def handler(value):
+        if value == "bad":
+            raise ValueError("bad payload")
+        done.set()
+
+    subscription = Subscription("r4dcb08", handler)
+    subscription.deliver("bad", 0.0)
+    subscription.deliver("good", 1.0)
+
+    assert done.wait(1)
+    subscription.close()
+    assert subscription.errors == 1
+
+
+def test_bus_keeps_the_latest_value_per_topic():
+    bus = AcquisitionBus()
+    bus.publish("tibber", 1, timestamp=10.0)
+    bus.publish("tibber", 2, timestamp=20.0)
+
+    assert bus.latest("tibber") == (2, 20.0)
+    assert bus.latest("weather") == (None, None)
+
+
+def test_poll_publishes_the_value(engine):
+    device = engine.add_device(Device("inverter", lambda: {"cover": 100}, interval=1))
+
+    poll(engine, device)
+
+    assert engine.bus.latest("inverter")[0] == {"cover": 100}
+    assert device.polls == 1
+    assert device.last_success is not None
+
+
+@pytest.mark.parametrize("read", [lambda: None, lambda: 1 / 0])
+def test_failed_reads_are_not_published(engine, read):
+    device = engine.add_device(Device("inverter", read, interval=1))
+
+    poll(engine, device)
+
+    assert device.errors == 1
+    assert engine.bus.latest("inverter") == (None, None)
+
+
+def test_stuck_read_times_out_and_later_polls_are_skipped(engine):
+    release = threading.Event()
+    calls = []
+
+    def read():
+        calls.append(1)
+        release.wait(1)
+        return 42
+
+    device = engine.add_device(Device("r4dcb08", read, interval=1, timeout=0.05))
+
+    poll(engine, device)
+    poll(engine, device)
+
+    assert device.timeouts == 1
+    assert device.skipped == 1
+    assert len(calls) == 1
+    assert engine.bus.latest("r4dcb08") == (None, None)
+
+    release.set()
+    engine._loop.run_until_complete(device._in_flight)
+    poll(engine, device)
+
+    assert len(calls) == 2
+    assert engine.bus.latest("r4dcb08")[0] == 42
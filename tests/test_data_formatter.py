@@ -0,0 +1,78 @@
+import pytest
+
+from utils.data_formatter import compile_path, extract_datapoints_from_json_with_api, validate_api_field
+
+DATA = {
+    "Body": {"Data": {"Site": {"P_Load": -512.0, "P_PV": 1830.5}}},
+    "data": {"nodes": [{"consumption": 1.5}, {"consumption": 2.0}, {"cost": 0.3}]},
+}
+
+
+def test_compile_path_is_cached():
+    assert compile_path("['Body', 'Data']") is compile_path("['Body', 'Data']")
+    assert compile_path("['data', 'nodes', 0]").steps == ("data", "nodes", 0)
+
+
+@pytest.mark.parametrize("api", ["Body.Data", "{'port': 1}", "['Body', 1.5]", "['Body', True]"])
+def test_compile_path_rejects_invalid_paths(api):
+    with pytest.raises(ValueError):
+        compile_path(api)
+
+
+def test_extract_single_value():
+    assert extract_datapoints_from_json_with_api("['Body', 'Data', 'Site', 'P_PV']", DATA) == 1830.5
+
+
+def test_extract_missing_value_raises_without_default():
+    with pytest.raises(ValueError):
+        extract_datapoints_from_json_with_api("['Body', 'Data', 'Inverter']", DATA)
+
+
+def test_extract_fields_in_one_pass():
+    fields = extract_datapoints_from_json_with_api("['Body', 'Data', 'Site']", DATA, fields=("P_Load", "P_PV"))
+
+    assert fields == {"P_Load": -512.0, "P_PV": 1830.5}
+
+
+def test_missing_field_takes_the_default():
+    fields = extract_datapoints_from_json_with_api(
+        "['Body', 'Data', 'Site']", DATA, fields=("P_PV", "SOC"), default=None
+    )
+
+    assert fields == {"P_PV": 1830.5, "SOC": None}
+
+
+def test_missing_field_raises_without_default():
+    with pytest.raises(ValueError):
+        extract_datapoints_from_json_with_api("['Body', 'Data', 'Site']", DATA, fields=("P_PV", "SOC"))
+
+
+def test_all_fields_missing_raises_even_with_default():
+    with pytest.raises(ValueError):
+        extract_datapoints_from_json_with_api("['Body', 'Data', 'Site']", DATA, fields=("SOC", "P_Grid"), default=0)
+
+
+def test_fields_require_an_object_at_the_path():
+    with pytest.raises(ValueError):
+        extract_datapoints_from_json_with_api("['data', 'nodes']", DATA, fields=("consumption",), default=None)
+
+
+def test_wildcard_collects_every_element():
+    values = extract_datapoints_from_json_with_api("['data', 'nodes', '*', 'cost']", DATA, default=0.0)
+
+    assert values == [0.0, 0.0, 0.3]
+
+
+def test_wildcard_without_default_raises_on_a_missing_element():
+    with pytest.raises(ValueError):
+        extract_datapoints_from_json_with_api("['data', 'nodes', '*', 'consumption']", DATA)
+
+
+@pytest.mark.parametrize("api", [None, "", "  ", "['Body', 'Data', 'Site']", "{'port': '/dev/ttyUSB0', 'baud': 9600}"])
+def test_validate_api_field_accepts(api):
+    assert validate_api_field(api) is None
+
+
+@pytest.mark.parametrize("api", ["Body.Data", "'Body'", "42", "['Body', None]"])
+def test_validate_api_field_rejects(api):
+    assert validate_api_field(api) is not None
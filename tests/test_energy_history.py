@@ -0,0 +1,86 @@
+import pytest
+
+from database.analyse import EnergyBucket, Measurement
+from extensions import db
+from services.energy.energy_history import HOUR, MAX_GAP, _integrate_hours, aggregate_energy, query_energy
+
+HOUR_START: int = 1_700_000_000 // HOUR * HOUR
+
+
+def add_samples(metric: str, samples: list, source: str = "inverter") -> None:
+    db.session.add_all(Measurement(timestamp=timestamp, source=source, metric=metric, value=value)
+                       for timestamp, value in samples)
+    db.session.commit()
+
+
+def test_constant_power_per_hour(app):
+    add_samples("production", [(HOUR_START + offset, 3600.0) for offset in range(0, 2 * HOUR + 1, 60)])
+
+    hours: dict = _integrate_hours(HOUR_START, HOUR_START + 2 * HOUR)
+
+    assert sorted(hours) == [HOUR_START, HOUR_START + HOUR]
+    assert hours[HOUR_START]["production"] == pytest.approx(3.6)
+    assert hours[HOUR_START + HOUR]["production"] == pytest.approx(3.6)
+    assert hours[HOUR_START]["samples"] == 60
+
+
+def test_segment_is_split_at_the_hour(app):
+    add_samples("production", [(HOUR_START - 30, 0.0), (HOUR_START + 30, 3600.0), (HOUR_START + 60, 3600.0)])
+
+    hours: dict = _integrate_hours(HOUR_START - HOUR, HOUR_START + HOUR)
+
+    # Linear ramp 0 → 3600 W over one minute, 1800 W at the boundary
+    assert hours[HOUR_START - HOUR]["production"] == pytest.approx(900 * 30 / 3_600_000)
+    assert hours[HOUR_START]["production"] == pytest.approx((2700 * 30 + 3600 * 30) / 3_600_000)
+
+
+def test_gaps_are_not_interpolated(app):
+    add_samples("production", [(HOUR_START, 1000.0), (HOUR_START + MAX_GAP + 1, 1000.0)])
+
+    hours: dict = _integrate_hours(HOUR_START, HOUR_START + HOUR)
+
+    assert hours[HOUR_START]["production"] == 0.0
+    assert hours[HOUR_START]["samples"] == 2
+
+
+def test_series_are_integrated_separately(app):
+    add_samples("consume", [(HOUR_START + offset, 2000.0) for offset in range(0, HOUR + 1, 60)])
+    add_samples("heating", [(HOUR_START + offset, 1500.0) for offset in range(0, HOUR + 1, 60)], "heat_pipes")
+
+    hour: dict = _integrate_hours(HOUR_START, HOUR_START + HOUR)[HOUR_START]
+
+    assert hour["consumption"] == pytest.approx(2.0)
+    assert hour["heating"] == pytest.approx(1.5)
+    assert hour["production"] == 0.0
+
+
+def test_aggregate_and_query(app):
+    add_samples("production", [(HOUR_START + offset, 1000.0) for offset in range(0, 3 * HOUR + 1, 60)])
+    add_samples("consume", [(HOUR_START + offset, 500.0) for offset in range(0, 3 * HOUR + 1, 60)])
+    add_samples("heating", [(HOUR_START + offset, 200.0) for offset in range(0, 3 * HOUR + 1, 60)], "heat_pipes")
+    now: float = HOUR_START + 4 * HOUR
+
+    aggregate_energy(now)
+    stored: int = db.session.query(EnergyBucket).filter(EnergyBucket.resolution == HOUR).count()
+    assert aggregate_energy(now) == 0
+
+    entries: list = query_energy(HOUR_START, HOUR_START + 3 * HOUR, "hour", now)
+
+    assert stored == 3
+    assert [entry["timestamp"] for entry in entries] == [HOUR_START + index * HOUR for index in range(3)]
+    assert entries[0]["production"] == pytest.approx(1.0)
+    assert entries[0]["regular"] == pytest.approx(0.3)
+
+
+def test_query_integrates_open_hours(app):
+    add_samples("production", [(HOUR_START + offset, 1200.0) for offset in range(0, 1801, 60)])
+
+    entries: list = query_energy(HOUR_START, HOUR_START + HOUR, "hour", now=HOUR_START + 1800)
+
+    assert len(entries) == 1
+    assert entries[0]["production"] == pytest.approx(0.6)
+
+
+def test_unsupported_resolution(app):
+    with pytest.raises(ValueError):
+        query_energy(HOUR_START, HOUR_START + HOUR, "week")
@@ -0,0 +1,51 @@
+import pytest
+
+from services.heating.GpioMock import RPiGPIOSimulator
+
+
+@pytest.fixture
+def gpio():
+    simulator = RPiGPIOSimulator()
+    simulator.setmode(RPiGPIOSimulator.BCM)
+    return simulator
+
+
+def test_callbacks_fire_once_per_edge(gpio):
+    edges = []
+    gpio.setup(17, gpio.IN, pull=gpio.PUD_DOWN)
+    gpio.add_event_detect(17, gpio.RISING, callback=edges.append)
+
+    gpio.set_input(17, gpio.HIGH)
+    gpio.set_input(17, gpio.HIGH)
+    gpio.set_input(17, gpio.LOW)
+
+    assert edges == [17]
+
+
+def test_remove_event_detect_stops_callbacks(gpio):
+    edges = []
+    gpio.setup(17, gpio.IN, pull=gpio.PUD_DOWN)
+    gpio.add_event_detect(17, gpio.BOTH, callback=edges.append)
+
+    gpio.remove_event_detect(17)
+    gpio.set_input(17, gpio.HIGH)
+
+    assert edges == []
+
+
+def test_remove_event_detect_without_detection_is_a_no_op(gpio):
+    gpio.remove_event_detect(5)
+
+    assert gpio.pins[5]['edge'] is None
+
+
+def test_remove_event_detect_rejects_invalid_pins(gpio):
+    with pytest.raises(ValueError):
+        gpio.remove_event_detect(99)
+
+
+def test_transitions_are_recorded(gpio):
+    gpio.setup(4, gpio.OUT)
+    gpio.output(4, gpio.HIGH)
+
+    assert [(t['from'], t['to']) for t in gpio.get_transitions(4)] == [(None, 0), (0, 1)]
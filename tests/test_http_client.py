@@ -0,0 +1,97 @@
+import pytest
+from requests.exceptions import ConnectionError
+
+from services import http_client as http_client_module
+from services.http_client import CircuitBreaker, CircuitOpenError, HttpClient
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(http_client_module.time, "monotonic", clock)
+    return clock
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failures=3, reset=30)
+
+    assert breaker.failure() is False
+    assert breaker.failure() is False
+    assert breaker.failure() is True
+    assert breaker.state == "open"
+    assert breaker.allow() is False
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker(failures=2, reset=30)
+    breaker.failure()
+    breaker.success()
+
+    assert breaker.failure() is False
+    assert breaker.state == "closed"
+
+
+def test_half_open_lets_one_trial_through(clock):
+    breaker = CircuitBreaker(failures=1, reset=30)
+    breaker.failure()
+    clock.now += 30
+
+    assert breaker.state == "half-open"
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+
+    breaker.success()
+    assert breaker.state == "closed"
+    assert breaker.allow() is True
+
+
+def test_failed_trial_opens_the_circuit_again(clock):
+    breaker = CircuitBreaker(failures=1, reset=30)
+    breaker.failure()
+    clock.now += 30
+    breaker.allow()
+
+    assert breaker.failure() is True
+    assert breaker.state == "open"
+    clock.now += 29
+    assert breaker.allow() is False
+
+
+def test_zero_failures_disables_the_breaker(clock):
+    breaker = CircuitBreaker(failures=0, reset=30)
+    for _ in range(10):
+        assert breaker.failure() is False
+
+    assert breaker.allow() is True
+
+
+def test_request_is_rejected_while_the_circuit_is_open(clock, monkeypatch):
+    client = HttpClient(timeout=1, retries=0, backoff=0, circuit_failures=2, circuit_reset=30)
+    session = client.session("http://192.168.1.10/status")
+    calls = []
+
+    def refuse(*args, **kwargs):
+        calls.append(args)
+        raise ConnectionError("refused")
+
+    monkeypatch.setattr(session, "request", refuse)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            client.get("http://192.168.1.10/status")
+
+    with pytest.raises(CircuitOpenError):
+        client.get("http://192.168.1.10/status")
+
+    assert len(calls) == 2
+    stats = client.stats()["192.168.1.10"]
+    assert stats["circuit"] == "open"
+    assert stats["rejected"] == 1
+    assert stats["errors"] == 2
@@ -0,0 +1,60 @@
+import pytest
+
+from services.energy import inverter
+from services.telemetry_cache import TelemetryCache
+from utils.shared_store import SharedStore
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = TelemetryCache(SharedStore(str(tmp_path)), max_age=60)
+    monkeypatch.setattr(inverter, "telemetry_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def controlled(monkeypatch):
+    covers: list = []
+    monkeypatch.setattr(inverter, "automatic_control", covers.append)
+    monkeypatch.setattr(inverter, "record_measurements", lambda source, values: None)
+    monkeypatch.setattr(inverter, "get_heating_power", lambda: 0.0)
+    return covers
+
+
+def test_failed_read_returns_none(monkeypatch):
+    monkeypatch.setattr(inverter, "pull_and_fromatted_inverter_data", lambda *args: {})
+
+    assert inverter.read_live_data_from_inverter() is None
+
+
+def test_reading_is_converted(monkeypatch):
+    data: dict = {"P_Load": -812.4, "P_PV": 1530.6, "P_Grid": 320.0, "P_Akku": None}
+    monkeypatch.setattr(inverter, "pull_and_fromatted_inverter_data", lambda *args: data)
+
+    assert inverter.read_live_data_from_inverter() == {"consume": 812, "production": 1531, "cover": -320,
+                                                        "accu_capacity": 0.0}
+
+
+@pytest.mark.parametrize("pull", [inverter.pull_live_data_from_inverter, inverter.PowerFollower(interval=1).tick])
+def test_failed_read_keeps_last_snapshot(pull, cache, controlled, monkeypatch):
+    cache.put("inverter", {"consume": 500, "production": 900, "cover": 400, "accu_capacity": 0.0})
+    monkeypatch.setattr(inverter, "read_live_data_from_inverter", lambda *args, **kwargs: None)
+
+    assert pull() is None
+    assert controlled == []
+    assert cache.get("inverter")["cover"] == 400
+
+
+def test_successful_read_runs_control_and_publishes(cache, controlled, monkeypatch):
+    live_data: dict = {"consume": 500, "production": 900, "cover": 400, "accu_capacity": 0.0}
+    monkeypatch.setattr(inverter, "read_live_data_from_inverter", lambda *args, **kwargs: live_data)
+
+    inverter.pull_live_data_from_inverter()
+
+    assert controlled == [400]
+    assert cache.get("inverter") == live_data
+
+
+def test_get_or_read_does_not_cache_failed_reads(cache):
+    assert cache.get_or_read("inverter", lambda: None) is None
+    assert cache.get_with_timestamp("inverter") == (None, None)
@@ -0,0 +1,105 @@
+import pytest
+
+import api.dashboard.live
+from services.live_push import ROOMS, LivePublisher, compute_delta
+
+
+def merge(old: dict, delta: dict) -> dict:
+    merged: dict = dict(old)
+    for key, value in delta.items():
+        if value is None:
+            merged.pop(key, None)
+        elif isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+class FakeSocketIO:
+    def __init__(self):
+        self.emitted: list = []
+
+    def emit(self, event: str, data: dict, to: str, namespace: str) -> None:
+        self.emitted.append((event, to, data))
+
+
+@pytest.fixture
+def publisher(monkeypatch):
+    publisher = LivePublisher(FakeSocketIO(), interval=1)
+    state: dict = {room: {"value": 1} for room in ROOMS}
+    collected: list = []
+
+    def collect(room: str) -> dict:
+        collected.append(room)
+        return dict(state[room])
+
+    monkeypatch.setattr(publisher, "_collect", collect)
+    publisher.state, publisher.collected = state, collected
+    return publisher
+
+
+def test_delta_of_equal_snapshots_is_empty():
+    assert compute_delta({"cover": 400, "tanks": {"a": 1}}, {"cover": 400, "tanks": {"a": 1}}) == {}
+
+
+def test_delta_contains_changed_added_and_removed_keys():
+    old: dict = {"cover": 400, "production": 900, "tank": {"sensor_1": 40.0, "sensor_2": 45.0}}
+    new: dict = {"cover": 350, "consume": 550, "tank": {"sensor_1": 40.0, "sensor_2": 46.0}}
+
+    delta: dict = compute_delta(old, new)
+
+    assert delta == {"cover": 350, "consume": 550, "production": None, "tank": {"sensor_2": 46.0}}
+    assert merge(old, delta) == new
+
+
+def test_delta_replaces_values_that_change_type():
+    assert compute_delta({"mode": {"name": "Automatik"}}, {"mode": "Urlaub"}) == {"mode": "Urlaub"}
+    assert compute_delta({"cover": None}, {"cover": 0}) == {"cover": 0}
+
+
+@pytest.mark.parametrize("data, rooms", [
+    (None, list(ROOMS)),
+    ({}, list(ROOMS)),
+    ({"rooms": ["tanks", "energy", "unknown"]}, ["energy", "tanks"]),
+    ({"rooms": []}, []),
+])
+def test_requested_rooms(data, rooms):
+    assert api.dashboard.live._requested_rooms(data) == rooms
+
+
+@pytest.mark.parametrize("rooms", ["energy", 5, {"energy": True}])
+def test_rooms_must_be_a_list(rooms):
+    with pytest.raises(ValueError):
+        api.dashboard.live._requested_rooms({"rooms": rooms})
+
+
+def test_only_watched_rooms_are_collected(publisher):
+    publisher.subscribe("a", ["energy"])
+    publisher.poll()
+
+    assert publisher.collected == ["energy"]
+
+
+def test_client_without_rooms_is_dropped(publisher):
+    publisher.subscribe("a", ["energy", "tanks"])
+    publisher.unsubscribe("a", ["energy"])
+    assert publisher.watched_rooms() == {"tanks"}
+
+    publisher.unsubscribe("a", ["tanks"])
+    publisher.poll()
+
+    assert publisher.watched_rooms() == set()
+    assert publisher.collected == []
+
+
+def test_changes_are_emitted_as_numbered_deltas(publisher):
+    publisher.subscribe("a", ["relays"])
+    assert publisher.snapshot("relays") == {"room": "relays", "seq": 0, "data": {"value": 1}}
+
+    publisher.poll()
+    publisher.state["relays"] = {"value": 2}
+    publisher.poll()
+
+    assert publisher.socketio.emitted == [("update", "relays", {"room": "relays", "seq": 1, "delta": {"value": 2}})]
+
@@ -0,0 +1,38 @@
+import os
+import time
+
+import pytest
+
+from utils.local_time import local_midnight, next_local_midnight
+
+
+@pytest.fixture
+def berlin():
+    previous = os.environ.get("TZ")
+    os.environ["TZ"] = "Europe/Berlin"
+    time.tzset()
+    yield
+    if previous is None:
+        del os.environ["TZ"]
+    else:
+        os.environ["TZ"] = previous
+    time.tzset()
+
+
+def test_midnight_of_a_regular_day(berlin):
+    # 2024-06-15 14:30 CEST
+    timestamp = 1718454600
+
+    assert local_midnight(timestamp) == 1718402400
+    assert next_local_midnight(timestamp) - local_midnight(timestamp) == 86400
+
+
+def test_midnight_is_stable_at_the_day_start(berlin):
+    assert local_midnight(1718402400) == 1718402400
+
+
+def test_next_midnight_across_daylight_saving(berlin):
+    # 2024-03-31 12:00 CEST, the day only lasts 23 hours
+    timestamp = 1711879200
+
+    assert next_local_midnight(timestamp) - local_midnight(timestamp) == 23 * 3600
@@ -0,0 +1,93 @@
+import os
+import time
+
+import pytest
+
+from utils.metrics import MetricsRegistry
+from utils.shared_store import SharedStore
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return MetricsRegistry(SharedStore(str(tmp_path)))
+
+
+def test_counter_and_gauge(registry):
+    requests = registry.counter("viki_requests_total", "Handled requests", ("route",))
+    pool = registry.gauge("viki_pool_in_use", "Connections in use")
+    requests.inc(1, "/status")
+    requests.inc(2, "/status")
+    requests.inc(1, '/say "hi"')
+    pool.set(3)
+
+    assert registry.render() == (
+        "# HELP viki_pool_in_use Connections in use\n"
+        "# TYPE viki_pool_in_use gauge\n"
+        "viki_pool_in_use 3\n"
+        "# HELP viki_requests_total Handled requests\n"
+        "# TYPE viki_requests_total counter\n"
+        'viki_requests_total{route="/say \\"hi\\""} 1\n'
+        'viki_requests_total{route="/status"} 3\n'
+    )
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    latency = registry.histogram("viki_tick_seconds", "Tick duration", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        latency.observe(value)
+
+    lines = registry.render().splitlines()
+
+    assert lines[2:] == [
+        'viki_tick_seconds_bucket{le="0.1"} 2',
+        'viki_tick_seconds_bucket{le="1"} 3',
+        'viki_tick_seconds_bucket{le="+Inf"} 4',
+        "viki_tick_seconds_sum 2.65",
+        "viki_tick_seconds_count 4",
+    ]
+
+
+def test_timer_observes_decorated_calls(registry):
+    latency = registry.histogram("viki_job_seconds", "Job duration", ("job",))
+
+    @latency.time("prices")
+    def job():
+        return 42
+
+    assert job() == 42
+    assert job.__wrapped__() == 42
+    assert latency.samples()[("prices",)][-1] == 1
+
+
+def test_registering_twice_returns_the_same_metric(registry):
+    counter = registry.counter("viki_polls_total", "Polls", ("device",))
+
+    assert registry.counter("viki_polls_total", "Polls", ("device",)) is counter
+    with pytest.raises(ValueError):
+        registry.gauge("viki_polls_total", "Polls", ("device",))
+
+
+def test_render_sums_the_dumps_of_other_processes(registry):
+    polls = registry.counter("viki_polls_total", "Polls", ("device",))
+    polls.inc(2, "inverter")
+    registry.store.write("metrics_1", {
+        "viki_polls_total": {"type": "counter", "help": "Polls", "labels": ["device"],
+                             "samples": [[["inverter"], 3], [["tibber"], 1]]},
+    })
+
+    rendered = registry.render()
+
+    assert 'viki_polls_total{device="inverter"} 5' in rendered
+    assert 'viki_polls_total{device="tibber"} 1' in rendered
+
+
+def test_outdated_dumps_are_removed(registry, monkeypatch):
+    registry.counter("viki_polls_total", "Polls").inc(1)
+    with monkeypatch.context() as patch:
+        patch.setattr(time, "time", lambda: 0.0)
+        registry.store.write("metrics_1", {
+            "viki_polls_total": {"type": "counter", "help": "Polls", "labels": [], "samples": [[[], 7]]},
+        })
+
+    assert "viki_polls_total 1\n" in registry.render()
+    assert not os.path.exists(os.path.join(registry.store.directory, "metrics_1.json"))
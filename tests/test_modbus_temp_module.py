@@ -0,0 +1,54 @@
+import pytest
+
+from services.temperature import modbus_temp_module
+from services.telemetry_cache import TelemetryCache
+from utils.shared_store import SharedStore
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = TelemetryCache(SharedStore(str(tmp_path)), max_age=60)
+    monkeypatch.setattr(modbus_temp_module, "telemetry_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    samples: list = []
+    monkeypatch.setattr(modbus_temp_module, "record_measurements", lambda source, values: samples.append(values))
+    return samples
+
+
+def scan(monkeypatch, registers: list | None) -> None:
+    monkeypatch.setattr(modbus_temp_module.r4dcb08, "read_holding_registers", lambda address, count: registers)
+
+
+def test_error_value_channels_are_none(monkeypatch):
+    scan(monkeypatch, [215, 32767, 480, 0, 30000, 555])
+
+    assert modbus_temp_module.read_all_channels_from_r4dcb08() == [21.5, None, 48.0, 0.0, None, 55.5]
+
+
+def test_failed_scan_keeps_last_readings(cache, recorded, monkeypatch):
+    cache.put("r4dcb08", [40.0] * 6)
+    scan(monkeypatch, None)
+
+    assert modbus_temp_module.pull_temperatures_from_r4dcb08() is None
+    assert cache.get("r4dcb08") == [40.0] * 6
+    assert recorded == []
+
+
+def test_scan_records_readable_channels_only(cache, recorded, monkeypatch):
+    scan(monkeypatch, [215, 32767, 480, 0, 30000, 555])
+
+    modbus_temp_module.pull_temperatures_from_r4dcb08()
+
+    assert cache.get("r4dcb08") == [21.5, None, 48.0, 0.0, None, 55.5]
+    assert recorded == [{"channel_0": 21.5, "channel_2": 48.0, "channel_3": 0.0, "channel_5": 55.5}]
+
+
+def test_failed_direct_read_is_not_cached(cache, monkeypatch):
+    scan(monkeypatch, None)
+
+    assert modbus_temp_module.get_r4dcb08_temperatures() is None
+    assert cache.get_with_timestamp("r4dcb08") == (None, None)
@@ -0,0 +1,80 @@
+import pytest
+
+from services.heating import planner
+from services.heating.planner import SLOT_SECONDS, HeatingPlanner, solve_heating_policy
+
+START: int = 1_700_000_100 // SLOT_SECONDS * SLOT_SECONDS
+VOLUME: int = 100
+STAGE_POWERS: list = [0, 2000, 4000]
+
+
+def solve(prices: list, surplus: list = None, **kwargs):
+    return solve_heating_policy(START, prices, surplus or [0.0] * len(prices), STAGE_POWERS, volume=VOLUME,
+                                max_temp=70.0, feed_in_price=0.08, **kwargs)
+
+
+def test_heats_in_the_cheapest_slots():
+    prices: list = [0.40] * 4 + [0.10] * 4 + [0.40] * 8
+
+    plan = solve(prices, target_temp=50.0).simulate(40.0)
+
+    heated: list = [slot for slot, stage in enumerate(plan.stages) if stage]
+    assert heated and all(4 <= slot < 8 for slot in heated)
+    assert plan.temperatures[-1] >= 50.0 - 0.5
+
+
+def test_prefers_pv_surplus_over_grid():
+    prices: list = [0.30] * 16
+    surplus: list = [0.0] * 16
+    surplus[10] = 4000.0
+
+    plan = solve(prices, surplus, target_temp=46.0).simulate(40.0)
+
+    assert plan.stages[10] == 2
+    assert sum(plan.stages) == 2
+    # 1 kWh of surplus at the feed-in price instead of the grid price
+    assert plan.cost == pytest.approx(0.08)
+
+
+def test_does_not_heat_a_hot_tank():
+    plan = solve([0.30] * 16, target_temp=45.0).simulate(55.0)
+
+    assert plan.stages == [0] * 16
+    assert plan.cost == 0.0
+
+
+def test_reaches_target_at_deadline():
+    prices: list = [0.30] * 8 + [0.05] * 8
+
+    plan = solve(prices, target_temp=50.0, deadlines=[5]).simulate(40.0)
+
+    assert plan.temperatures[6] >= 50.0 - 0.5
+    assert any(plan.stages[:6])
+
+
+def test_respects_maximum_temperature():
+    plan = solve([0.0] * 16, [8000.0] * 16, target_temp=60.0).simulate(60.0)
+
+    assert max(plan.temperatures) <= 70.0
+
+
+def test_current_stage_uses_cached_policy(monkeypatch):
+    calls: list = []
+
+    def inputs(now: float, target_temp: float) -> dict:
+        calls.append(now)
+        return {"start": START, "prices": [0.40] * 4 + [0.10] * 12, "surplus": [0.0] * 16,
+                "stage_powers": STAGE_POWERS, "target_temp": target_temp, "volume": VOLUME, "loss_rate": 0.006,
+                "ambient_temp": 20.0, "deadlines": []}
+
+    monkeypatch.setattr(planner, "collect_planner_inputs", inputs)
+    heating_planner = HeatingPlanner()
+    assert heating_planner.current_stage(40.0, now=START) is None
+
+    policy = heating_planner.refresh(50.0, START)
+    stages: list = [heating_planner.current_stage(40.0, now=START + slot * SLOT_SECONDS) for slot in range(16)]
+
+    assert len(calls) == 1
+    assert stages == [policy.stage_for(slot, 40.0) for slot in range(16)]
+    assert heating_planner.current_stage(40.0, now=START + 16 * SLOT_SECONDS) is None
+    assert heating_planner.refresh(50.0, START) is policy
@@ -0,0 +1,76 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from services.energy.pv_forecast import clear_sky_irradiance, cloud_factor, plane_of_array, solar_position
+
+BERLIN = (52.52, 13.405)
+
+
+def _utc(*args) -> int:
+    return int(datetime.datetime(*args, tzinfo=datetime.timezone.utc).timestamp())
+
+
+def test_sun_at_summer_solstice_noon():
+    # Solar noon in Berlin is about 11:08 UTC
+    zenith, azimuth = solar_position(np.array([_utc(2024, 6, 21, 11, 8)]), *BERLIN)
+
+    assert np.degrees(zenith[0]) == pytest.approx(52.52 - 23.44, abs=0.5)
+    assert np.degrees(azimuth[0]) == pytest.approx(180, abs=2)
+
+
+def test_sun_at_equinox_noon_stands_at_the_latitude():
+    zenith, _ = solar_position(np.array([_utc(2024, 3, 20, 11, 15)]), *BERLIN)
+
+    assert np.degrees(zenith[0]) == pytest.approx(52.52, abs=1)
+
+
+def test_sun_rises_in_the_east_and_sets_in_the_west():
+    zenith, azimuth = solar_position(np.array([_utc(2024, 6, 21, 4), _utc(2024, 6, 21, 18), _utc(2024, 6, 21, 23)]),
+                                     *BERLIN)
+
+    assert 45 < np.degrees(azimuth[0]) < 90
+    assert 270 < np.degrees(azimuth[1]) < 315
+    assert np.degrees(zenith[2]) > 90
+
+
+def test_clear_sky_irradiance_at_zenith():
+    dni, dhi, ghi = clear_sky_irradiance(np.array([0.0]))
+
+    assert dni[0] == pytest.approx(1361 * 0.7, rel=0.01)
+    assert dhi[0] == pytest.approx(0.1 * dni[0])
+    assert ghi[0] == pytest.approx(dni[0] + dhi[0])
+
+
+def test_clear_sky_irradiance_is_zero_at_night():
+    dni, dhi, ghi = clear_sky_irradiance(np.radians(np.array([91.0, 120.0])))
+
+    assert dni.tolist() == [0.0, 0.0]
+    assert dhi.tolist() == [0.0, 0.0]
+    assert ghi.tolist() == [0.0, 0.0]
+
+
+def test_irradiance_falls_with_the_sun():
+    _, _, ghi = clear_sky_irradiance(np.radians(np.array([10.0, 40.0, 70.0, 85.0])))
+
+    assert np.all(np.diff(ghi) < 0)
+
+
+def test_horizontal_plane_receives_the_global_irradiance():
+    zenith = np.radians(np.array([30.0]))
+    _, _, ghi = clear_sky_irradiance(zenith)
+
+    assert plane_of_array(zenith, np.radians(np.array([180.0])), 0, 180)[0] == pytest.approx(ghi[0])
+
+
+def test_south_facing_module_beats_north_facing_at_noon():
+    zenith, azimuth = np.radians(np.array([40.0])), np.radians(np.array([180.0]))
+
+    assert plane_of_array(zenith, azimuth, 30, 180)[0] > plane_of_array(zenith, azimuth, 30, 0)[0]
+
+
+def test_cloud_factor():
+    assert cloud_factor(0.0) == pytest.approx(1.0)
+    assert cloud_factor(1.0) == pytest.approx(0.25)
+    assert cloud_factor(1.5) == pytest.approx(0.25)
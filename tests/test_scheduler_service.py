@@ -0,0 +1,87 @@
+import os
+
+import pytest
+from flask import Flask, current_app
+
+from services.scheduler_service import JOB_ERRORS, LeaderLock, LeaderScheduler
+
+
+@pytest.fixture
+def lock_file(tmp_path):
+    return str(tmp_path / "scheduler.lock")
+
+
+@pytest.fixture
+def make_scheduler(lock_file):
+    schedulers: list = []
+
+    def make() -> LeaderScheduler:
+        app = Flask(__name__)
+        app.config.update(SCHEDULER_LOCK_FILE=lock_file, SCHEDULER_STANDBY_INTERVAL=3600)
+        scheduler = LeaderScheduler()
+        scheduler.init_app(app)
+        schedulers.append(scheduler)
+        return scheduler
+
+    yield make
+    for scheduler in schedulers:
+        scheduler.shutdown()
+
+
+def test_lock_is_exclusive(lock_file):
+    first, second = LeaderLock(lock_file), LeaderLock(lock_file)
+
+    assert first.try_acquire() and first.is_leader
+    assert not second.try_acquire() and not second.is_leader
+    with open(lock_file, encoding="utf-8") as file:
+        assert file.read() == str(os.getpid())
+
+    first.release()
+    assert second.try_acquire()
+    second.release()
+
+
+def test_only_the_leader_schedules_jobs(make_scheduler):
+    leader, standby = make_scheduler(), make_scheduler()
+    started: list = []
+    for scheduler in (leader, standby):
+        scheduler.add_job(lambda: None, "inverter_data_pull", 30)
+        scheduler.on_leader(lambda: started.append(current_app.name))
+        scheduler.start()
+
+    assert leader.is_leader and not standby.is_leader
+    assert leader.sched.get_job("inverter_data_pull") is not None
+    assert standby.sched.get_job("inverter_data_pull") is None
+    assert standby.sched.get_job("leader_election") is not None
+    # The callback runs once, inside the application context of the leader
+    assert started == [__name__]
+
+
+def test_standby_is_promoted_when_the_leader_is_gone(make_scheduler):
+    leader, standby = make_scheduler(), make_scheduler()
+    promoted: list = []
+    standby.add_job(lambda: None, "inverter_data_pull", 30)
+    standby.on_leader(lambda: promoted.append(True))
+    leader.start()
+    standby.start()
+
+    standby._standby()
+    assert not standby.is_leader
+
+    leader.shutdown()
+    standby._standby()
+
+    assert standby.is_leader and promoted == [True]
+    assert standby.sched.get_job("inverter_data_pull") is not None
+    assert standby.sched.get_job("leader_election") is None
+
+
+def test_failing_job_is_logged_and_counted(make_scheduler):
+    scheduler = make_scheduler()
+
+    def fail() -> None:
+        raise RuntimeError("inverter offline")
+
+    scheduler._wrap(fail, "failing_job")()
+
+    assert JOB_ERRORS.samples()[("failing_job",)] == 1
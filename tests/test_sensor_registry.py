@@ -0,0 +1,61 @@
+from services.temperature.sensor_registry import DEFAULT_TANKS, build_layout, heat_pipe_tank, tank_readings
+
+
+def tank(tank_id, sensors=(), heat_pipe=None, dest_temp=None):
+    return {"id": tank_id, "description": f"tank {tank_id}", "dest_temp": dest_temp, "heat_pipe": heat_pipe,
+            "sensors": [{"id": sensor_id, "position": None, "channel": channel} for sensor_id, channel in sensors]}
+
+
+def channels(layout):
+    return {entry["id"]: entry["channels"] for entry in layout}
+
+
+def test_no_tanks_use_the_default_layout():
+    assert build_layout([]) is DEFAULT_TANKS
+
+
+def test_tanks_without_sensors_take_the_default_channels():
+    layout = build_layout([tank(1), tank(2), tank(3)])
+
+    assert channels(layout) == {1: [0, 1, 2], 2: [3, 4, 5], 3: []}
+    assert [entry["dest_temp"] for entry in layout] == [50.0, 35.0, 50.0]
+    assert heat_pipe_tank(layout)["id"] == 1
+
+
+def test_configured_channels_are_kept_and_the_rest_fill_the_gaps():
+    layout = build_layout([tank(1, [(10, 4), (11, None)]), tank(2, [(20, None), (21, 0)])])
+
+    assert channels(layout) == {1: [4, 1], 2: [2, 0]}
+
+
+def test_invalid_and_taken_channels_are_skipped():
+    layout = build_layout([tank(1, [(10, 2), (11, 2), (12, 9)])])
+
+    assert channels(layout) == {1: [2]}
+
+
+def test_sensors_without_free_channel_are_dropped():
+    layout = build_layout([tank(1, [(sensor_id, None) for sensor_id in range(8)])])
+
+    assert channels(layout) == {1: [0, 1, 2, 3, 4, 5]}
+
+
+def test_the_marked_tank_is_heated():
+    layout = build_layout([tank(1, [(10, None)]), tank(2, [(20, None)], heat_pipe=True, dest_temp=60.0)])
+
+    assert heat_pipe_tank(layout)["id"] == 2
+    assert heat_pipe_tank(layout)["dest_temp"] == 60.0
+    assert [entry["heat_pipe"] for entry in layout] == [False, True]
+
+
+def test_only_the_first_of_several_marked_tanks_is_heated():
+    layout = build_layout([tank(1, [(10, None)], heat_pipe=True), tank(2, [(20, None)], heat_pipe=True)])
+
+    assert [entry["heat_pipe"] for entry in layout] == [True, False]
+
+
+def test_tank_readings_map_missing_channels_to_none():
+    layout = build_layout([tank(1, [(10, 0), (11, 5)])])
+
+    assert tank_readings(layout[0], [20.5, None, None, None, None]) == {0: 20.5, 5: None}
+    assert tank_readings(layout[0], None) == {0: None, 5: None}
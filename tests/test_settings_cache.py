@@ -0,0 +1,107 @@
+import pytest
+from flask import Flask
+
+import api.settings
+from database.settings_cache import SettingsCache
+from utils.shared_store import SharedStore
+
+
+@pytest.fixture
+def caches(tmp_path):
+    # Two worker processes sharing the same store directory
+    return SettingsCache(SharedStore(str(tmp_path)), miss_ttl=60), SettingsCache(SharedStore(str(tmp_path)), miss_ttl=60)
+
+
+def loader(values: list):
+    def load():
+        values.append(len(values))
+        return {"pipe_1": 2000 + len(values)}
+
+    return load
+
+
+def test_value_is_cached_until_invalidated(caches):
+    cache, _ = caches
+    loads: list = []
+
+    first = cache.get(("heat_pipes",), ("heating_settings",), loader(loads))
+    assert cache.get(("heat_pipes",), ("heating_settings",), loader(loads)) is first
+    assert len(loads) == 1
+
+    cache.invalidate("heating_settings")
+    assert cache.get(("heat_pipes",), ("heating_settings",), loader(loads)) == {"pipe_1": 2002}
+
+
+def test_invalidation_reaches_other_processes(caches):
+    cache, other = caches
+    loads: list = []
+    cache.get(("heat_pipes",), ("heating_settings", "manufacturer"), loader(loads))
+
+    other.invalidate("manufacturer")
+    cache.get(("heat_pipes",), ("heating_settings", "manufacturer"), loader(loads))
+
+    assert len(loads) == 2
+
+
+def test_other_tables_keep_the_entry(caches):
+    cache, other = caches
+    loads: list = []
+    cache.get(("heat_pipes",), ("heating_settings",), loader(loads))
+
+    other.invalidate("weather_settings")
+    cache.get(("heat_pipes",), ("heating_settings",), loader(loads))
+
+    assert len(loads) == 1
+
+
+def test_misses_are_retried_after_their_ttl(tmp_path):
+    loads: list = []
+
+    def missing():
+        loads.append(True)
+
+    cached = SettingsCache(SharedStore(str(tmp_path)), miss_ttl=60)
+    cached.get(("pins",), ("heating_settings",), missing)
+    cached.get(("pins",), ("heating_settings",), missing)
+    assert len(loads) == 1
+
+    retried = SettingsCache(SharedStore(str(tmp_path)), miss_ttl=0)
+    retried.get(("pins",), ("heating_settings",), missing)
+    retried.get(("pins",), ("heating_settings",), missing)
+    assert len(loads) == 3
+
+
+def test_decorator_caches_per_arguments(caches):
+    cache, _ = caches
+    calls: list = []
+
+    @cache.cached("manufacturer")
+    def manufacturer(data_type: str) -> dict:
+        calls.append(data_type)
+        return {"notice": data_type}
+
+    assert manufacturer("Livedaten") == manufacturer("Livedaten") == {"notice": "Livedaten"}
+    manufacturer("Tibber")
+    assert calls == ["Livedaten", "Tibber"]
+
+
+@pytest.mark.parametrize("method, status, invalidated", [
+    ("PUT", 200, True),
+    ("DELETE", 204, True),
+    ("PUT", 400, False),
+    ("GET", 200, False),
+])
+def test_settings_writes_invalidate_their_tables(caches, monkeypatch, method, status, invalidated):
+    cache, _ = caches
+    monkeypatch.setattr(api.settings, "settings_cache", cache)
+    loads: list = []
+    cache.get(("heat_pipes",), ("heating_settings",), loader(loads))
+
+    app = Flask(__name__)
+    app.add_url_rule("/api/settings/heating/<int:setting_id>", "heating", lambda setting_id: ("", status),
+                     methods=[method])
+    app.after_request(api.settings.invalidate_settings_cache)
+    app.test_client().open("/api/settings/heating/1", method=method)
+    cache.get(("heat_pipes",), ("heating_settings",), loader(loads))
+
+    assert len(loads) == (2 if invalidated else 1)
@@ -0,0 +1,31 @@
+import os
+
+from utils.shared_store import SharedStore
+
+
+def test_write_replaces_the_snapshot(tmp_path):
+    store = SharedStore(str(tmp_path))
+    store.write("inverter", {"cover": 1})
+    version = store.version("inverter")
+
+    store.write("inverter", {"cover": 2})
+
+    assert store.read("inverter")[0] == {"cover": 2}
+    assert store.version("inverter") != version
+
+
+def test_missing_snapshot(tmp_path):
+    store = SharedStore(str(tmp_path))
+
+    assert store.read("inverter") == (None, None)
+    assert store.version("inverter") is None
+
+
+def test_failed_write_leaves_no_temporary_file(tmp_path):
+    store = SharedStore(str(tmp_path))
+    store.write("inverter", {"cover": 1})
+
+    store.write("inverter", {"cover": object()})
+
+    assert os.listdir(tmp_path) == ["inverter.json"]
+    assert store.read("inverter")[0] == {"cover": 1}
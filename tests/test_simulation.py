@@ -0,0 +1,97 @@
+import os
+import time
+
+import pytest
+
+from services.heating.simulation import (TICK_SECONDS, ReplayPlannerSources, run_replay, synthetic_inputs,
+                                         synthetic_prices)
+from services.heating.tank_model import TankModel
+
+# Three summer days (day 170–172 of the synthetic year) with enough PV surplus to switch all pipes
+SUMMER = slice(170 * 86400 // TICK_SECONDS, None)
+
+
+@pytest.fixture(scope="module")
+def summer_inputs():
+    inputs: dict = synthetic_inputs(173, seed=1)
+    return {name: series[SUMMER] for name, series in inputs.items()}
+
+
+@pytest.fixture
+def utc():
+    # The planner puts its deadline at a local hour, the replayed days start at UTC midnight
+    previous: str | None = os.environ.get("TZ")
+    os.environ["TZ"] = "UTC"
+    time.tzset()
+    yield
+    if previous is None:
+        del os.environ["TZ"]
+    else:
+        os.environ["TZ"] = previous
+    time.tzset()
+
+
+def replay(inputs: dict, mode: str, **kwargs) -> dict:
+    return run_replay(inputs["production"], inputs["consumption"], mode=mode,
+                      hot_water_demand=inputs["hot_water_demand"], **kwargs)
+
+
+def test_synthetic_inputs_are_deterministic():
+    first, second = synthetic_inputs(2, seed=3), synthetic_inputs(2, seed=3)
+
+    assert all((first[name] == second[name]).all() for name in first)
+    assert len(first["production"]) == 2 * 86400 // TICK_SECONDS
+
+
+def test_automatic_mode_follows_surplus(summer_inputs):
+    report: dict = replay(summer_inputs, "Automatik")
+
+    assert report["simulated_days"] == 3.0
+    assert report["switches"] == {"1": 6, "2": 4, "3": 2}
+    assert report["heating_kwh"] == pytest.approx(13.5, abs=0.01)
+    assert report["heating_from_pv_kwh"] == pytest.approx(report["heating_kwh"], abs=0.01)
+    assert report["cost_eur"] == pytest.approx(-7.24, abs=0.01)
+    assert 44.0 < report["tank_top_min"] and report["tank_top_max"] < 50.5
+
+
+def test_holiday_mode_never_heats(summer_inputs):
+    report: dict = replay(summer_inputs, "Urlaub")
+
+    assert report["switches"] == {"1": 0, "2": 0, "3": 0}
+    assert report["heating_kwh"] == 0.0
+    assert report["cost_eur"] == pytest.approx(-8.32, abs=0.01)
+
+
+def test_price_optimised_mode_follows_the_plan(summer_inputs, utc):
+    prices = synthetic_prices(173, seed=1)[SUMMER]
+
+    report: dict = replay(summer_inputs, "Preisoptimiert", prices=prices)
+
+    assert report["switches"] == {"1": 8, "2": 4, "3": 2}
+    assert report["heating_kwh"] == pytest.approx(13.63, abs=0.01)
+    assert report["heating_from_pv_kwh"] == pytest.approx(11.87, abs=0.01)
+    assert report["cost_eur"] == pytest.approx(-7.13, abs=0.01)
+    assert 41.0 < report["tank_top_min"] and report["tank_top_max"] < 52.0
+
+
+def test_planner_sees_prices_as_published():
+    ticks: int = 3 * 86400 // TICK_SECONDS
+    sources = ReplayPlannerSources(synthetic_prices(3), [0.0] * ticks, [0.0] * ticks, {"pipe_1": 2000}, TankModel())
+
+    sources.now = 86400 + 12 * 3600
+    assert sources.price_curve(0, 3 * 86400)[-1][0] == 2 * 86400 - 3600
+    sources.now = 86400 + 13 * 3600
+    assert sources.price_curve(0, 3 * 86400)[-1][0] == 3 * 86400 - 3600
+    assert sources.energy_history(0, 3 * 86400)[-1]["timestamp"] == 86400 + 12 * 3600
+
+
+def test_replay_throughput():
+    # A synthetic year has about one million ticks; per-tick I/O or parsing would drop far below this floor
+    report: dict = run_replay(**synthetic_inputs(10))
+
+    assert report["ticks_per_second"] > 20_000
+
+
+def test_unsupported_mode_is_rejected():
+    with pytest.raises(ValueError):
+        run_replay([0.0], [0.0], mode="Eco")
@@ -0,0 +1,93 @@
+import pytest
+
+from config import Config
+from services.heating.stage_controller import SWITCH_WINDOW, StageController, controller_for, record_switches
+
+CONFIG: dict = {
+    "pipe_1": 2000, "buffer_1": 200, "hysteresis_1": 300, "min_on_1": 300, "min_off_1": 600, "max_switches_1": 3,
+    "pipe_2": 2000, "buffer_2": 200,
+}
+
+
+@pytest.fixture
+def controller():
+    return StageController(CONFIG)
+
+
+def test_rules_fall_back_to_defaults(controller):
+    assert controller.rules(1) == {"on_threshold": 2200, "off_threshold": -300, "min_on": 300, "min_off": 600,
+                                   "max_switches": 3}
+    assert controller.rules(2)["off_threshold"] == -Config.HEAT_PIPE_HYSTERESIS
+    assert controller.rules(2)["min_on"] == Config.HEAT_PIPE_MIN_ON_TIME
+    assert controller.rules(3) is None
+
+
+@pytest.mark.parametrize("state, cover, expected", [
+    (False, 2300, True),
+    (False, 2200, None),
+    (True, -200, None),
+    (True, 0, None),
+    (True, -301, False),
+])
+def test_surplus_request_hysteresis(controller, state, cover, expected):
+    assert controller.surplus_request(1, state, cover) is expected
+
+
+def test_below_target_hysteresis():
+    dest: float = 50.0
+    restart: float = dest - Config.HEAT_PIPE_TEMP_HYSTERESIS
+
+    assert StageController.below_target(restart - 0.1, dest, heating=False)
+    assert not StageController.below_target(restart + 0.1, dest, heating=False)
+    assert StageController.below_target(dest - 0.1, dest, heating=True)
+    assert not StageController.below_target(dest, dest, heating=True)
+
+
+def test_minimum_on_and_off_time(controller):
+    memory: dict = {}
+    record_switches(memory, {1: True}, now=1000)
+
+    assert not controller.permits(1, False, memory["switching"], 1299)
+    assert controller.permits(1, False, memory["switching"], 1300)
+
+    record_switches(memory, {1: False}, now=1300)
+    assert not controller.permits(1, True, memory["switching"], 1899)
+    assert controller.permits(1, True, memory["switching"], 1900)
+
+
+def test_switch_rate_limit(controller):
+    memory: dict = {}
+    for now, state in ((0, True), (600, False), (1200, True)):
+        record_switches(memory, {1: state}, now=now)
+
+    assert not controller.permits(1, False, memory["switching"], 1800)
+    assert controller.permits(1, False, memory["switching"], SWITCH_WINDOW + 1)
+    assert memory["switching"]["1"]["count"] == 3
+
+
+def test_record_switches_prunes_history():
+    memory: dict = {}
+    record_switches(memory, {1: True}, now=0)
+    record_switches(memory, {1: False}, now=SWITCH_WINDOW + 10)
+
+    assert memory["switching"]["1"] == {"count": 2, "last": SWITCH_WINDOW + 10, "recent": [SWITCH_WINDOW + 10]}
+
+
+def test_filter_drops_current_state_and_held_pipes(controller):
+    memory: dict = {"heat_pipes": {"1": True, "2": False, "3": False}}
+    record_switches(memory, {1: True}, now=1000)
+
+    assert controller.filter({1: False, 2: True, 3: False}, memory, now=1100) == {2: True}
+    assert controller.filter({1: False, 2: True}, memory, now=1300) == {1: False, 2: True}
+
+
+def test_unconfigured_pipe_never_switches(controller):
+    assert controller.surplus_request(3, False, 10_000) is None
+    assert not controller.permits(3, True, {}, 0)
+
+
+def test_controller_is_rebuilt_only_for_new_settings():
+    settings: dict = dict(CONFIG)
+
+    assert controller_for(settings) is controller_for(settings)
+    assert controller_for(dict(CONFIG)) is not controller_for(settings)
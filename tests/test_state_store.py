@@ -0,0 +1,81 @@
+import json
+import sqlite3
+import threading
+
+import pytest
+
+from services.heating.state_store import DEFAULT_STATE, SQLiteStateStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteStateStore(str(tmp_path / "memory.db"))
+
+
+def test_seeds_default_state(store):
+    assert store.load() == DEFAULT_STATE
+
+
+def test_update_is_persisted(store, tmp_path):
+    store.update(lambda state: state.update(mode="Urlaub"))
+
+    assert SQLiteStateStore(str(tmp_path / "memory.db")).load()["mode"] == "Urlaub"
+
+
+def test_failing_mutator_rolls_back(store):
+    def apply(state: dict) -> None:
+        state["mode"] = "Urlaub"
+        raise KeyError("heat_pipes")
+
+    with pytest.raises(KeyError):
+        store.update(apply)
+    assert store.load() == DEFAULT_STATE
+
+
+def test_only_changed_keys_are_written(store, tmp_path):
+    store.update(lambda state: state.update(mode="Urlaub"))
+    store.update(lambda state: state.update(mode="Urlaub"))
+
+    with sqlite3.connect(str(tmp_path / "memory.db")) as connection:
+        versions: dict = dict(connection.execute("SELECT key, version FROM state"))
+    assert versions["mode"] == 2
+    assert all(version == 1 for key, version in versions.items() if key != "mode")
+
+
+def test_removed_keys_are_deleted(store):
+    store.update(lambda state: state.update(extra=1))
+    store.update(lambda state: state.pop("extra"))
+
+    assert "extra" not in store.load()
+
+
+def test_concurrent_updates_are_serialized(store):
+    store.update(lambda state: state.update(counter=0))
+
+    def increment() -> None:
+        for _ in range(50):
+            store.update(lambda state: state.update(counter=state["counter"] + 1))
+
+    threads: list = [threading.Thread(target=increment) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert store.load()["counter"] == 400
+
+
+def test_compare_and_set(store):
+    assert store.compare_and_set("mode", DEFAULT_STATE["mode"], "Manuell")
+    assert not store.compare_and_set("mode", DEFAULT_STATE["mode"], "Urlaub")
+    assert store.load()["mode"] == "Manuell"
+
+
+def test_imports_legacy_file(tmp_path):
+    legacy = tmp_path / "memory.json"
+    legacy.write_text(json.dumps({"mode": "Manuell"}), encoding="utf-8")
+
+    state: dict = SQLiteStateStore(str(tmp_path / "memory.db"), legacy_file=str(legacy)).load()
+
+    assert state["mode"] == "Manuell"
+    assert state["heat_pipes"] == DEFAULT_STATE["heat_pipes"]
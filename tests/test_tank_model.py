@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from services.heating.tank_model import LAYERS, TankModel, fit_tank_model
+
+
+def test_step_without_power_and_loss_conserves_energy():
+    model = TankModel(volume=300, loss_coefficient=0.0)
+    temperatures = np.array([30.0, 45.0, 60.0])
+
+    following = model.step(temperatures, 0.0, 600)
+
+    assert model.stored_energy(following) == pytest.approx(model.stored_energy(temperatures))
+    assert following[0] > temperatures[0] and following[-1] < temperatures[-1]
+
+
+def test_step_adds_heat_pipe_energy():
+    model = TankModel(volume=300, loss_coefficient=0.0, efficiency=0.9)
+    temperatures = np.full(LAYERS, 40.0)
+
+    following = model.step(temperatures, 2000.0, 900)
+
+    added: float = model.stored_energy(following) - model.stored_energy(temperatures)
+    assert added == pytest.approx(0.9 * 2000 * 900 / 3_600_000)
+
+
+def test_step_keeps_layers_stratified():
+    model = TankModel(volume=100)
+
+    following = model.step(np.array([40.0, 41.0, 42.0]), 6000.0, 900)
+
+    assert np.all(np.diff(following) >= 0)
+
+
+def test_step_loses_heat_towards_ambient():
+    model = TankModel(volume=300, ambient_temp=20.0)
+    temperatures = np.full(LAYERS, 60.0)
+
+    following = model.step(temperatures, 0.0, 3600)
+
+    assert np.all(following < temperatures)
+    lost: float = model.stored_energy(temperatures) - model.stored_energy(following)
+    assert lost * 3_600_000 / 3600 == pytest.approx(model.heat_loss(temperatures), rel=0.01)
+
+
+def test_step_is_vectorised_over_schedules():
+    model = TankModel()
+    temperatures = np.array([[40.0, 45.0, 50.0], [40.0, 45.0, 50.0]])
+
+    following = model.step(temperatures, np.array([0.0, 3000.0]), 900)
+
+    assert following.shape == (2, LAYERS)
+    assert following[1].sum() > following[0].sum()
+
+
+def test_step_operator_matches_step():
+    model = TankModel(volume=200, loss_coefficient=3.0, efficiency=0.8)
+    temperatures = np.array([30.0, 40.0, 55.0])
+    matrix, gain, offset = model.step_operator(60)
+
+    assert matrix @ temperatures + gain * 1500 + offset == pytest.approx(model.step(temperatures, 1500.0, 60))
+
+
+def test_fit_recovers_efficiency_and_loss():
+    truth = TankModel(volume=300, loss_coefficient=3.5, efficiency=0.85)
+    powers = np.tile(np.repeat([0.0, 2000.0, 4000.0, 0.0], 30), 6)
+    trajectory = truth.simulate([35.0, 40.0, 45.0], powers, dt=60)
+    timestamps = np.arange(len(powers) + 1) * 60.0
+
+    fitted = fit_tank_model(timestamps, trajectory, np.append(powers, 0.0), volume=300)
+
+    assert fitted.efficiency == pytest.approx(0.85, abs=0.02)
+    assert fitted.loss_coefficient == pytest.approx(3.5, rel=0.1)
+
+
+def test_fit_keeps_defaults_without_varied_history():
+    timestamps = np.arange(5) * 60.0
+
+    fitted = fit_tank_model(timestamps, np.full((5, LAYERS), 50.0), np.zeros(5), volume=200)
+
+    assert fitted.to_dict() == TankModel(volume=200).to_dict()
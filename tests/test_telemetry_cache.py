@@ -0,0 +1,69 @@
+import threading
+import time
+
+import pytest
+
+from services.telemetry_cache import TelemetryCache
+from utils.shared_store import SharedStore
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return TelemetryCache(SharedStore(str(tmp_path)), max_age=60)
+
+
+def test_snapshot_is_shared_between_processes(cache, tmp_path):
+    cache.put("inverter", {"cover": 400})
+
+    other = TelemetryCache(SharedStore(str(tmp_path)), max_age=60)
+    value, timestamp = other.get_with_timestamp("inverter")
+
+    assert value == {"cover": 400}
+    assert time.time() - timestamp < 5
+
+
+def test_stale_snapshot_is_not_served(cache):
+    cache.put("inverter", {"cover": 400})
+
+    assert cache.get("inverter", max_age=-1) is None
+    assert cache.get_with_timestamp("inverter")[0] == {"cover": 400}
+
+
+def test_fresh_snapshot_is_served_without_reading(cache):
+    cache.put("r4dcb08", [40.0] * 6)
+
+    assert cache.get_or_read("r4dcb08", lambda: pytest.fail("device read")) == [40.0] * 6
+
+
+def test_stale_snapshot_is_read_once_and_cached(cache):
+    cache.put("r4dcb08", [40.0] * 6)
+    reads: list = []
+
+    def read() -> list:
+        reads.append(True)
+        return [45.0] * 6
+
+    assert cache.get_or_read("r4dcb08", read, max_age=-1) == [45.0] * 6
+    assert cache.get_or_read("r4dcb08", read) == [45.0] * 6
+    assert len(reads) == 1
+
+
+def test_concurrent_callers_share_one_read(cache):
+    reads: list = []
+    results: list = []
+
+    def read() -> dict:
+        reads.append(True)
+        time.sleep(0.05)
+        return {"cover": 100}
+
+    threads: list = [threading.Thread(target=lambda: results.append(cache.get_or_read("inverter", read)))
+                     for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(reads) == 1
+    assert results == [{"cover": 100}] * 5
+
@@ -0,0 +1,35 @@
+from config import Config
+from database.analyse import EnergyPrice, Measurement
+from extensions import db
+from services.timeseries_service import apply_retention
+
+NOW: int = 1_700_000_000
+DAY: int = 86400
+
+
+def add_price(starts_at: int) -> None:
+    db.session.add(EnergyPrice(starts_at=starts_at, starts_at_iso=str(starts_at), total=0.3, fetched_at=starts_at))
+
+
+def test_retention_removes_old_samples_and_prices(app, monkeypatch):
+    monkeypatch.setattr(Config, "TIMESERIES_RETENTION_RAW", 7)
+    monkeypatch.setattr(Config, "TIMESERIES_RETENTION_PRICES", 30)
+    for days in (1, 8):
+        db.session.add(Measurement(timestamp=NOW - days * DAY, source="inverter", metric="production", value=1.0))
+    for days in (1, 29, 31):
+        add_price(NOW - days * DAY)
+    db.session.commit()
+
+    assert apply_retention(NOW) == 2
+    assert [row.timestamp for row in db.session.query(Measurement)] == [NOW - DAY]
+    assert sorted(row.starts_at for row in db.session.query(EnergyPrice)) == [NOW - 29 * DAY, NOW - DAY]
+
+
+def test_prices_are_kept_without_retention(app, monkeypatch):
+    monkeypatch.setattr(Config, "TIMESERIES_RETENTION_PRICES", 0)
+    add_price(NOW - 1000 * DAY)
+    db.session.commit()
+
+    apply_retention(NOW)
+
+    assert db.session.query(EnergyPrice).count() == 1
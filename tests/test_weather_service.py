@@ -0,0 +1,97 @@
+import pytest
+
+from config import Config
+from services import weather_service
+from services.weather_service import get_cloud_cover, get_weather, location_key, refresh_weather
+
+NOW: int = 1_700_000_000
+
+
+class CountingClient:
+    def __init__(self):
+        self.calls = []
+
+    def current(self, latitude, longitude):
+        self.calls.append(("current", latitude, longitude))
+        return self._reading(NOW, 0.2)
+
+    def forecast(self, latitude, longitude):
+        self.calls.append(("forecast", latitude, longitude))
+        return [self._reading(NOW + index * 10800, index / 10) for index in range(4)]
+
+    @staticmethod
+    def _reading(timestamp, cloud_cover):
+        return {"timestamp": timestamp, "temperature": 5.0, "cloud_cover": cloud_cover, "humidity": 80.0,
+                "wind_speed": 2.0, "description": "test"}
+
+
+def source(latitude, longitude, api_key="key"):
+    return {"latitude": latitude, "longitude": longitude, "api_key": api_key, "url": None}
+
+
+@pytest.fixture
+def weather(app, monkeypatch):
+    client = CountingClient()
+    sources = [source(52.52, 13.405)]
+    monkeypatch.setattr(Config, "WEATHER_PROVIDER", "openweathermap")
+    monkeypatch.setattr(weather_service, "create_client", lambda _: client)
+    monkeypatch.setattr(weather_service, "fetch_weather_sources", lambda: sources)
+    return client, sources
+
+
+def test_location_key_rounds_to_about_ten_metres():
+    assert location_key(52.520004, 13.40502) == location_key(52.52, 13.405)
+    assert location_key(52.5201, 13.405) != location_key(52.52, 13.405)
+
+
+def test_settings_at_the_same_location_share_one_fetch(weather):
+    client, sources = weather
+    sources.extend([source(52.520001, 13.405002), source(52.520002, 13.405, api_key=None)])
+
+    assert refresh_weather(NOW) == 2
+    assert [call[0] for call in client.calls] == ["current", "forecast"]
+
+
+def test_stored_data_is_not_fetched_again_before_it_expires(weather):
+    client, _ = weather
+    refresh_weather(NOW)
+
+    assert refresh_weather(NOW + Config.WEATHER_CURRENT_TTL - 1) == 0
+    assert refresh_weather(NOW + Config.WEATHER_CURRENT_TTL) == 1
+    assert [call[0] for call in client.calls] == ["current", "forecast", "current"]
+
+
+def test_forecast_expires_after_its_own_ttl(weather):
+    client, _ = weather
+    refresh_weather(NOW)
+
+    assert refresh_weather(NOW + Config.WEATHER_FORECAST_TTL) == 2
+    assert len(client.calls) == 4
+
+
+def test_location_without_api_key_is_skipped(weather):
+    client, sources = weather
+    sources[:] = [source(48.0, 11.0, api_key=None)]
+
+    assert refresh_weather(NOW) == 0
+    assert client.calls == []
+
+
+def test_get_weather_reads_the_stored_rows(weather):
+    refresh_weather(NOW)
+
+    stored = get_weather(52.52, 13.405, NOW)
+
+    assert stored["current"]["cloud_cover"] == 0.2
+    assert len(stored["forecast"]) == 4
+    assert stored["expires_at"] == NOW + Config.WEATHER_CURRENT_TTL
+    assert get_weather(0.0, 0.0, NOW) is None
+
+
+def test_cloud_cover_is_interpolated_between_forecast_steps(weather):
+    refresh_weather(NOW)
+
+    covers = get_cloud_cover(52.52, 13.405, NOW, NOW + 10800, 5400)
+
+    # Interval centres at 1/4 and 3/4 of the first forecast step (0.0 → 0.1)
+    assert covers == {NOW: 0.025, NOW + 5400: 0.075}